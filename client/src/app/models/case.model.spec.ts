@@ -59,7 +59,7 @@ describe('Case', () => {
         }
       ],
       associatedEntities: [],
-      imageBytes: 'image_data_bytes_123',
+      imageUrl: 'api/targets/123/image',
       state: 'ACTIVE',
       priority: {
         score: 2,
@@ -107,7 +107,7 @@ describe('Case', () => {
       }
     ]);
     expect(deserialized.associatedEntities).toEqual([]);
-    expect(deserialized.imageBytes).toBe('image_data_bytes_123');
+    expect(deserialized.imageUrl).toBe('api/targets/123/image');
     expect(deserialized.analysis).toEqual({
       safeSearchScores: {
         adult: Likelihood.POSSIBLE,
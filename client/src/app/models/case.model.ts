@@ -145,7 +145,7 @@ export interface ReviewHistory {
  * @param reviewHistory all decisions made on the case, when, and by whom.
  * @param signalContent Content that flagged this case.
  * @param associatedEntities A list of entities associated with this case.
- * @param imageBytes The raw image bytes of the content.
+ * @param imageUrl The URL of the image content, if any.
  * @param analysis Scores of additional analysis done on the content.
  * @param title The title of the content, provided by the platform.
  * @param description The description of the content, provided by the platform.
@@ -167,7 +167,7 @@ export class Case {
     readonly signalContent: Content[],
     readonly flags: Flag[],
     readonly associatedEntities: string[],
-    readonly imageBytes: string | undefined,
+    readonly imageUrl: string | undefined,
     readonly analysis: Analysis,
     readonly title: string,
     readonly description: string,
@@ -190,7 +190,7 @@ export class Case {
       input['signalContent'],
       input['flags'],
       input['associatedEntities'],
-      input['imageBytes'],
+      input['imageUrl'],
       input['analysis'],
       input['title'],
       input['description'],
@@ -78,7 +78,7 @@ describe('ReviewService', () => {
     beforeEach(fakeAsync(async () => {
       service.save(['abc'], ReviewDecisionType.BLOCK).subscribe();
       request = httpTestingController.expectOne('/add_reviews');
-      request.flush(['review1']);
+      request.flush({ results: [{ case_id: 'abc', review_id: 'review1' }] });
 
       snackBar = await loader.getHarness(MatSnackBarHarness);
     }));
@@ -104,7 +104,43 @@ describe('ReviewService', () => {
       expect(deleteRequest.request.body).toEqual({
         review_ids: ['review1']
       });
-      deleteRequest.flush(null);
+      deleteRequest.flush({ results: [{ review_id: 'review1' }] });
+    }));
+
+    it('should report reviews that could not be undone', fakeAsync(async () => {
+      await snackBar.dismissWithAction();
+
+      const deleteRequest = httpTestingController.expectOne('/remove_reviews');
+      deleteRequest.flush({
+        results: [{ review_id: 'review1', error: 'Too late.' }]
+      });
+
+      const errorSnackBar = await loader.getHarness(MatSnackBarHarness);
+      expect(await errorSnackBar.getMessage()).toBe(
+        '1 review decision(s) could not be undone'
+      );
+    }));
+  });
+
+  describe('when a review fails for some cases', () => {
+    it('should only offer to undo the saved reviews', fakeAsync(async () => {
+      service.save(['abc', 'def'], ReviewDecisionType.BLOCK).subscribe();
+      httpTestingController.expectOne('/add_reviews').flush({
+        results: [
+          { case_id: 'abc', review_id: 'review1' },
+          { case_id: 'def', error: 'Case def not found.' }
+        ]
+      });
+
+      const snackBar = await loader.getHarness(MatSnackBarHarness);
+      expect(await snackBar.getMessage()).toBe(
+        'Review decision saved for 1 of 2 cases'
+      );
+      await snackBar.dismissWithAction();
+
+      const deleteRequest = httpTestingController.expectOne('/remove_reviews');
+      expect(deleteRequest.request.body).toEqual({ review_ids: ['review1'] });
+      deleteRequest.flush({ results: [{ review_id: 'review1' }] });
     }));
   });
 });
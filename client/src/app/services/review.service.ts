@@ -29,6 +29,13 @@ export enum ReviewDecisionType {
   APPROVE = 2
 }
 
+/** The result of reviewing a single case, or of deleting a single review. */
+interface ReviewResult {
+  case_id?: string;
+  review_id?: string;
+  error?: string;
+}
+
 /** Service to create and manage reviews. */
 @Injectable({
   providedIn: 'root'
@@ -51,8 +58,12 @@ export class ReviewService {
       .pipe(map(ReviewStats.deserialize));
   }
 
-  private openUndoSnackBar(reviewIds: string[]) {
-    const snackBarRef = this.snackBar.open('Review decision saved', 'Undo');
+  private openUndoSnackBar(reviewIds: string[], caseCount: number) {
+    const message =
+      reviewIds.length === caseCount
+        ? 'Review decision saved'
+        : `Review decision saved for ${reviewIds.length} of ${caseCount} cases`;
+    const snackBarRef = this.snackBar.open(message, 'Undo');
 
     // Undo button pressed
     snackBarRef
@@ -70,7 +81,7 @@ export class ReviewService {
    *
    * @param caseIds: The IDs of the cases to save the review for.
    * @param decision: The decision made on the provided cases.
-   * @returns The IDs of the created reviews.
+   * @returns The IDs of the created reviews. Errors if none were created.
    */
   save(caseIds: string[], decision: ReviewDecisionType): Observable<string[]> {
     this.logger.info(
@@ -78,7 +89,7 @@ export class ReviewService {
     );
 
     return this.http
-      .post<string[]>(
+      .post<{ results: ReviewResult[] }>(
         '/add_reviews',
         {
           case_ids: caseIds,
@@ -87,9 +98,23 @@ export class ReviewService {
         ReviewService.OPTIONS
       )
       .pipe(
+        map(({ results }) => {
+          const failedCaseIds = results
+            .filter((result: ReviewResult) => result.error)
+            .map((result: ReviewResult) => result.case_id);
+          if (failedCaseIds.length) {
+            this.logger.error(`Failed to save reviews for: ${failedCaseIds}`);
+          }
+          if (failedCaseIds.length === results.length) {
+            throw new Error('No review decisions were saved');
+          }
+          return results
+            .filter((result: ReviewResult) => !result.error)
+            .map((result: ReviewResult) => result.review_id as string);
+        }),
         tap((reviewIds: string[]) => {
-          this.logger.info(`Successfully saved reviews for: ${caseIds}`);
-          this.openUndoSnackBar(reviewIds);
+          this.logger.info(`Successfully saved reviews: ${reviewIds}`);
+          this.openUndoSnackBar(reviewIds, caseIds.length);
         })
       );
   }
@@ -108,13 +133,24 @@ export class ReviewService {
     this.logger.info(`Deleting review decisions for: ${reviewIds}...`);
 
     return this.http
-      .delete<void>('/remove_reviews', {
+      .delete<{ results: ReviewResult[] }>('/remove_reviews', {
         ...ReviewService.OPTIONS,
         body: { review_ids: reviewIds }
       })
       .pipe(
-        tap(() => {
-          this.logger.info(`Successfully deleted reviews: ${reviewIds}`);
+        map(({ results }) => {
+          const failedReviewIds = results
+            .filter((result: ReviewResult) => result.error)
+            .map((result: ReviewResult) => result.review_id);
+          if (failedReviewIds.length) {
+            this.logger.error(`Failed to delete reviews: ${failedReviewIds}`);
+            this.snackBar.open(
+              `${failedReviewIds.length} review decision(s) could not be undone`,
+              'Dismiss'
+            );
+          } else {
+            this.logger.info(`Successfully deleted reviews: ${reviewIds}`);
+          }
         })
       );
   }
@@ -74,13 +74,8 @@ export class ContentDisplayComponent implements OnChanges {
           this.case.signalContent[0].contentValue
         )
       );
-    } else if (this.case.isTypeImage()) {
-      const image = new Image();
-      image.src = 'data:image/png;base64,' + this.case.imageBytes;
-      const w = window.open('about:blank');
-      if (w) {
-        w.document.write(image.outerHTML);
-      }
+    } else if (this.case.isTypeImage() && this.case.imageUrl) {
+      window.open(this.case.imageUrl);
     }
   }
 }
@@ -42,7 +42,7 @@ export const CASE = new Case(
     }
   ],
   [],
-  'imageBytes_123',
+  'api/targets/123/image',
   {},
   'Title',
   'Description',
@@ -80,7 +80,7 @@ export const IMAGE_CASE = new Case(
     }
   ],
   [],
-  'imageBytes_123',
+  'api/targets/123/image',
   {},
   'Image Title',
   'Description',
@@ -118,7 +118,7 @@ export const URL_CASE = new Case(
     }
   ],
   [],
-  'imageBytes_123',
+  'api/targets/123/image',
   {},
   'Url Title',
   'Description',
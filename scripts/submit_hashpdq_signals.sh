@@ -13,7 +13,7 @@
 # limitations under the License.
 
 # Utility script to submit all provided PDQ hashes by sending them into the
-# Signal REST API.
+# Signal REST API, in a single batch request.
 #
 # Example usage:
 #
@@ -24,26 +24,41 @@
 #
 #     PORT=1234 bash scripts/submit_hashpdq_signals.sh hash1 hash2 hash3
 
-for pdq_digest in "$@"
-do
-    echo "Submitting hash: $pdq_digest"
-    response=$(echo '{"content": {"value": "'$pdq_digest'", "type": "HASH_PDQ"}, "source": {"name": "GIFCT", "author": "JigsawTest Hash Sharing", "create_time": "'$(date -u +"%Y-%m-%dT%H:%M:%S")'"}}' | \
-        curl -s -H "Content-Type: application/json" \
-        --data-binary @- "http://localhost:${PORT:-8080}/api/signals/")
+echo "Submitting $# hashes"
+response=$(python3 -c '
+import datetime, json, sys
+create_time = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+print(json.dumps({"signals": [
+    {
+        "content": {"value": digest, "type": "HASH_PDQ"},
+        "source": {
+            "name": "GIFCT",
+            "author": "JigsawTest Hash Sharing",
+            "create_time": create_time,
+        },
+    }
+    for digest in sys.argv[1:]
+]}))
+' "$@" | \
+    curl -s -H "Content-Type: application/json" \
+    --data-binary @- "http://localhost:${PORT:-8080}/api/signals:batchCreate")
 
-    if [[ -z "$response" ]]; then
-        echo "No response. Moving on..."
-        continue
-    fi
+if [[ -z "$response" ]]; then
+    echo "No response."
+    exit 1
+fi
 
-    signal_id=$(echo $response | python3 -c "import sys, json; print(json.load(sys.stdin)['id'])")
-    if [[ -z "$signal_id" ]]; then
-        echo "Something went wrong."
-        echo $response
-        continue
-    fi
-
-    echo "Signal submitted successfully with ID: $signal_id"
-done
+echo "$response" | python3 -c '
+import json, sys
+response = json.load(sys.stdin)
+if "results" not in response:
+    sys.exit(f"Something went wrong.\n{response}")
+for digest, result in zip(sys.argv[1:], response["results"]):
+    error = result.get("error")
+    if error:
+        print("Failed to submit hash", digest, "-", error["message"])
+    else:
+        print("Submitted hash", digest, "as", result["signal_id"], result["status"])
+' "$@"
 
 echo "Done."
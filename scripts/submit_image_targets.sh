@@ -33,12 +33,12 @@ do
     echo "Submitting $f"
     random_views=$(shuf -i 0-500000 -n 1)
     random_ip=$(printf "%d.%d.%d.%d\n" "$((RANDOM % 256))" "$((RANDOM % 256))" "$((RANDOM % 256))" "$((RANDOM % 256))")
-    image_base64=$(base64 -w 0 $f)
-    echo 'Submitting {"title": "title", "description": "description", "views": '$random_views', "creator": {"ip_address": "'$random_ip'"}, "client_context": "'$CONTEXT'", "content_type": "IMAGE", "content_bytes": "'${image_base64:0:20}'..."}'
+    metadata='{"title": "title", "description": "description", "views": '$random_views', "creator": {"ip_address": "'$random_ip'"}, "client_context": "'$CONTEXT'", "content_type": "IMAGE"}'
+    echo "Submitting $metadata"
 
-    response=$(echo '{"title": "title", "description": "description", "views": '$random_views', "creator": {"ip_address": "'$random_ip'"}, "client_context": "'$CONTEXT'", "content_type": "IMAGE", "content_bytes": "'$(base64 -w 0 $f)'"}' | \
-        curl -s -H "Content-Type: application/json" \
-        --data-binary @- "http://localhost:${PORT:-8080}/api/targets/")
+    # The image is uploaded as a raw file, rather than encoded as base64 in JSON.
+    response=$(curl -s -F "metadata=$metadata" -F "content=@$f" \
+        "http://localhost:${PORT:-8080}/api/targets/")
 
     if [[ -z "$response" ]]; then
         echo "No response. Moving on..."
@@ -23,6 +23,10 @@ from werkzeug.exceptions import HTTPException
 
 from api import api_error, case, importer, json, review, review_stats, signal, target
 
+# The largest request body to accept, which fits the largest content of a target
+# encoded as base64 in JSON. Larger requests are refused before their body is read.
+MAX_REQUEST_BYTES = 4 * target.MAX_CONTENT_BYTES // 3 + 2**20
+
 _BLUEPRINTS = frozenset(
     [
         case.bp,
@@ -50,6 +54,7 @@ class Api(Flask):
           blueprints: Iterable of blueprints to register to the application.
         """
         super().__init__(import_name, **kwargs)
+        self.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
 
         self._blueprints = blueprints or _BLUEPRINTS
         for blueprint in self._blueprints:
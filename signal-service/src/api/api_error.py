@@ -16,6 +16,18 @@
 
 import http
 
+# The schema of the error of an item in the results of a batch request.
+BATCH_ERROR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "code": {"type": "integer"},
+        "message": {"type": "string"},
+        "status": {"type": "string"},
+    },
+    "required": ["code", "message", "status"],
+    "additionalProperties": False,
+}
+
 
 class ApiError(Exception):
     """Exception raised for errors in API calls."""
@@ -14,23 +14,25 @@
 
 """API view for the Case resource."""
 
+import enum
 import http
 import logging
 import urllib
-from typing import Any
+from typing import Any, Iterable
 
 from bson.objectid import ObjectId
 from flask import Blueprint, request
 from mongoengine import ValidationError
 from mongoengine.queryset.visitor import Q
 
-from api import review
+from api import review, signal, target
 from api.api_error import ApiError
 from api.validation import Validator
 from models.case import Case
 from models.signal import Signal
 from models.target import Target
 from prioritization import case_priority
+from taskqueue import tasks
 from utils import cursor
 
 _CASE_SCHEMA = {
@@ -87,10 +89,21 @@ _CASE_SCHEMA = {
             },
         },
         "notes": {"type": ["string", "null"], "maxLength": 1000},
+        "signals": {"type": "array", "items": signal.SIGNAL_SCHEMA},
+        "target": target.TARGET_SCHEMA,
     },
     "additionalProperties": False,
 }
 
+
+@enum.unique
+class _Expansion(str, enum.Enum):
+    """Related entities that can be inlined into cases with the `expand` parameter."""
+
+    SIGNALS = "signals"
+    TARGET = "target"
+
+
 bp = Blueprint("Case", __name__, url_prefix="/cases/")
 
 
@@ -176,7 +189,8 @@ def _get(case_id: str):
             http.HTTPStatus.NOT_FOUND, message=f"Case {case_id} not found."
         ) from e
 
-    return _to_dict(case)
+    _refresh_stale_priorities([case])
+    return _expand([case], _parse_expansions(request.args.getlist("expand")))[0]
 
 
 @bp.get("/")
@@ -204,7 +218,11 @@ def _get(case_id: str):
     },
 )
 def _list():
-    """Returns a list of cases.
+    """Returns a page of cases, in order of priority.
+
+    Pages are found with keyset pagination on the `(cached_priority, id)` index: the
+    cursor tokens hold the sort key of the first or last case of a page, and one more
+    case than requested is fetched to find out whether there is another page.
 
     Returns:
         A list of case dictionaries.
@@ -212,7 +230,8 @@ def _list():
     query_string = urllib.parse.urlparse(request.url).query
     filters = urllib.parse.parse_qs(query_string)
     page_size = int(filters["page_size"][0]) if "page_size" in filters else None
-    cases = Case.objects().order_by("-cached_priority", "id")
+    expansions = _parse_expansions(filters.get("expand", []))
+    cases = Case.objects()
     response = {}
 
     if "state" in filters:
@@ -222,84 +241,73 @@ def _list():
         signal_ids_to_find = filters["signal_id"]
         cases = cases(signal_ids__in=signal_ids_to_find)
 
-    response["total_count"] = cases.count()
+    # Counting all matching cases is the most expensive part of a page, so clients
+    # that don't show the total can opt out of it.
+    if filters.get("include_total_count", ["true"])[0].lower() != "false":
+        response["total_count"] = cases.count()
 
     if "next_cursor_token" in filters and "previous_cursor_token" in filters:
         raise ApiError(
             http.HTTPStatus.BAD_REQUEST,
             message="Only one cursor token should be provided.",
         )
-    if "next_cursor_token" in filters:
-        next_cursor_token = filters["next_cursor_token"][0]
-        try:
-            next_cursor = cursor.decode_cursor(next_cursor_token)
-        except Exception as e:
-            raise ApiError(
-                http.HTTPStatus.BAD_REQUEST, message=f"Invalid cursor format: {e}"
-            ) from e
-        token_id, token_priority = (
-            next_cursor["token_id"],
-            next_cursor["token_priority"],
+    is_previous_page = "previous_cursor_token" in filters
+    if is_previous_page:
+        token_priority, token_id = _decode_cursor_token(
+            filters["previous_cursor_token"][0]
         )
+        # Walk backwards from the cursor and reverse the page afterwards.
+        cases = cases(
+            Q(cached_priority__gt=token_priority)
+            | (Q(cached_priority=token_priority) & Q(id__lt=token_id))
+        ).order_by("cached_priority", "-id")
+    elif "next_cursor_token" in filters:
+        token_priority, token_id = _decode_cursor_token(filters["next_cursor_token"][0])
         cases = cases(
             Q(cached_priority__lt=token_priority)
             | (Q(cached_priority=token_priority) & Q(id__gt=token_id))
-        ).limit(page_size)
+        ).order_by("-cached_priority", "id")
+    else:
+        cases = cases.order_by("-cached_priority", "id")
+
+    if page_size is not None:
+        cases = cases.limit(page_size + 1)
+    page = list(cases)
+    has_more = page_size is not None and len(page) > page_size
+    page = page[:page_size]
+    if is_previous_page:
+        page.reverse()
+
+    if page:
+        # Coming from a cursor means that there is a page on the other side of it.
+        if is_previous_page:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, "next_cursor_token" in filters
+        if has_next:
+            response["next_cursor_token"] = _encode_cursor_token(page[-1])
+        if has_previous:
+            response["previous_cursor_token"] = _encode_cursor_token(page[0])
+    _refresh_stale_priorities(page)
+    response["data"] = _expand(page, expansions)
+    return response
 
-    elif "previous_cursor_token" in filters:
-        previous_cursor_token = filters["previous_cursor_token"][0]
-        try:
-            previous_cursor = cursor.decode_cursor(previous_cursor_token)
-        except Exception as e:
-            raise ApiError(
-                http.HTTPStatus.BAD_REQUEST, message=f"Invalid cursor format: {e}"
-            ) from e
-        token_id, token_priority = (
-            previous_cursor["token_id"],
-            previous_cursor["token_priority"],
-        )
 
-        # Move order by outside of if statements to reduce duplicate code
-        cases = cases(
-            Q(cached_priority__gt=token_priority)
-            | (Q(cached_priority=token_priority) & Q(id__lt=token_id))
-        )
-        # Get the last page_size cases
-        cases = cases[cases.count() - page_size :]
+def _encode_cursor_token(case: Case) -> str:
+    return cursor.encode_cursor(
+        {"token_id": str(case.id), "token_priority": case.cached_priority}
+    )
 
-    else:
-        cases = cases.limit(page_size)
-
-    if cases:
-        count = cases.count(with_limit_and_skip=True)
-        last_case = cases[count - 1]
-        last_case_id, last_case_priority = (
-            last_case.id,
-            last_case.priority,
-        )
 
-        if Case.objects(
-            Q(cached_priority__lt=last_case_priority)
-            | (Q(cached_priority=last_case_priority) & Q(id__gt=last_case_id))
-        ).first():
-            next_cursor = {
-                "token_id": str(last_case_id),
-                "token_priority": last_case_priority,
-            }
-            response["next_cursor_token"] = cursor.encode_cursor(next_cursor)
-        first_case = cases[0]
-        first_case_id, first_case_priority = first_case.id, first_case.priority
-        if Case.objects(
-            Q(cached_priority__gt=first_case_priority)
-            | (Q(cached_priority=first_case_priority) & Q(id__lt=first_case_id))
-        ).first():
-            previous_cursor = {
-                "token_id": str(first_case_id),
-                "token_priority": first_case_priority,
-            }
-            response["previous_cursor_token"] = cursor.encode_cursor(previous_cursor)
-    response["data"] = [_to_dict(v) for v in cases]
-    return response
+def _decode_cursor_token(token: str) -> tuple[int, ObjectId]:
+    """Returns the priority and ID of the case that a cursor token points at."""
+    try:
+        decoded_cursor = cursor.decode_cursor(token)
+        return decoded_cursor["token_priority"], ObjectId(decoded_cursor["token_id"])
+    except Exception as e:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST, message=f"Invalid cursor format: {e}"
+        ) from e
 
 
 @bp.patch("/<case_id>")
@@ -339,16 +347,70 @@ def _update(case_id: str):
     return _to_dict(case), http.HTTPStatus.OK
 
 
+def _parse_expansions(values: Iterable[str]) -> set[_Expansion]:
+    """Parses the values of `expand` parameters, which may be comma-separated."""
+    try:
+        return {
+            _Expansion(name.strip())
+            for value in values
+            for name in value.split(",")
+            if name.strip()
+        }
+    except ValueError as e:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST,
+            message="Invalid expand value, expected any of "
+            f"{[x.value for x in _Expansion]}.",
+        ) from e
+
+
+def _expand(cases: list[Case], expansions: set[_Expansion]) -> list[dict[str, Any]]:
+    """Converts cases to dictionaries with the requested related entities inlined.
+
+    The related entities of all cases are loaded at once, with a single query for
+    each type of entity.
+    """
+    results = [_to_dict(case) for case in cases]
+    if _Expansion.SIGNALS in expansions:
+        signal_ids = {signal_id for case in cases for signal_id in case.signal_ids}
+        signals = Signal.objects.in_bulk(list(signal_ids))
+        for case, result in zip(cases, results):
+            result["signals"] = [
+                signal.to_dict(signals[signal_id])
+                for signal_id in case.signal_ids
+                if signal_id in signals
+            ]
+    if _Expansion.TARGET in expansions:
+        targets = Target.objects.exclude(*target.IMAGE_DATA_FIELDS).in_bulk(
+            [case.target_id for case in cases if case.target_id]
+        )
+        for case, result in zip(cases, results):
+            if case.target_id in targets:
+                result["target"] = target.to_dict(targets[case.target_id])
+    return results
+
+
+def _refresh_stale_priorities(cases: Iterable[Case]) -> None:
+    """Recalculates outdated cached priorities in the background.
+
+    Cases are served with their cached priorities in the meantime, so that reading
+    them never has to load their signals.
+    """
+    stale_case_ids = [str(case.id) for case in cases if case.is_priority_stale]
+    if stale_case_ids:
+        tasks.update_case_priorities.delay(case_ids=stale_case_ids)
+
+
 def _to_dict(case: Case) -> dict[str, Any]:
     result = {
         "id": str(case.id),
         "signal_ids": [str(id) for id in case.signal_ids],
         "create_time": case.create_time,
         "state": case.state,
-        "priority": case.priority,
-        "priority_level": case.priority_level,
-        "confidence": case.confidence_level,
-        "severity": case.severity_level,
+        "priority": case.cached_priority if case.cached_priority is not None else -1,
+        "priority_level": case.cached_priority_level,
+        "confidence": case.cached_confidence_level,
+        "severity": case.cached_severity_level,
         "notes": case.notes,
     }
     if case.target_id:
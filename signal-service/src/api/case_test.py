@@ -23,6 +23,7 @@ from unittest import mock
 
 from absl.testing import absltest, parameterized
 from bson.objectid import ObjectId
+from mongoengine.queryset import QuerySet
 
 from api.case import bp as case_bp
 from models.case import Case
@@ -30,7 +31,12 @@ from models.signal import Content, Signal, Source, Sources
 from models.target import FeatureSet, Target
 from prioritization import case_priority
 from testing.test_case import ApiTestCase
-from testing.test_entities import TEST_CASE, TEST_CASE_SPARSE_DATA
+from testing.test_entities import (
+    TEST_CASE,
+    TEST_CASE_SPARSE_DATA,
+    TEST_SIGNAL,
+    TEST_TARGET,
+)
 from utils import cursor
 
 
@@ -605,6 +611,125 @@ class CaseAPITest(parameterized.TestCase, ApiTestCase):
         )
         self.assertNotIn("previous_cursor_token", observed_response.json)
 
+    def test_get_cases_without_total_count(self):
+        copy.deepcopy(TEST_CASE).save()
+
+        observed_response = self.get("/cases/?include_total_count=false")
+
+        self.assertLen(observed_response.json["data"], 1)
+        self.assertNotIn("total_count", observed_response.json)
+
+    def test_get_cases_paginated_previous_to_first_page(self):
+        """Tests if /cases/ omits the previous cursor on the first page."""
+        cases = []
+        for i in range(3):
+            case = copy.deepcopy(TEST_CASE_SPARSE_DATA)
+            case.id = ObjectId(f"aaaaaaaaaaaaaaaaaaaaaaa{i}")
+            cases.append(case.save())
+
+        raw_cursor = {"token_id": str(cases[2].id), "token_priority": -1}
+        encoded_cursor = cursor.encode_cursor(raw_cursor)
+        observed_response = self.get(
+            f"/cases/?previous_cursor_token={encoded_cursor}&page_size={2}"
+        )
+
+        self.assertEqual(
+            [str(cases[0].id), str(cases[1].id)],
+            [case["id"] for case in observed_response.json["data"]],
+        )
+        self.assertNotIn("previous_cursor_token", observed_response.json)
+        self.assertEqual(
+            {"token_id": str(cases[1].id), "token_priority": -1},
+            cursor.decode_cursor(observed_response.json["next_cursor_token"]),
+        )
+
+    def test_get_case_serves_cached_priority_and_refreshes_stale_case(self):
+        case = copy.deepcopy(TEST_CASE_SPARSE_DATA).save()
+        Case.objects(id=case.id).update(
+            set__cached_priority=7, unset__cached_priority_version=True
+        )
+
+        with mock.patch.object(
+            case_priority,
+            "calculate_confidence",
+            wraps=case_priority.calculate_confidence,
+        ) as mock_calculate_confidence:
+            observed_response = self.get(f"/cases/{case.id}")
+
+        self.assertEqual(7, observed_response.json["priority"])
+        self.assertEqual("HIGH", observed_response.json["priority_level"])
+        # The priority is only recalculated in the background.
+        mock_calculate_confidence.assert_called_once()
+        case.reload()
+        self.assertEqual(-1, case.cached_priority)
+        self.assertFalse(case.is_priority_stale)
+
+    def test_list_cases_does_not_calculate_fresh_priorities(self):
+        for _ in range(3):
+            copy.deepcopy(TEST_CASE_SPARSE_DATA).save()
+
+        with mock.patch.object(
+            case_priority, "calculate_confidence"
+        ) as mock_calculate_confidence:
+            observed_response = self.get("/cases/")
+
+        self.assertLen(observed_response.json["data"], 3)
+        mock_calculate_confidence.assert_not_called()
+
+    def test_list_cases_expands_signals_and_target(self):
+        copy.deepcopy(TEST_SIGNAL).save()
+        target = copy.deepcopy(TEST_TARGET).save()
+        case = copy.deepcopy(TEST_CASE_SPARSE_DATA)
+        case.target_id = target.id
+        case.save()
+
+        observed_response = self.get("/cases/?expand=signals,target")
+
+        observed_case = observed_response.json["data"][0]
+        self.assertEqual(
+            [str(TEST_SIGNAL.id)], [s["id"] for s in observed_case["signals"]]
+        )
+        self.assertEqual(str(target.id), observed_case["target"]["id"])
+        self.assertEqual("Title", observed_case["target"]["title"])
+        self.assertEqual(
+            f"/targets/{target.id}/image", observed_case["target"]["image_url"]
+        )
+
+    def test_get_case_expands_target(self):
+        target = copy.deepcopy(TEST_TARGET).save()
+        case = copy.deepcopy(TEST_CASE_SPARSE_DATA)
+        case.target_id = target.id
+        case.save()
+
+        observed_response = self.get(f"/cases/{case.id}?expand=target")
+
+        self.assertEqual(str(target.id), observed_response.json["target"]["id"])
+        self.assertNotIn("signals", observed_response.json)
+
+    def test_list_cases_expands_related_entities_with_one_query_each(self):
+        copy.deepcopy(TEST_SIGNAL).save()
+        target = copy.deepcopy(TEST_TARGET).save()
+        for _ in range(3):
+            case = copy.deepcopy(TEST_CASE_SPARSE_DATA)
+            case.target_id = target.id
+            case.save()
+
+        with mock.patch.object(
+            QuerySet, "in_bulk", autospec=True, side_effect=QuerySet.in_bulk
+        ) as mock_in_bulk:
+            observed_response = self.get("/cases/?expand=signals,target")
+
+        self.assertLen(observed_response.json["data"], 3)
+        self.assertEqual(2, mock_in_bulk.call_count)
+
+    def test_list_cases_invalid_expand_raises(self):
+        self.get(
+            "/cases/?expand=foobar",
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="Invalid expand value, expected any of "
+            "['signals', 'target'].",
+        )
+
 
 if __name__ == "__main__":
     absltest.main()
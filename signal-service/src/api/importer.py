@@ -25,7 +25,7 @@ from api.api_error import ApiError
 from api.validation import Validator
 from importers.importer import PreCheckError
 from models.importer import Credential, ImporterConfig
-from models.job import Job
+from models.job import Job, JobStats
 
 _IMPORTER_SCHEMA = {
     "type": "object",
@@ -47,6 +47,7 @@ _IMPORTER_SCHEMA = {
             "format": "date-time",
         },
         "total_import_count": {"type": "number"},
+        "page_size": {"type": ["integer", "null"]},
         "credential": {
             "type": "object",
             "properties": {
@@ -85,6 +86,7 @@ bp = Blueprint("Importer", __name__, url_prefix="/importers/")
                 "type": "string",
                 "enum": ["ACTIVE", "INACTIVE"],
             },
+            "page_size": {"type": "integer", "minimum": 1},
             "credential": {
                 "type": "object",
                 "properties": {
@@ -112,6 +114,7 @@ def _create():
         type=request.json.get("type"),
         state=state,
         diagnostics_state=diagnostics_state,
+        page_size=request.json.get("page_size"),
         credential=Credential(
             identifier=request.json.get("credential").get("identifier"),
             token=request.json.get("credential").get("token"),
@@ -189,27 +192,14 @@ def _delete(importer_type: str):
 
 
 def _to_dict(importer: ImporterConfig) -> dict[str, Any]:
-    last_job = Job.objects(source=importer.type.value).order_by("-start_time").first()
-    aggregation_pipeline = Job.objects(source=importer.type.value).aggregate(
-        [
-            {
-                "$group": {
-                    "_id": "null",
-                    "totalImportSize": {"$sum": "$import_size"},
-                }
-            },
-        ]
-    )
-    try:
-        import_count = next(aggregation_pipeline)["totalImportSize"]
-    except StopIteration:
-        import_count = 0
+    stats = JobStats.get(Job.JobSource(importer.type.value))
     return {
         "type": importer.type,
         "state": importer.state,
         "diagnostics_state": importer.diagnostics_state,
-        "last_run_time": last_job.start_time if last_job else None,
-        "total_import_count": import_count,
+        "last_run_time": stats.last_start_time,
+        "total_import_count": stats.import_size,
+        "page_size": importer.page_size,
         "credential": {
             "identifier": importer.credential.identifier,
             # TODO: Consider obfuscating the token here?
@@ -102,6 +102,7 @@ class ImporterAPITest(parameterized.TestCase, ApiTestCase):
                 },
                 "last_run_time": "2024-06-12T00:00:00+00:00",
                 "total_import_count": 16,
+                "page_size": None,
             },
             observed_response.json,
         )
@@ -17,11 +17,13 @@
 
 import datetime
 import enum
+from unittest import mock
 
 from absl.testing import absltest
 
 import api
 from api.json import JSONProvider
+from utils import json
 
 
 class JSONProviderTest(absltest.TestCase):
@@ -33,12 +35,21 @@ class JSONProviderTest(absltest.TestCase):
     def test_encode_primitive(self):
         self.assertEqual('"hello world"', self.json_provider.dumps("hello world"))
 
+    @mock.patch.object(json, "BACKEND", json.Backend.STDLIB)
     def test_encode_object(self):
         self.assertEqual(
             '{"foo": "bar", "baz": 123}',
             self.json_provider.dumps({"foo": "bar", "baz": 123}),
         )
 
+    @absltest.skipIf(json.orjson is None, "orjson is not installed")
+    @mock.patch.object(json, "BACKEND", json.Backend.ORJSON)
+    def test_encode_object_with_orjson(self):
+        self.assertEqual(
+            '{"foo":"bar","baz":123}',
+            self.json_provider.dumps({"foo": "bar", "baz": 123}),
+        )
+
     def test_encode_datetime(self):
         date = datetime.datetime(1955, 11, 5, 6, 15, tzinfo=datetime.timezone.utc)
 
@@ -14,18 +14,22 @@
 
 """API view for the Review resource."""
 
+import collections
 import http
+import itertools
 import json
 import logging
-from typing import Any
+from typing import Any, Iterable
 
+import pymongo
+from bson.objectid import ObjectId
 from flask import Blueprint, request
 from mongoengine import ValidationError
 
-from api.api_error import ApiError
+from api.api_error import BATCH_ERROR_SCHEMA, ApiError
 from api.validation import Validator
-from models.case import Case, Review
-from taskqueue import tasks
+from models.case import Case, Review, ReviewStats
+from utils import case_events
 
 _REVIEW_SCHEMA = {
     "type": "object",
@@ -43,8 +47,8 @@ _REVIEW_SCHEMA = {
 
 bp = Blueprint("Review", __name__)
 
-
-DRAFT_TO_PUBLISH_DELAY_SEC = 60
+# The maximum number of reviews that can be created or deleted in a single request.
+MAX_BATCH_SIZE = 1000
 
 
 @bp.post("/cases/<case_id>/reviews/")
@@ -76,14 +80,11 @@ def _create(case_id: str):
 
     decision = Review.Decision[request.json.get("decision")]
     review = Review(state=Review.State.DRAFT, decision=decision)
+    old_stats_key = case.review_stats_key
     case.review_history.append(review)
     case.save()
+    ReviewStats.record(old_stats_key, case.review_stats_key)
     logging.info("Created %s review for %s", decision.value, case_id)
-
-    tasks.publish_review.apply_async(
-        kwargs={"case_id": str(case.id), "review_id": str(review.id)},
-        countdown=DRAFT_TO_PUBLISH_DELAY_SEC,
-    )
     return to_dict(review), http.HTTPStatus.CREATED
 
 
@@ -132,11 +133,245 @@ def _delete(review_id: str, case_id: str | None = None):
             message=f"Review {review_id} not found on case {case_id}.",
         )
 
+    old_stats_key = case.review_stats_key
     case.review_history = filtered_reviews
     case.save()
+    ReviewStats.record(old_stats_key, case.review_stats_key)
     return json.dumps(None), http.HTTPStatus.NO_CONTENT
 
 
+@bp.post("/reviews:batchCreate")
+@Validator(
+    input_schema={
+        "title": "Reviews BatchCreate API input schema",
+        "type": "object",
+        "properties": {
+            "case_ids": {
+                "type": "array",
+                "items": {"type": "string"},
+                "minItems": 1,
+                "maxItems": MAX_BATCH_SIZE,
+            },
+            "decision": {
+                "type": "string",
+                "enum": [x.name for x in Review.Decision],
+            },
+        },
+        "required": ["case_ids", "decision"],
+        "additionalProperties": False,
+    },
+    output_schema={
+        "title": "Reviews BatchCreate API output schema",
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "case_id": {"type": "string"},
+                        "review": _REVIEW_SCHEMA,
+                        "error": BATCH_ERROR_SCHEMA,
+                    },
+                    "required": ["case_id"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+)
+def _batch_create():
+    """Creates a review with the same decision on each of the given cases.
+
+    The reviews are added with a single bulk write, which skips recalculating the
+    priorities of the cases. Cases that cannot be reviewed get an error in the results
+    rather than failing the request.
+    """
+    case_ids = list(dict.fromkeys(request.json.get("case_ids")))
+    decision = Review.Decision[request.json.get("decision")]
+    # Only the latest review is needed to update the state and stats of a case.
+    cases = {
+        str(case.id): case
+        for case in Case.objects(id__in=_to_object_ids(case_ids))
+        .only("state", "review_history")
+        .fields(slice__review_history=-1)
+    }
+
+    results = []
+    operations = []
+    stats_changes = []
+    for case_id in case_ids:
+        case = cases.get(case_id)
+        if case is None:
+            error = ApiError(
+                http.HTTPStatus.NOT_FOUND, message=f"Case {case_id} not found."
+            )
+            results.append({"case_id": case_id} | error.to_dict())
+            continue
+
+        review = Review(state=Review.State.DRAFT, decision=decision)
+        review.validate()
+        old_stats_key = case.review_stats_key
+        case.review_history.append(review)
+        case.state = case.review_state
+        operations.append(
+            pymongo.UpdateOne(
+                {"_id": case.id},
+                {
+                    "$push": {"review_history": review.to_mongo()},
+                    "$set": {"state": case.state.value},
+                },
+            )
+        )
+        stats_changes.append((old_stats_key, case.review_stats_key))
+        results.append({"case_id": case_id, "review": to_dict(review)})
+
+    if operations:
+        # pylint: disable-next=protected-access
+        Case._get_collection().bulk_write(operations, ordered=False)
+        ReviewStats.record_all(stats_changes)
+        case_events.publish(
+            result["case_id"] for result in results if "review" in result
+        )
+    logging.info("Created %d %s reviews", len(operations), decision.value)
+    return {"results": results}
+
+
+@bp.post("/reviews:batchDelete")
+@Validator(
+    input_schema={
+        "title": "Reviews BatchDelete API input schema",
+        "type": "object",
+        "properties": {
+            "review_ids": {
+                "type": "array",
+                "items": {"type": "string"},
+                "minItems": 1,
+                "maxItems": MAX_BATCH_SIZE,
+            },
+        },
+        "required": ["review_ids"],
+        "additionalProperties": False,
+    },
+    output_schema={
+        "title": "Reviews BatchDelete API output schema",
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "review_id": {"type": "string"},
+                        "error": BATCH_ERROR_SCHEMA,
+                    },
+                    "required": ["review_id"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+)
+def _batch_delete():
+    """Deletes the given draft reviews.
+
+    The reviews are removed with a single bulk write. Reviews that cannot be deleted
+    get an error in the results rather than failing the request.
+    """
+    review_ids = list(dict.fromkeys(request.json.get("review_ids")))
+    reviews = {
+        str(review.id): (case, review)
+        for case in Case.objects(
+            review_history__id__in=_to_object_ids(review_ids)
+        ).only("state", "review_history")
+        for review in case.review_history
+    }
+
+    errors = {}
+    old_stats_keys = {}
+    deleted_ids = collections.defaultdict(list)
+    for review_id in review_ids:
+        case, review = reviews.get(review_id, (None, None))
+        if review is None:
+            errors[review_id] = ApiError(
+                http.HTTPStatus.NOT_FOUND, message=f"Review {review_id} not found."
+            )
+        elif review.state != Review.State.DRAFT:
+            errors[review_id] = _cannot_delete_error(review_id, case.id)
+        else:
+            old_stats_keys.setdefault(case.id, case.review_stats_key)
+            case.review_history.remove(review)
+            deleted_ids[case.id].append(review.id)
+
+    operations = []
+    for case_id, case_review_ids in deleted_ids.items():
+        case, _ = reviews[str(case_review_ids[0])]
+        case.state = case.review_state
+        operations.append(
+            pymongo.UpdateOne(
+                # The case is only changed if all of the reviews are still drafts, as
+                # they may have been published in the meantime.
+                {
+                    "_id": case_id,
+                    "review_history": {
+                        "$all": [
+                            {
+                                "$elemMatch": {
+                                    "_id": review_id,
+                                    "state": Review.State.DRAFT.value,
+                                }
+                            }
+                            for review_id in case_review_ids
+                        ]
+                    },
+                },
+                {
+                    "$pull": {"review_history": {"_id": {"$in": case_review_ids}}},
+                    "$set": {"state": case.state.value},
+                },
+            )
+        )
+    if operations:
+        # pylint: disable-next=protected-access
+        result = Case._get_collection().bulk_write(operations, ordered=False)
+        if result.matched_count < len(operations):
+            # The cases that weren't changed still have the reviews.
+            for case in Case.objects(
+                review_history__id__in=list(itertools.chain(*deleted_ids.values()))
+            ).only("id"):
+                for review_id in deleted_ids.pop(case.id, []):
+                    errors[str(review_id)] = _cannot_delete_error(review_id, case.id)
+        ReviewStats.record_all(
+            (old_stats_keys[case_id], reviews[str(ids[0])][0].review_stats_key)
+            for case_id, ids in deleted_ids.items()
+        )
+        case_events.publish(deleted_ids)
+    logging.info("Deleted %d reviews", sum(len(ids) for ids in deleted_ids.values()))
+    return {
+        "results": [
+            {"review_id": review_id} | errors[review_id].to_dict()
+            if review_id in errors
+            else {"review_id": review_id}
+            for review_id in review_ids
+        ]
+    }
+
+
+def _cannot_delete_error(review_id: Any, case_id: Any) -> ApiError:
+    return ApiError(
+        http.HTTPStatus.METHOD_NOT_ALLOWED,
+        message=f"Review {review_id} on case {case_id} cannot be deleted.",
+    )
+
+
+def _to_object_ids(ids: Iterable[str]) -> list[ObjectId]:
+    return [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+
+
 def to_dict(review: Review) -> dict[str, Any]:
     result = {"id": str(review.id), "create_time": review.create_time}
     if review.decision:
@@ -18,12 +18,10 @@ The ReviewStats resource is a read-only singleton resource (see http://aip.dev/1
 with a single `Users` resource parent.
 """
 
-import collections
-
 from flask import Blueprint
 
 from api.validation import Validator
-from models.case import Case, Review
+from models.case import ReviewStats
 
 bp = Blueprint("ReviewStats", __name__, url_prefix="/cases/review_stats")
 
@@ -52,17 +50,13 @@ bp = Blueprint("ReviewStats", __name__, url_prefix="/cases/review_stats")
 )
 def _get():
     """Get the summary statistics for reviews."""
-    all_cases = Case.objects(review_history__exists=True)
-    counter = collections.Counter(
-        (case.latest_review.decision for case in all_cases if case.latest_review)
-    )
-
+    stats = ReviewStats.get()
     return {
-        "count_approved": counter[Review.Decision.APPROVE],
-        "count_removed": counter[Review.Decision.BLOCK],
+        "count_approved": stats.count_approved,
+        "count_removed": stats.count_removed,
         # TODO - even Cases that have a Review are considered
         # "ACTIVE", not sure if that's a bug, but it makes this number
         # unintuitive (ie something can be approved and active at the same
         # time).
-        "count_active": Case.objects(state=Case.State.ACTIVE).count(),
+        "count_active": stats.count_active,
     }
@@ -26,10 +26,11 @@ import requests
 from absl.testing import absltest
 
 from api import review as review_api
-from models.case import Case, Review
+from models.case import Case, Review, ReviewStats
 from models.target import FeatureSet, Target
 from testing.test_case import ApiTestCase
 from testing.test_entities import TEST_CASE
+from utils import case_events
 
 
 def _make_response(
@@ -76,13 +77,10 @@ class ReviewAPITest(ApiTestCase):
             },
             response.json,
         )
-        review_id = response.json["id"]
-        observed_delivery_status = (
-            Case.objects.get(id=case.id)
-            .review_history.get(id=review_id)
-            .delivery_status
-        )
-        self.assertEqual(observed_delivery_status, Review.DeliveryStatus.ACCEPTED)
+        review = Case.objects.get(id=case.id).review_history.get(id=response.json["id"])
+        # Drafts are published and delivered later, once they can't be deleted anymore.
+        self.assertEqual(review.state, Review.State.DRAFT)
+        self.assertEqual(review.delivery_status, Review.DeliveryStatus.PENDING)
 
     def test_create_review_for_unknown_case_fails(self):
         self.post(
@@ -106,6 +104,28 @@ class ReviewAPITest(ApiTestCase):
         case.reload()
         self.assertEmpty(case.review_history)
 
+    def test_create_and_delete_review_update_stats(self):
+        case = copy.deepcopy(TEST_CASE)
+        case.review_history = []
+        case.save()
+        Target(id=case.target_id, feature_set=FeatureSet()).save()
+        ReviewStats.get()
+
+        response = self.post(
+            f"/cases/{case.id}/reviews/",
+            json={"decision": "BLOCK"},
+            expected_status=http.HTTPStatus.CREATED,
+        )
+        stats = ReviewStats.get()
+        self.assertEqual((stats.count_removed, stats.count_active), (1, 0))
+
+        self.delete(
+            f"/cases/{case.id}/reviews/{response.json['id']}",
+            expected_status=http.HTTPStatus.NO_CONTENT,
+        )
+        stats = ReviewStats.get()
+        self.assertEqual((stats.count_removed, stats.count_active), (0, 1))
+
     def test_delete_published_draft_fails(self):
         case = copy.deepcopy(TEST_CASE)
         review = Review(state=Review.State.PUBLISHED)
@@ -146,6 +166,217 @@ class ReviewAPITest(ApiTestCase):
             expected_message="Review foobar not found.",
         )
 
+    def test_batch_create_reviews(self):
+        active_case = copy.deepcopy(TEST_CASE)
+        active_case.review_history = []
+        active_case.save()
+        reviewed_case = copy.deepcopy(TEST_CASE)
+        reviewed_case.id = None
+        reviewed_case.save()
+        Target(id=TEST_CASE.target_id, feature_set=FeatureSet()).save()
+        ReviewStats.get()
+
+        response = self.post(
+            "/reviews:batchCreate",
+            json={
+                "case_ids": [
+                    str(active_case.id),
+                    "foobar",
+                    str(reviewed_case.id),
+                    str(active_case.id),
+                ],
+                "decision": "BLOCK",
+            },
+        )
+
+        self.assertEqual(
+            {
+                "results": [
+                    {
+                        "case_id": str(active_case.id),
+                        "review": {
+                            "id": mock.ANY,
+                            "create_time": mock.ANY,
+                            "decision": "BLOCK",
+                        },
+                    },
+                    {
+                        "case_id": "foobar",
+                        "error": {
+                            "code": 404,
+                            "message": "Case foobar not found.",
+                            "status": "Not Found",
+                        },
+                    },
+                    {
+                        "case_id": str(reviewed_case.id),
+                        "review": {
+                            "id": mock.ANY,
+                            "create_time": mock.ANY,
+                            "decision": "BLOCK",
+                        },
+                    },
+                ]
+            },
+            response.json,
+        )
+        for case in (active_case.reload(), reviewed_case.reload()):
+            self.assertEqual(case.state, Case.State.RESOLVED)
+            self.assertEqual(case.latest_review.decision, Review.Decision.BLOCK)
+            self.assertEqual(case.latest_review.state, Review.State.DRAFT)
+        self.assertLen(reviewed_case.review_history, 2)
+        stats = ReviewStats.get()
+        self.assertEqual(
+            (stats.count_approved, stats.count_removed, stats.count_active), (0, 2, 0)
+        )
+
+    @mock.patch.object(case_events, "publish", autospec=True)
+    def test_batch_create_reviews_publishes_changes(self, mock_publish):
+        case = copy.deepcopy(TEST_CASE).save()
+        mock_publish.reset_mock()
+
+        self.post(
+            "/reviews:batchCreate",
+            json={"case_ids": [str(case.id), "foobar"], "decision": "BLOCK"},
+        )
+
+        mock_publish.assert_called_once()
+        self.assertEqual([str(case.id)], list(mock_publish.call_args.args[0]))
+
+    def test_batch_create_reviews_without_cases_fails(self):
+        self.post(
+            "/reviews:batchCreate",
+            json={"case_ids": [], "decision": "BLOCK"},
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+        )
+
+    def test_batch_delete_reviews(self):
+        case = copy.deepcopy(TEST_CASE)
+        published_review = case.review_history[0]
+        draft_review = Review(state=Review.State.DRAFT, decision=Review.Decision.BLOCK)
+        case.review_history.append(draft_review)
+        case.save()
+        other_case = copy.deepcopy(TEST_CASE)
+        other_case.id = None
+        other_draft_review = Review(
+            state=Review.State.DRAFT, decision=Review.Decision.BLOCK
+        )
+        other_case.review_history = [other_draft_review]
+        other_case.save()
+        ReviewStats.get()
+
+        response = self.post(
+            "/reviews:batchDelete",
+            json={
+                "review_ids": [
+                    str(draft_review.id),
+                    str(published_review.id),
+                    str(other_draft_review.id),
+                    "foobar",
+                ]
+            },
+        )
+
+        self.assertEqual(
+            {
+                "results": [
+                    {"review_id": str(draft_review.id)},
+                    {
+                        "review_id": str(published_review.id),
+                        "error": {
+                            "code": 405,
+                            "message": f"Review {published_review.id} on case "
+                            f"{case.id} cannot be deleted.",
+                            "status": "Method Not Allowed",
+                        },
+                    },
+                    {"review_id": str(other_draft_review.id)},
+                    {
+                        "review_id": "foobar",
+                        "error": {
+                            "code": 404,
+                            "message": "Review foobar not found.",
+                            "status": "Not Found",
+                        },
+                    },
+                ]
+            },
+            response.json,
+        )
+        case.reload()
+        self.assertEqual(
+            [review.id for review in case.review_history], [published_review.id]
+        )
+        self.assertEqual(case.state, Case.State.RESOLVED)
+        other_case.reload()
+        self.assertEmpty(other_case.review_history)
+        self.assertEqual(other_case.state, Case.State.ACTIVE)
+        stats = ReviewStats.get()
+        self.assertEqual(
+            (stats.count_approved, stats.count_removed, stats.count_active), (1, 0, 1)
+        )
+
+    def test_batch_delete_reviews_published_meanwhile_are_kept(self):
+        case = copy.deepcopy(TEST_CASE)
+        case.id = None
+        draft_review = Review(state=Review.State.DRAFT, decision=Review.Decision.BLOCK)
+        case.review_history = [draft_review]
+        case.save()
+        old_state = case.state
+        stats = ReviewStats.get()
+        old_counts = (stats.count_approved, stats.count_removed, stats.count_active)
+        review_state = Case.review_state
+
+        def publish_meanwhile(case_to_delete_from):
+            Case.objects(id=case.id, review_history__id=draft_review.id).update_one(
+                set__review_history__S__state=Review.State.PUBLISHED
+            )
+            return review_state.fget(case_to_delete_from)
+
+        with mock.patch.object(Case, "review_state", property(publish_meanwhile)):
+            response = self.post(
+                "/reviews:batchDelete", json={"review_ids": [str(draft_review.id)]}
+            )
+
+        self.assertEqual(
+            {
+                "results": [
+                    {
+                        "review_id": str(draft_review.id),
+                        "error": {
+                            "code": 405,
+                            "message": f"Review {draft_review.id} on case "
+                            f"{case.id} cannot be deleted.",
+                            "status": "Method Not Allowed",
+                        },
+                    }
+                ]
+            },
+            response.json,
+        )
+        case.reload()
+        self.assertEqual(
+            [Review.State.PUBLISHED], [r.state for r in case.review_history]
+        )
+        self.assertEqual(old_state, case.state)
+        stats = ReviewStats.get()
+        self.assertEqual(
+            old_counts, (stats.count_approved, stats.count_removed, stats.count_active)
+        )
+
+    @mock.patch.object(case_events, "publish", autospec=True)
+    def test_batch_delete_reviews_publishes_changes(self, mock_publish):
+        case = copy.deepcopy(TEST_CASE)
+        draft_review = Review(state=Review.State.DRAFT, decision=Review.Decision.BLOCK)
+        case.review_history.append(draft_review)
+        case.save()
+        mock_publish.reset_mock()
+
+        self.post("/reviews:batchDelete", json={"review_ids": [str(draft_review.id)]})
+
+        mock_publish.assert_called_once()
+        self.assertEqual([case.id], list(mock_publish.call_args.args[0]))
+
 
 if __name__ == "__main__":
     absltest.main()
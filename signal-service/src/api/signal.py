@@ -17,18 +17,30 @@
 import http
 import logging
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
+import flask
+import pymongo
+from bson.objectid import ObjectId
 from flask import Blueprint, request
-from mongoengine import ValidationError
+from mongoengine import QuerySet, ValidationError
 
-from api.api_error import ApiError
+from api.api_error import BATCH_ERROR_SCHEMA, ApiError
 from api.validation import Validator
-from models.signal import Content, Signal, Source, Sources
+from models.case import Case
+from models.signal import Content, ContentStatus, Signal, Source, Sources
 from taskqueue import tasks
+from utils import cursor, iterators
+
+T = TypeVar("T")
+
+# The number of signals in a page, unless requested otherwise.
+_DEFAULT_PAGE_SIZE = 100
+_MAX_PAGE_SIZE = 1000
+_NDJSON_MIMETYPE = "application/x-ndjson"
 
 _CONFIDENCE_ENUM = {"type": ["null", "string"], "enum": [None, "YES", "NO", "UNSURE"]}
-_SIGNAL_SCHEMA = {
+SIGNAL_SCHEMA = {
     "type": "object",
     "properties": {
         "id": {"type": "string"},
@@ -117,54 +129,256 @@ _SIGNAL_SCHEMA = {
     },
     "additionalProperties": False,
 }
+# The fields of signal dictionaries, with the model fields needed to populate them.
+_PROJECTIONS = {
+    "id": ("id",),
+    "create_time": ("sources",),
+    "content": ("content",),
+    "sources": ("sources",),
+    "content_features": ("content_features",),
+    "status": ("content_status",),
+}
+
+
+_CREATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "content": {
+            "type": "object",
+            "properties": {
+                "value": {"type": "string"},
+                "type": {
+                    "type": "string",
+                    "enum": ["HASH_PDQ", "HASH_MD5", "URL"],
+                },
+            },
+            "required": ["value", "type"],
+        },
+        "source": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "enum": ["TCAP", "GIFCT", "USER_REPORT"],
+                },
+                "author": {"type": "string"},
+                "create_time": {
+                    "type": "string",
+                    "format": "date-time",
+                },
+            },
+            "required": ["name"],
+        },
+    },
+    "required": ["content"],
+    "additionalProperties": False,
+}
 
+bp = Blueprint("Signal", __name__)
 
-bp = Blueprint("Signal", __name__, url_prefix="/signals/")
+# The maximum number of signals that can be created in a single request.
+MAX_BATCH_SIZE = 10_000
 
 
-@bp.post("/")
+@bp.post("/signals/")
 @Validator(
     input_schema={
         "title": "Signal Create API input schema",
+    }
+    | _CREATE_SCHEMA,
+    output_schema={
+        "title": "Signal Create API output schema",
+    }
+    | SIGNAL_SCHEMA,
+)
+def _create():
+    """Creates a signal, or merges its source into the signal with the same content.
+
+    Returns:
+        The signal, with a created status only if it is new.
+    """
+    signal, result = _to_signal(request.json).upsert()
+    if result == Signal.UpsertResult.UNCHANGED:
+        return to_dict(signal), http.HTTPStatus.OK
+    if result == Signal.UpsertResult.MERGED:
+        logging.info("Merged into existing signal %s", str(signal.id))
+        # A new source can change the priority of cases with this signal.
+        Case.invalidate_priorities([signal.id])
+        return to_dict(signal), http.HTTPStatus.OK
+    logging.info("Created signal %s", str(signal.id))
+
+    logging.info("Enqueueing signal %s", str(signal.id))
+    tasks.process_new_signals.delay(signal_ids=[str(signal.id)])
+
+    return to_dict(signal), http.HTTPStatus.CREATED
+
+
+@bp.post("/signals:batchCreate")
+@Validator(
+    input_schema={
+        "title": "Signals BatchCreate API input schema",
         "type": "object",
         "properties": {
-            "content": {
-                "type": "object",
-                "properties": {
-                    "value": {"type": "string"},
-                    "type": {
-                        "type": "string",
-                        "enum": ["HASH_PDQ", "HASH_MD5", "URL"],
-                    },
-                },
-                "required": ["value", "type"],
+            "signals": {
+                "type": "array",
+                "items": _CREATE_SCHEMA,
+                "minItems": 1,
+                "maxItems": MAX_BATCH_SIZE,
             },
-            "source": {
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "enum": ["TCAP", "GIFCT", "USER_REPORT"],
-                    },
-                    "author": {"type": "string"},
-                    "create_time": {
-                        "type": "string",
-                        "format": "date-time",
+        },
+        "required": ["signals"],
+        "additionalProperties": False,
+    },
+    output_schema={
+        "title": "Signals BatchCreate API output schema",
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "signal_id": {"type": "string"},
+                        "status": {
+                            "type": "string",
+                            "enum": [x.value for x in Signal.UpsertResult],
+                        },
+                        "error": BATCH_ERROR_SCHEMA,
                     },
+                    "additionalProperties": False,
                 },
-                "required": ["name"],
             },
         },
-        "required": ["content"],
+        "required": ["results"],
         "additionalProperties": False,
     },
-    output_schema={
-        "title": "Signal Create API output schema",
-    }
-    | _SIGNAL_SCHEMA,
 )
-def _create():
-    content = request.json.get("content")
+def _batch_create():
+    """Creates the given signals, or merges their sources into existing signals.
+
+    All signals are upserted with a single bulk write, like the signals of a hash list
+    import, and the new ones are enqueued for processing in chunks. Each result has the
+    ID of the signal and whether it was inserted, merged or already up to date, in the
+    order of the request. Invalid signals get an error instead of failing the request.
+    """
+    # The signals of the request by their content key, with duplicates merged.
+    signals: dict[str, Signal] = {}
+    keys: list[str | ApiError] = []
+    for data in request.json.get("signals"):
+        try:
+            signal = _to_signal(data)
+            signal.validate()
+        except (ValidationError, ValueError) as e:
+            keys.append(
+                ApiError(http.HTTPStatus.BAD_REQUEST, message=f"Invalid signal: {e}")
+            )
+            continue
+        if signal.content_key in signals:
+            signals[signal.content_key].merge(signal)
+        else:
+            signals[signal.content_key] = signal
+        keys.append(signal.content_key)
+
+    existing = {
+        doc["content_key"]: doc
+        for doc in Signal.objects(content_key__in=list(signals))
+        .only("id", "content_key", "sources")
+        .as_pymongo()
+    }
+    operations = []
+    # The IDs of the signals that are new, if they get inserted by this request.
+    new_ids: dict[str, ObjectId] = {}
+    statuses: dict[str, Signal.UpsertResult] = {}
+    for key, signal in signals.items():
+        doc = existing.get(key)
+        source_names = {
+            source["name"]
+            for source in (doc or {}).get("sources", {}).get("sources", [])
+        }
+        if doc is None:
+            new_ids[key] = ObjectId()
+            operations.append(
+                pymongo.UpdateOne(
+                    {"content_key": key},
+                    {
+                        "$setOnInsert": signal.to_mongo().to_dict()
+                        | {"_id": new_ids[key]}
+                    },
+                    upsert=True,
+                )
+            )
+        # Existing signals only get the sources added that they don't have yet. These
+        # are also written for new signals, in case they are inserted concurrently.
+        for source in signal.sources.sources:
+            if source.name.value in source_names:
+                continue
+            operations.append(
+                pymongo.UpdateOne(
+                    {
+                        "content_key": key,
+                        "sources.sources.name": {"$ne": source.name.value},
+                    },
+                    {"$push": {"sources.sources": source.to_mongo().to_dict()}},
+                )
+            )
+            statuses[key] = Signal.UpsertResult.MERGED
+        statuses.setdefault(key, Signal.UpsertResult.UNCHANGED)
+
+    signal_ids = {key: doc["_id"] for key, doc in existing.items()}
+    if operations:
+        # pylint: disable-next=protected-access
+        result = Signal._get_collection().bulk_write(operations, ordered=True)
+        upserted_ids = set(result.upserted_ids.values())
+        for key, signal_id in new_ids.items():
+            if signal_id in upserted_ids:
+                signal_ids[key] = signal_id
+                statuses[key] = Signal.UpsertResult.INSERTED
+        # Signals that were inserted concurrently by another request are merged.
+        missing_keys = new_ids.keys() - signal_ids.keys()
+        if missing_keys:
+            for doc in Signal.objects(content_key__in=list(missing_keys)).only(
+                "id", "content_key"
+            ):
+                signal_ids[doc.content_key] = doc.id
+
+    inserted_ids = [
+        str(signal_ids[key])
+        for key, status in statuses.items()
+        if status == Signal.UpsertResult.INSERTED
+    ]
+    merged_ids = [
+        signal_ids[key]
+        for key, status in statuses.items()
+        if status == Signal.UpsertResult.MERGED
+    ]
+    if merged_ids:
+        # New sources can change the priority of cases with these signals.
+        Case.invalidate_priorities(merged_ids)
+    for chunk in iterators.grouper(
+        iter(inserted_ids), tasks.SIGNAL_IMPORTER_CHUNK_SIZE
+    ):
+        tasks.process_new_signals.delay(signal_ids=list(chunk))
+    logging.info(
+        "Created %d signals and merged %d of %d in a batch",
+        len(inserted_ids),
+        len(merged_ids),
+        len(keys),
+    )
+
+    results = []
+    for key in keys:
+        if isinstance(key, ApiError):
+            results.append(key.to_dict())
+        else:
+            results.append(
+                {"signal_id": str(signal_ids[key]), "status": statuses[key].value}
+            )
+    return {"results": results}
+
+
+def _to_signal(data: dict[str, Any]) -> Signal:
+    """Makes a signal from the input of a create request."""
+    content = data.get("content")
     signal = Signal(
         content=[
             Content(
@@ -173,7 +387,7 @@ def _create():
             )
         ],
     )
-    source = request.json.get("source")
+    source = data.get("source")
     if source:
         create_time = source.get("create_time")
         report_date = datetime.fromisoformat(create_time) if create_time else None
@@ -186,17 +400,10 @@ def _create():
                 )
             ]
         )
-    # TODO: Merge with existing signal if it already exists.
-    signal.save()
-    logging.info("Created signal %s", str(signal.id))
-
-    logging.info("Enqueueing signal %s", str(signal.id))
-    tasks.process_new_signals.delay(signal_ids=[str(signal.id)])
-
-    return _to_dict(signal), http.HTTPStatus.CREATED
+    return signal
 
 
-@bp.get("/<signal_id>")
+@bp.get("/signals/<signal_id>")
 @Validator(
     input_schema={
         "title": "Signals Get API input schema",
@@ -205,7 +412,7 @@ def _create():
     output_schema={
         "title": "Signals Get API output schema",
     }
-    | _SIGNAL_SCHEMA,
+    | SIGNAL_SCHEMA,
 )
 def _get(signal_id: str):
     """Returns a single Signal by its unique identifier.
@@ -223,10 +430,10 @@ def _get(signal_id: str):
             http.HTTPStatus.NOT_FOUND, message=f"Signal {signal_id} not found."
         ) from e
 
-    return _to_dict(signal)
+    return to_dict(signal)
 
 
-@bp.get("/")
+@bp.get("/signals/")
 @Validator(
     input_schema={
         "title": "Signals List API input schema",
@@ -234,24 +441,145 @@ def _get(signal_id: str):
     },
     output_schema={
         "title": "Signals List API output schema",
-        "type": "array",
-        "items": _SIGNAL_SCHEMA,
+        "type": "object",
+        "properties": {
+            "data": {"type": "array", "items": SIGNAL_SCHEMA},
+            "next_cursor_token": {
+                "type": ["string", "null"],
+                "contentEncoding": "base64",
+            },
+        },
+        "additionalProperties": False,
     },
 )
 def _list():
-    """Returns a list of signals.
+    """Returns a page of signals, in the order they were created.
+
+    Pages are found with keyset pagination on the signal ID. Signals can be filtered
+    by `source`, `content_type`, `status` and a `report_date_after`/`report_date_before`
+    range, and limited to the signal fields listed in `fields`.
+
+    With `format=ndjson`, all matching signals after the cursor are streamed instead,
+    one JSON object per line, which allows exporting them in bulk.
 
     Returns:
-        A list of signal dictionaries.
+        A dictionary with the page of signal dictionaries under `data`, and the
+        `next_cursor_token` of the next page if there is one.
     """
-    return [_to_dict(v) for v in Signal.objects]
+    fields = _parse_fields(request.args.getlist("fields"))
+    signals = _filter(Signal.objects).only(
+        # The create time is derived from the sources, which are always loaded.
+        "sources",
+        *{db_field for field in fields for db_field in _PROJECTIONS[field]},
+    )
+    page_size = _parse_arg("page_size", int)
+    if page_size is not None and not 1 <= page_size <= _MAX_PAGE_SIZE:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST,
+            message=f"page_size must be between 1 and {_MAX_PAGE_SIZE}.",
+        )
+    next_cursor_token = request.args.get("next_cursor_token")
+    if next_cursor_token:
+        signals = signals(id__gt=_decode_cursor_token(next_cursor_token))
+    signals = signals.order_by("id")
+
+    if request.args.get("format", "json").lower() == "ndjson":
+        if page_size is not None:
+            signals = signals.limit(page_size)
+        return flask.Response(
+            flask.stream_with_context(_to_ndjson(signals.no_cache(), fields)),
+            mimetype=_NDJSON_MIMETYPE,
+        )
+
+    page_size = page_size or _DEFAULT_PAGE_SIZE
+    # One more signal than requested is fetched to find out whether there are more.
+    page = list(signals.limit(page_size + 1))
+    response = {"data": [_project(to_dict(s), fields) for s in page[:page_size]]}
+    if len(page) > page_size:
+        response["next_cursor_token"] = cursor.encode_cursor(
+            {"token_id": str(page[page_size - 1].id)}
+        )
+    return response
+
+
+def _parse_arg(name: str, parse: Callable[[str], T]) -> T | None:
+    """Parses a query parameter, raising a bad request error if it is invalid."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return parse(value)
+    except ValueError as e:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST, message=f"Invalid {name} value: {value}."
+        ) from e
+
+
+def _parse_fields(values: Iterable[str]) -> set[str]:
+    """Parses the values of `fields` parameters, which may be comma-separated."""
+    fields = {name.strip() for value in values for name in value.split(",")}
+    fields.discard("")
+    if fields - _PROJECTIONS.keys():
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST,
+            message=f"Invalid fields value, expected any of {list(_PROJECTIONS)}.",
+        )
+    return fields or set(_PROJECTIONS)
+
+
+def _filter(signals: QuerySet) -> QuerySet:
+    """Filters signals by the query parameters of a list request."""
+    content_type = _parse_arg("content_type", Content.ContentType)
+    if content_type:
+        signals = signals(content__content_type=content_type)
+    status = _parse_arg("status", ContentStatus.Status)
+    if status:
+        signals = signals(content_status__most_recent_status=status)
+
+    # All source conditions have to hold for the same source of a signal.
+    source_match = {}
+    source_name = _parse_arg("source", Source.Name)
+    if source_name:
+        source_match["name"] = source_name
+    report_date_after = _parse_arg("report_date_after", datetime.fromisoformat)
+    if report_date_after:
+        source_match["report_date__gte"] = report_date_after
+    report_date_before = _parse_arg("report_date_before", datetime.fromisoformat)
+    if report_date_before:
+        source_match["report_date__lt"] = report_date_before
+    if source_match:
+        signals = signals(sources__sources__match=source_match)
+    return signals
+
+
+def _decode_cursor_token(token: str) -> ObjectId:
+    """Returns the ID of the signal that a cursor token points at."""
+    try:
+        return ObjectId(cursor.decode_cursor(token)["token_id"])
+    except Exception as e:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST, message=f"Invalid cursor format: {e}"
+        ) from e
+
+
+def _project(result: dict[str, Any], fields: set[str]) -> dict[str, Any]:
+    return {key: value for key, value in result.items() if key in fields}
+
+
+def _to_ndjson(signals: QuerySet, fields: set[str]) -> Iterator[str]:
+    """Yields signals as newline-delimited JSON, without holding them all in memory."""
+    for signal in signals:
+        yield flask.json.dumps(_project(to_dict(signal), fields)) + "\n"
 
 
-def _to_dict(signal: Signal) -> dict[str, Any]:
+def to_dict(signal: Signal) -> dict[str, Any]:
     result = {
         "id": str(signal.id),
         # TODO: Add a new `create_time` to the signal object.
-        "create_time": min(source.report_date for source in signal.sources.sources),
+        "create_time": min(
+            (s.report_date for s in signal.sources.sources if s.report_date),
+            default=None,
+        ),
         "content": [
             {"value": content["value"], "content_type": content["content_type"]}
             for content in signal.content
@@ -18,6 +18,7 @@
 import copy
 import datetime
 import http
+import json
 from unittest import mock
 
 from absl.testing import absltest, parameterized
@@ -32,6 +33,7 @@ from models.signal import (
     Source,
     Sources,
 )
+from taskqueue import tasks
 from testing.test_case import ApiTestCase
 
 _TEST_SIGNAL = Signal(
@@ -96,6 +98,130 @@ class SignalAPITest(parameterized.TestCase, ApiTestCase):
             signal.sources.sources[0].report_date,
         )
 
+    def test_create_same_signal_again_returns_existing_signal(self):
+        request = {
+            "content": {"value": "foobar", "type": "HASH_PDQ"},
+            "source": {"name": "USER_REPORT"},
+        }
+        created = self.post(
+            "/signals/", json=request, expected_status=http.HTTPStatus.CREATED
+        )
+
+        response = self.post(
+            "/signals/", json=request, expected_status=http.HTTPStatus.OK
+        )
+
+        self.assertEqual(response.json["id"], created.json["id"])
+        self.assertEqual(1, Signal.objects.count())
+
+    def test_create_signal_with_existing_content_merges_source(self):
+        created = self.post(
+            "/signals/",
+            json={
+                "content": {"value": "foobar", "type": "HASH_PDQ"},
+                "source": {"name": "USER_REPORT"},
+            },
+            expected_status=http.HTTPStatus.CREATED,
+        )
+
+        response = self.post(
+            "/signals/",
+            json={
+                "content": {"value": "FOOBAR", "type": "HASH_PDQ"},
+                "source": {"name": "GIFCT", "author": "Jigsaw Test"},
+            },
+            expected_status=http.HTTPStatus.OK,
+        )
+
+        self.assertEqual(response.json["id"], created.json["id"])
+        self.assertEqual(
+            [{"name": "USER_REPORT"}, {"name": "GIFCT", "author": "Jigsaw Test"}],
+            response.json["sources"],
+        )
+        self.assertEqual(1, Signal.objects.count())
+
+    def test_batch_create_signals(self):
+        existing = Signal(
+            content=[Content(value="aaa", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).save()
+        unchanged = Signal(
+            content=[Content(value="bbb", content_type=Content.ContentType.HASH_MD5)],
+            sources=Sources(sources=[Source(name=Source.Name.GIFCT)]),
+        ).save()
+
+        response = self.post(
+            "/signals:batchCreate",
+            json={
+                "signals": [
+                    {
+                        "content": {"value": "AAA", "type": "HASH_PDQ"},
+                        "source": {"name": "GIFCT"},
+                    },
+                    {
+                        "content": {"value": "bbb", "type": "HASH_MD5"},
+                        "source": {"name": "GIFCT"},
+                    },
+                    {
+                        "content": {"value": "ccc", "type": "HASH_PDQ"},
+                        "source": {"name": "USER_REPORT", "author": "foo"},
+                    },
+                    {"content": {"value": "ddd", "type": "HASH_PDQ"}},
+                    {
+                        "content": {"value": "CCC", "type": "HASH_PDQ"},
+                        "source": {"name": "TCAP"},
+                    },
+                ]
+            },
+            expected_status=http.HTTPStatus.OK,
+        )
+
+        new_signal = Signal.objects.get(content__value="ccc")
+        self.assertEqual(
+            response.json["results"],
+            [
+                {"signal_id": str(existing.id), "status": "MERGED"},
+                {"signal_id": str(unchanged.id), "status": "UNCHANGED"},
+                {"signal_id": str(new_signal.id), "status": "INSERTED"},
+                {"error": mock.ANY},
+                {"signal_id": str(new_signal.id), "status": "INSERTED"},
+            ],
+        )
+        self.assertEqual(
+            http.HTTPStatus.BAD_REQUEST, response.json["results"][3]["error"]["code"]
+        )
+        self.assertEqual(3, Signal.objects.count())
+        self.assertEqual(
+            [Source.Name.TCAP, Source.Name.GIFCT],
+            [s.name for s in Signal.objects.get(id=existing.id).sources.sources],
+        )
+        self.assertEqual(
+            [(Source.Name.USER_REPORT, "foo"), (Source.Name.TCAP, None)],
+            [(s.name, s.author) for s in new_signal.sources.sources],
+        )
+
+    @mock.patch.object(tasks, "SIGNAL_IMPORTER_CHUNK_SIZE", 2)
+    @mock.patch.object(tasks.process_new_signals, "delay", autospec=True)
+    def test_batch_create_signals_processes_new_signals_in_chunks(self, mock_delay):
+        response = self.post(
+            "/signals:batchCreate",
+            json={
+                "signals": [
+                    {
+                        "content": {"value": value, "type": "HASH_PDQ"},
+                        "source": {"name": "GIFCT"},
+                    }
+                    for value in ("aaa", "bbb", "ccc")
+                ]
+            },
+            expected_status=http.HTTPStatus.OK,
+        )
+
+        ids = [result["signal_id"] for result in response.json["results"]]
+        mock_delay.assert_has_calls(
+            [mock.call(signal_ids=ids[:2]), mock.call(signal_ids=ids[2:])]
+        )
+
     def test_get_signal_invalid_signal_id_raises(self):
         self.get(
             "/signals/foobar",
@@ -171,7 +297,7 @@ class SignalAPITest(parameterized.TestCase, ApiTestCase):
     def test_list_signals_no_signals_returns_empty_list(self):
         response = self.get("/signals/")
 
-        self.assertEmpty(response.json)
+        self.assertEqual({"data": []}, response.json)
 
     def test_list_signals_returns_matching_data(self):
         signal = copy.deepcopy(_TEST_SIGNAL)
@@ -208,7 +334,113 @@ class SignalAPITest(parameterized.TestCase, ApiTestCase):
                     },
                 }
             ],
-            response.json,
+            response.json["data"],
+        )
+
+    def test_list_signals_paginates_by_id(self):
+        signal_ids = []
+        for i in range(5):
+            signal = copy.deepcopy(_TEST_SIGNAL_SPARSE_DATA)
+            signal.content[0].value = f"https://abc.xyz/{i}"
+            signal_ids.append(str(signal.save().id))
+
+        url = "/signals/?page_size=2"
+        first_page = self.get(url).json
+        second_page = self.get(
+            f"{url}&next_cursor_token={first_page['next_cursor_token']}"
+        ).json
+        last_page = self.get(
+            f"{url}&next_cursor_token={second_page['next_cursor_token']}"
+        ).json
+
+        self.assertEqual(signal_ids[:2], [s["id"] for s in first_page["data"]])
+        self.assertEqual(signal_ids[2:4], [s["id"] for s in second_page["data"]])
+        self.assertEqual(signal_ids[4:], [s["id"] for s in last_page["data"]])
+        self.assertNotIn("next_cursor_token", last_page)
+
+    @parameterized.named_parameters(
+        ("source", "source=GIFCT", [1]),
+        ("content_type", "content_type=HASH_PDQ", [1]),
+        ("status", "status=ACTIVE", [0]),
+        ("report_date_after", "report_date_after=2001-01-01", [1]),
+        ("report_date_before", "report_date_before=2001-01-01", [0]),
+        (
+            "report_date_of_source",
+            "source=TCAP&report_date_after=2001-01-01",
+            [],
+        ),
+    )
+    def test_list_signals_filters(self, query, expected_indices):
+        signals = [
+            copy.deepcopy(_TEST_SIGNAL).save(),
+            Signal(
+                content=[
+                    Content(value="abc", content_type=Content.ContentType.HASH_PDQ)
+                ],
+                sources=Sources(
+                    sources=[
+                        Source(
+                            name=Source.Name.GIFCT,
+                            report_date=datetime.datetime(2002, 1, 1),
+                        )
+                    ]
+                ),
+            ).save(),
+        ]
+
+        response = self.get(f"/signals/?{query}")
+
+        self.assertEqual(
+            [str(signals[i].id) for i in expected_indices],
+            [s["id"] for s in response.json["data"]],
+        )
+
+    def test_list_signals_limits_fields(self):
+        signal = copy.deepcopy(_TEST_SIGNAL).save()
+
+        response = self.get("/signals/?fields=id,content")
+
+        self.assertEqual(
+            [
+                {
+                    "id": str(signal.id),
+                    "content": [
+                        {"value": "https://www.google.com/", "content_type": "URL"}
+                    ],
+                }
+            ],
+            response.json["data"],
+        )
+
+    def test_list_signals_streams_ndjson(self):
+        signals = [
+            copy.deepcopy(_TEST_SIGNAL).save(),
+            copy.deepcopy(_TEST_SIGNAL_SPARSE_DATA).save(),
+        ]
+
+        response = self.get("/signals/?format=ndjson&fields=id")
+
+        self.assertEqual("application/x-ndjson", response.mimetype)
+        self.assertEqual(
+            [{"id": str(signal.id)} for signal in signals],
+            [json.loads(line) for line in response.text.splitlines()],
+        )
+
+    @parameterized.parameters(
+        (
+            "fields=foo",
+            "Invalid fields value, expected any of "
+            "['id', 'create_time', 'content', 'sources', 'content_features', 'status'].",
+        ),
+        ("source=FOO", "Invalid source value: FOO."),
+        ("report_date_after=yesterday", "Invalid report_date_after value: yesterday."),
+        ("page_size=0", "page_size must be between 1 and 1000."),
+    )
+    def test_list_signals_invalid_parameters_raises(self, query, expected_message):
+        self.get(
+            f"/signals/?{query}",
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message=expected_message,
         )
 
 
@@ -15,21 +15,47 @@
 """API endpoints for the Target resource."""
 
 import base64
+import binascii
 import enum
 import http
+import io
 import logging
+import time
 from typing import Any
 
+import flask
 from flask import Blueprint, request
 from mongoengine import ValidationError
 
+from api import validation
 from api.api_error import ApiError
 from api.validation import Validator
 from models import features
-from models.target import FeatureSet, Target
+from models.features.image import Thumbnail
+from models.target import FeatureSet, Processing, Target
 from taskqueue import tasks
+from utils import callbacks, geoip
+from utils import image as image_utils
 from utils.image import is_image
 
+# The fields holding image bytes, which are served by their own endpoint rather than
+# as part of target dictionaries.
+IMAGE_DATA_FIELDS = ("feature_set.image.data", "feature_set.image.thumbnails")
+# Images never change once a target has been created, so clients can cache them for
+# long. They are private, as they may be harmful content under review.
+_IMAGE_MAX_AGE_SEC = 7 * 24 * 60 * 60
+# The maximum size of the content of a target. Targets are stored as single documents,
+# so this leaves room for thumbnails and other fields within the 16 MiB document limit.
+MAX_CONTENT_BYTES = 12 * 2**20
+# The multipart file field with the content of a target.
+_CONTENT_FILE_FIELD = "content"
+# The longest time that a status request can wait for processing to finish. Waiting
+# holds one of the few synchronous Gunicorn workers, so this is kept short; clients that
+# need to wait longer should poll again or use a callback URL.
+MAX_STATUS_WAIT_SEC = 2
+# How often a waiting status request checks whether processing has finished.
+_STATUS_POLL_INTERVAL_SEC = 0.5
+
 bp = Blueprint("Target", __name__, url_prefix="/targets/")
 
 
@@ -49,7 +75,7 @@ class _Likelihood(enum.Enum):
     VERY_LIKELY = 5
 
 
-_TARGET_SCHEMA = {
+TARGET_SCHEMA = {
     "type": "object",
     "properties": {
         "id": {"type": "string"},
@@ -57,7 +83,7 @@ _TARGET_SCHEMA = {
         "title": {"type": "string"},
         "description": {"type": "string"},
         "views": {"type": "number"},
-        "content_bytes": {"type": "string"},
+        "image_url": {"type": "string"},
         "creator": {
             "type": "object",
             "properties": {
@@ -68,7 +94,8 @@ _TARGET_SCHEMA = {
                         {"format": "ipv6"},
                         {"format": "hostname"},
                     ],
-                }
+                },
+                "ip_region": {"type": "string"},
             },
         },
         "client_context": {
@@ -125,44 +152,71 @@ _TARGET_SCHEMA = {
                 "type": "string",
                 "enum": [x.name for x in _ContentType],
             },
+            "callback_url": {
+                "description": (
+                    "A URL to notify with a POST request once the target has been "
+                    "processed, or processing has failed. It must be an http or "
+                    "https URL of a public host, or of an allowed host."
+                ),
+                "type": "string",
+                "format": "uri",
+            },
             "content_bytes": {
-                "description": "The target content, encoded as a base64 string.",
+                "description": (
+                    "The target content, encoded as a base64 string. Only used if "
+                    "the content isn't uploaded as raw bytes instead."
+                ),
                 "type": "string",
-                "contentEncoding": "base64",
             },
         },
-        "required": ["content_bytes", "content_type"],
+        "required": ["content_type"],
         "additionalProperties": False,
     },
     output_schema={
         "title": "Targets Create API output schema",
     }
-    | _TARGET_SCHEMA,
+    | TARGET_SCHEMA,
 )
 def _create():
-    """Creates a new Target entity reflecting content submitted for scanning."""
-    content_type = _ContentType[request.json.get("content_type")]
+    """Creates a new Target entity reflecting content submitted for scanning.
+
+    The content is either uploaded as raw bytes, or sent as base64 in a JSON body. Raw
+    bytes are the `content` file of a `multipart/form-data` request, or the body of an
+    `application/octet-stream` request, with the rest of the input as JSON in the
+    `metadata` field or `X-Metadata` header respectively.
+    """
+    data = validation.get_input(request)
+    content_type = _ContentType[data.get("content_type")]
     logging.info("Received request for type %s", content_type.value)
+    content_bytes = _read_content(data)
 
     target = Target()
     feature_set = FeatureSet()
 
-    views = request.json.get("views")
-    creator = request.json.get("creator")
+    views = data.get("views")
+    creator = data.get("creator")
     if creator:
         ip_address = creator.get("ip_address")
-        feature_set.creator = features.user.User(ip_address=ip_address)
+        feature_set.creator = features.user.User(
+            ip_address=ip_address, ip_region=geoip.get_region(ip_address)
+        )
     if views:
         feature_set.engagement_metrics = features.engagement.Engagement(views=views)
 
-    client_context = request.json.get("client_context")
+    client_context = data.get("client_context")
     if client_context:
         target.client_context = client_context
-
-    title = request.json.get("title")
-    description = request.json.get("description")
+    callback_url = data.get("callback_url")
+    if callback_url:
+        try:
+            callbacks.check_url(callback_url, resolve=False)
+        except callbacks.Error as e:
+            raise ApiError(http.HTTPStatus.BAD_REQUEST, message=str(e)) from e
+    target.processing = Processing(callback_url=callback_url)
+
+    title = data.get("title")
+    description = data.get("description")
     if content_type == _ContentType.IMAGE:
-        content_bytes = base64.b64decode(request.json.get("content_bytes"))
         if not is_image(content_bytes):
             raise ApiError(
                 http.HTTPStatus.BAD_REQUEST, message="Unable to process image data"
@@ -178,8 +232,6 @@ def _create():
         # API call.
         tasks.process_new_image_target.delay(target_id=str(target.id))
     elif content_type == _ContentType.TEXT:
-        content_bytes = base64.b64decode(request.json.get("content_bytes"))
-
         feature_set.text = features.text.Text(
             title=title,
             description=description,
@@ -190,7 +242,46 @@ def _create():
         # TODO: Ideally should run after a match is found.
         tasks.process_new_text_target.delay(target_id=str(target.id))
 
-    return _to_dict(target), http.HTTPStatus.CREATED
+    return to_dict(target), http.HTTPStatus.CREATED
+
+
+def _read_content(data: dict[str, Any]) -> bytes:
+    """Reads the content of a target to create, in a single pass over its bytes."""
+    if request.content_length and request.content_length > MAX_CONTENT_BYTES:
+        raise ApiError(http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    is_upload = request.mimetype in ("multipart/form-data", "application/octet-stream")
+    if is_upload and "content_bytes" in data:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST,
+            message="content_bytes cannot be used when uploading raw content.",
+        )
+
+    if request.mimetype == "multipart/form-data":
+        file = request.files.get(_CONTENT_FILE_FIELD)
+        if file is None:
+            raise ApiError(
+                http.HTTPStatus.BAD_REQUEST,
+                message=f"Missing {_CONTENT_FILE_FIELD} file.",
+            )
+        content = file.read(MAX_CONTENT_BYTES + 1)
+    elif request.mimetype == "application/octet-stream":
+        content = request.stream.read(MAX_CONTENT_BYTES + 1)
+    else:
+        if "content_bytes" not in data:
+            raise ApiError(
+                http.HTTPStatus.BAD_REQUEST, message="content_bytes is required."
+            )
+        try:
+            content = base64.b64decode(data["content_bytes"], validate=True)
+        except binascii.Error as e:
+            raise ApiError(
+                http.HTTPStatus.BAD_REQUEST,
+                message="content_bytes is not a valid base64-encoded string.",
+            ) from e
+
+    if len(content) > MAX_CONTENT_BYTES:
+        raise ApiError(http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    return content
 
 
 @bp.get("/<target_id>")
@@ -202,7 +293,7 @@ def _create():
     output_schema={
         "title": "Targets Get API output schema",
     }
-    | _TARGET_SCHEMA,
+    | TARGET_SCHEMA,
 )
 def _get(target_id: str):
     """Returns a single Target by its unique identifier.
@@ -214,13 +305,216 @@ def _get(target_id: str):
         A dictionary containing details about a target.
     """
     try:
-        target = Target.objects.get(id=target_id)
+        target = Target.objects.exclude(*IMAGE_DATA_FIELDS).get(id=target_id)
     except (ValidationError, Target.DoesNotExist) as e:
         raise ApiError(
             http.HTTPStatus.NOT_FOUND, message=f"Target {target_id} not found."
         ) from e
 
-    return _to_dict(target)
+    return to_dict(target)
+
+
+_STAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "start_time": {"type": "string", "format": "date-time"},
+        "end_time": {"type": "string", "format": "date-time"},
+        "duration_sec": {"type": "number"},
+        "error": {"type": "string"},
+    },
+    "additionalProperties": False,
+}
+
+
+@bp.get("/<target_id>/status")
+@Validator(
+    input_schema={
+        "title": "Targets Get Status API input schema",
+        "type": "null",
+    },
+    output_schema={
+        "title": "Targets Get Status API output schema",
+        "type": "object",
+        "properties": {
+            "id": {"type": "string"},
+            "state": {
+                "type": "string",
+                "enum": ["UNKNOWN"] + [x.value for x in Processing.State],
+            },
+            "end_time": {"type": "string", "format": "date-time"},
+            "stages": {
+                "type": "object",
+                "properties": {x.value: _STAGE_SCHEMA for x in Processing.Stage},
+                "additionalProperties": False,
+            },
+        },
+        "required": ["id", "state"],
+        "additionalProperties": False,
+    },
+)
+def _get_status(target_id: str):
+    """Returns how far processing a Target has got.
+
+    With `wait`, the request waits up to that many seconds for processing to finish
+    before it returns, so that clients can long-poll for the result.
+
+    Args:
+        target_id: A unique identifier to fetch the status of a single target.
+
+    Returns:
+        A dictionary with the processing state, and when each stage started and finished.
+    """
+    wait = request.args.get("wait", "0")
+    if not wait.isdigit() or int(wait) > MAX_STATUS_WAIT_SEC:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST,
+            message=f"wait must be between 0 and {MAX_STATUS_WAIT_SEC} seconds.",
+        )
+    deadline = time.monotonic() + int(wait)
+    while True:
+        try:
+            target = Target.objects.only("processing").get(id=target_id)
+        except (ValidationError, Target.DoesNotExist) as e:
+            raise ApiError(
+                http.HTTPStatus.NOT_FOUND, message=f"Target {target_id} not found."
+            ) from e
+        processing = target.processing
+        if (
+            not processing
+            or processing.state != Processing.State.PROCESSING
+            or time.monotonic() >= deadline
+        ):
+            break
+        time.sleep(_STATUS_POLL_INTERVAL_SEC)
+
+    if not processing:
+        return {"id": target_id, "state": "UNKNOWN"}
+    result = {"id": target_id, "state": processing.state, "stages": {}}
+    if processing.end_time:
+        result["end_time"] = processing.end_time
+    for stage, stage_status in processing.stages.items():
+        result["stages"][stage] = stage_result = {}
+        if stage_status.start_time:
+            stage_result["start_time"] = stage_status.start_time
+        if stage_status.end_time:
+            stage_result["end_time"] = stage_status.end_time
+            stage_result["duration_sec"] = (
+                stage_status.end_time - stage_status.start_time
+            ).total_seconds()
+        if stage_status.error:
+            stage_result["error"] = stage_status.error
+    return result
+
+
+@bp.get("/<target_id>/image")
+@Validator(
+    input_schema={
+        "title": "Targets Get Image API input schema",
+        "type": "null",
+    },
+    output_schema={
+        "title": "Targets Get Image API output schema",
+        "description": "The response holds the raw image bytes instead of JSON.",
+        "type": "null",
+    },
+)
+def _get_image(target_id: str):
+    """Returns the image of a Target as raw bytes.
+
+    With `size`, a thumbnail that fits within a square of that many pixels is returned
+    instead. Thumbnails are made once, when they are first requested, and stored with
+    the target.
+
+    Args:
+        target_id: A unique identifier to fetch the image of a single target.
+
+    Returns:
+        The image data, with headers to cache it by its ETag.
+    """
+    size = request.args.get("size")
+    sizes = image_utils.THUMBNAIL_SIZES
+    if size is not None and size not in {str(x) for x in sizes}:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST,
+            message=f"Invalid size, expected one of {list(sizes)}.",
+        )
+    # As images never change, the ETag doesn't depend on their data, and revalidation
+    # doesn't need to load them. It still needs to check that the image exists though,
+    # as the target may have been deleted since.
+    etag = f"{target_id}-{size or 'original'}"
+    if etag in request.if_none_match:
+        _check_image_exists(target_id)
+        response = flask.Response(status=http.HTTPStatus.NOT_MODIFIED)
+    else:
+        if size is None:
+            data, mime_type = _get_original_image(target_id)
+        else:
+            thumbnail = _get_thumbnail(target_id, int(size))
+            data, mime_type = thumbnail.data, thumbnail.mime_type
+        response = flask.send_file(io.BytesIO(data), mimetype=mime_type)
+    response.set_etag(etag)
+    response.cache_control.max_age = _IMAGE_MAX_AGE_SEC
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
+def _get_image_target(target_id: str, *fields: str) -> Target:
+    """Returns an image target with only the given fields loaded."""
+    try:
+        target = Target.objects.only(*fields).get(id=target_id)
+    except (ValidationError, Target.DoesNotExist) as e:
+        raise ApiError(
+            http.HTTPStatus.NOT_FOUND, message=f"Target {target_id} not found."
+        ) from e
+    if not target.feature_set.image:
+        raise ApiError(
+            http.HTTPStatus.NOT_FOUND, message=f"Target {target_id} has no image."
+        )
+    return target
+
+
+def _check_image_exists(target_id: str) -> None:
+    """Checks that a target has an image, without loading any of the target."""
+    try:
+        exists = Target.objects(id=target_id, feature_set__image__exists=True).count()
+    except ValidationError as e:
+        raise ApiError(
+            http.HTTPStatus.NOT_FOUND, message=f"Target {target_id} not found."
+        ) from e
+    if not exists:
+        raise ApiError(
+            http.HTTPStatus.NOT_FOUND,
+            message=f"Target {target_id} not found or has no image.",
+        )
+
+
+def _get_original_image(target_id: str) -> tuple[bytes, str]:
+    data = _get_image_target(target_id, "feature_set.image.data").feature_set.image.data
+    return data, image_utils.get_mime_type(data) or "application/octet-stream"
+
+
+def _get_thumbnail(target_id: str, size: int) -> Thumbnail:
+    """Returns the thumbnail of an image in the given size, making it if needed."""
+    target = _get_image_target(target_id, "feature_set.image.thumbnails")
+    for thumbnail in target.feature_set.image.thumbnails:
+        if thumbnail.size == size:
+            return thumbnail
+
+    data = _get_original_image(target_id)[0]
+    thumbnail = Thumbnail(
+        size=size,
+        mime_type=image_utils.THUMBNAIL_MIME_TYPE,
+        data=image_utils.make_thumbnail(data, size),
+    )
+    # Only store the thumbnail if a concurrent request didn't store one already.
+    Target.objects(
+        __raw__={
+            "_id": target.id,
+            "feature_set.image.thumbnails.size": {"$ne": size},
+        }
+    ).update_one(push__feature_set__image__thumbnails=thumbnail)
+    return thumbnail
 
 
 @bp.patch("/<target_id>")
@@ -258,7 +552,7 @@ def _get(target_id: str):
     output_schema={
         "title": "Targets Update API output schema",
     }
-    | _TARGET_SCHEMA,
+    | TARGET_SCHEMA,
 )
 def _update(target_id: str):
     """Updates and returns a single Target by its unique identifier.
@@ -296,15 +590,23 @@ def _update(target_id: str):
     creator = request.json.get("creator")
     if creator and creator.get("ip_address"):
         target.feature_set.creator.ip_address = creator.get("ip_address")
+        target.feature_set.creator.ip_region = geoip.get_region(
+            creator.get("ip_address")
+        )
     client_context = request.json.get("client_context")
     if client_context:
         target.client_context = client_context
     target.save()
 
-    return _to_dict(target), http.HTTPStatus.OK
+    return to_dict(target), http.HTTPStatus.OK
+
 
+def to_dict(target: Target) -> dict[str, Any]:
+    """Converts a target to its API representation.
 
-def _to_dict(target: Target) -> dict[str, Any]:
+    Image data is not included, but can be fetched from the image URL instead. Targets
+    can therefore be loaded without the `IMAGE_DATA_FIELDS`.
+    """
     result = {
         "id": str(target.id),
         "create_time": target.create_time,
@@ -314,7 +616,7 @@ def _to_dict(target: Target) -> dict[str, Any]:
     image = target.feature_set.image
     text = target.feature_set.text
     if image:
-        result["content_bytes"] = base64.b64encode(image.data)
+        result["image_url"] = f"{bp.url_prefix}{target.id}/image"
         if image.title:
             result["title"] = image.title
         if image.description:
@@ -333,6 +635,11 @@ def _to_dict(target: Target) -> dict[str, Any]:
             result["description"] = text.description
     if target.feature_set.engagement_metrics:
         result["views"] = target.feature_set.engagement_metrics.views
-    if target.feature_set.creator and target.feature_set.creator.ip_address:
-        result["creator"] = {"ip_address": target.feature_set.creator.ip_address}
+    creator = target.feature_set.creator
+    if creator and creator.ip_address:
+        result["creator"] = {"ip_address": creator.ip_address}
+        # Targets created before regions were stored have theirs looked up instead.
+        ip_region = creator.ip_region or geoip.get_region(creator.ip_address)
+        if ip_region:
+            result["creator"]["ip_region"] = ip_region
     return result
@@ -18,17 +18,23 @@
 import base64
 import datetime
 import http
+import io
+import json
 from unittest import mock
 
 from absl.testing import absltest
 from bson import ObjectId
 
+import api
 from analyzers import ocr, perspective, safe_search, translation
+from api import target as target_api
 from api.target import bp as target_bp
 from models import features
-from models.target import FeatureSet, Target
+from models.target import FeatureSet, Processing, ProcessingStage, Target
 from taskqueue import tasks
 from testing.test_case import ApiTestCase
+from utils import geoip
+from utils import image as image_utils
 
 
 # pylint: disable-next=too-many-instance-attributes
@@ -179,6 +185,26 @@ class TargetAPITest(ApiTestCase):
         target = Target.objects.get(id=response.json["id"])
         self.assertEqual(client_context, target.client_context)
 
+    @mock.patch.object(geoip, "get_region", autospec=True, return_value="Australia")
+    def test_create_target_stores_creator_region(self, mock_get_region):
+        response = self.post(
+            "/targets/",
+            json={
+                "creator": {"ip_address": "1.2.3.4"},
+                "content_type": "TEXT",
+                "content_bytes": self.test_text_b64,
+            },
+            expected_status=http.HTTPStatus.CREATED,
+        )
+
+        target = Target.objects.get(id=response.json["id"])
+        self.assertEqual("Australia", target.feature_set.creator.ip_region)
+        self.assertEqual(
+            {"ip_address": "1.2.3.4", "ip_region": "Australia"},
+            response.json["creator"],
+        )
+        mock_get_region.assert_called_once_with("1.2.3.4")
+
     def test_create_target_hashes_image(self):
         self.post(
             "/targets/",
@@ -195,6 +221,216 @@ class TargetAPITest(ApiTestCase):
             target.feature_set.image.pdq_digest,
         )
 
+    def test_create_img_target_from_multipart_upload(self):
+        response = self.post(
+            "/targets/",
+            data={
+                "metadata": json.dumps(
+                    {"client_context": "abc", "content_type": "IMAGE"}
+                ),
+                "content": (io.BytesIO(base64.b64decode(self.test_image_b64)), "a.png"),
+            },
+            expected_status=http.HTTPStatus.CREATED,
+        )
+
+        target = Target.objects.get(id=response.json["id"])
+        self.assertEqual("abc", target.client_context)
+        self.assertEqual(
+            base64.b64decode(self.test_image_b64), bytes(target.feature_set.image.data)
+        )
+        self.assertEqual(
+            "9c66cd9c49893672e671c3339a72ecf94d8c384eb06cc7924d32f07196db0d8e",
+            target.feature_set.image.pdq_digest,
+        )
+
+    def test_create_text_target_from_raw_upload(self):
+        response = self.post(
+            "/targets/",
+            data=b"Test message",
+            content_type="application/octet-stream",
+            headers={"X-Metadata": json.dumps({"content_type": "TEXT"})},
+            expected_status=http.HTTPStatus.CREATED,
+        )
+
+        target = Target.objects.get(id=response.json["id"])
+        self.assertEqual("Test message", target.feature_set.text.data)
+
+    def test_create_target_upload_without_content_raises(self):
+        self.post(
+            "/targets/",
+            data={"metadata": json.dumps({"content_type": "IMAGE"})},
+            content_type="multipart/form-data",
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="Missing content file.",
+        )
+
+    def test_create_target_upload_with_content_bytes_raises(self):
+        self.post(
+            "/targets/",
+            data=b"Test message",
+            content_type="application/octet-stream",
+            headers={
+                "X-Metadata": json.dumps(
+                    {"content_type": "TEXT", "content_bytes": "abc="}
+                )
+            },
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="content_bytes cannot be used when uploading raw content.",
+        )
+
+    def test_create_target_upload_with_invalid_metadata_raises(self):
+        self.post(
+            "/targets/",
+            data=b"Test message",
+            content_type="application/octet-stream",
+            headers={"X-Metadata": "{"},
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+        )
+
+    def test_create_target_without_content_raises(self):
+        self.post(
+            "/targets/",
+            json={"content_type": "TEXT"},
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="content_bytes is required.",
+        )
+
+    def test_create_target_with_invalid_base64_raises(self):
+        self.post(
+            "/targets/",
+            json={"content_type": "TEXT", "content_bytes": "not-base64-encoded"},
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="content_bytes is not a valid base64-encoded string.",
+        )
+
+    @mock.patch.object(target_api, "MAX_CONTENT_BYTES", 4)
+    def test_create_target_with_too_large_content_raises(self):
+        self.post(
+            "/targets/",
+            data=b"Test message",
+            content_type="application/octet-stream",
+            headers={"X-Metadata": json.dumps({"content_type": "TEXT"})},
+            expected_status=http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    def test_create_target_refuses_too_large_request(self):
+        self.assertEqual(api.MAX_REQUEST_BYTES, self.app.config["MAX_CONTENT_LENGTH"])
+        with mock.patch.dict(self.app.config, {"MAX_CONTENT_LENGTH": 16}):
+            self.post(
+                "/targets/",
+                json={"content_type": "TEXT", "content_bytes": "VGVzdCBtZXNzYWdl"},
+                expected_status=http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+
+    @mock.patch.object(tasks.Index, "load", autospec=True)
+    def test_get_status_of_processed_target(self, mock_load_index):
+        mock_load_index.return_value.query.return_value = []
+        response = self.post(
+            "/targets/",
+            json={
+                "content_type": "IMAGE",
+                "content_bytes": self.test_image_b64,
+                "callback_url": "http://test-url/",
+            },
+            expected_status=http.HTTPStatus.CREATED,
+        )
+        target_id = response.json["id"]
+        self.assertEqual(
+            "http://test-url/", Target.objects.get(id=target_id).processing.callback_url
+        )
+
+        response = self.get(f"/targets/{target_id}/status")
+
+        self.assertEqual(target_id, response.json["id"])
+        self.assertEqual("DONE", response.json["state"])
+        self.assertIn("end_time", response.json)
+        self.assertCountEqual(
+            [
+                "HASHING",
+                "INDEX_QUERY",
+                "OCR",
+                "SAFE_SEARCH",
+                "THUMBNAILS",
+                "CASE_GENERATION",
+            ],
+            response.json["stages"],
+        )
+        self.assertGreaterEqual(response.json["stages"]["HASHING"]["duration_sec"], 0)
+
+    def test_create_target_with_internal_callback_url_raises(self):
+        self.post(
+            "/targets/",
+            json={
+                "content_type": "TEXT",
+                "content_bytes": "VGVzdCBtZXNzYWdl",
+                "callback_url": "http://169.254.169.254/latest/meta-data/",
+            },
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="Callback URL host 169.254.169.254 is not a public address",
+        )
+        self.assertEqual(0, Target.objects.count())
+
+    def test_get_status_waits_for_processing(self):
+        target = Target(
+            feature_set=FeatureSet(),
+            processing=Processing(
+                stages={
+                    "HASHING": ProcessingStage(
+                        start_time=datetime.datetime(2024, 1, 1),
+                        error="Something went wrong",
+                    )
+                }
+            ),
+        ).save()
+
+        def finish_processing(_):
+            Target.objects(id=target.id).update_one(
+                set__processing__state=Processing.State.DONE
+            )
+
+        with mock.patch.object(
+            target_api.time, "sleep", side_effect=finish_processing
+        ) as mock_sleep:
+            response = self.get(f"/targets/{target.id}/status?wait=2")
+
+        mock_sleep.assert_called_once()
+        self.assertEqual(
+            {
+                "id": str(target.id),
+                "state": "DONE",
+                "stages": {
+                    "HASHING": {
+                        "start_time": "2024-01-01T00:00:00+00:00",
+                        "error": "Something went wrong",
+                    }
+                },
+            },
+            response.json,
+        )
+
+    def test_get_status_of_untracked_target(self):
+        target = Target(feature_set=FeatureSet()).save()
+
+        response = self.get(f"/targets/{target.id}/status")
+
+        self.assertEqual({"id": str(target.id), "state": "UNKNOWN"}, response.json)
+
+    def test_get_status_with_invalid_wait_raises(self):
+        target = Target(feature_set=FeatureSet()).save()
+
+        self.get(
+            f"/targets/{target.id}/status?wait=3",
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="wait must be between 0 and 2 seconds.",
+        )
+
+    def test_get_status_invalid_target_id_raises(self):
+        self.get(
+            "/targets/foobar/status",
+            expected_status=http.HTTPStatus.NOT_FOUND,
+            expected_message="Target foobar not found.",
+        )
+
     def test_get_target_invalid_target_id_raises(self):
         self.get(
             "/targets/foobar",
@@ -210,6 +446,23 @@ class TargetAPITest(ApiTestCase):
             expected_message=f"Target {missing_id} not found.",
         )
 
+    @mock.patch.object(geoip, "get_region", autospec=True, return_value="Australia")
+    def test_get_target_looks_up_missing_creator_region(self, _):
+        target = Target(
+            feature_set=FeatureSet(
+                creator=features.user.User(ip_address="1.2.3.4"),
+                text=features.text.Text(data="Test message"),
+            ),
+        )
+        target.save()
+
+        response = self.get(f"/targets/{target.id}")
+
+        self.assertEqual(
+            {"ip_address": "1.2.3.4", "ip_region": "Australia"},
+            response.json["creator"],
+        )
+
     def test_get_target_by_identifier(self):
         client_context = "abc"
         target = Target(
@@ -235,7 +488,7 @@ class TargetAPITest(ApiTestCase):
                 "title": "Title",
                 "description": "description",
                 "creator": {"ip_address": "1.2.3.4"},
-                "content_bytes": mock.ANY,
+                "image_url": f"/targets/{target.id}/image",
                 "views": 5,
                 "safe_search_scores": {
                     "adult": "UNKNOWN",
@@ -268,7 +521,7 @@ class TargetAPITest(ApiTestCase):
                 "id": str(target.id),
                 "create_time": "2011-06-12T00:00:00+00:00",
                 "client_context": client_context,
-                "content_bytes": mock.ANY,
+                "image_url": f"/targets/{target.id}/image",
                 "views": 5,
                 "safe_search_scores": {
                     "adult": "UNKNOWN",
@@ -281,6 +534,84 @@ class TargetAPITest(ApiTestCase):
             response.json,
         )
 
+    def _save_image_target(self) -> Target:
+        return Target(
+            feature_set=FeatureSet(
+                image=features.image.Image(data=base64.b64decode(self.test_image_b64))
+            )
+        ).save()
+
+    def test_get_target_image(self):
+        target = self._save_image_target()
+
+        response = self.get(f"/targets/{target.id}/image")
+
+        self.assertEqual(base64.b64decode(self.test_image_b64), response.data)
+        self.assertEqual("image/png", response.mimetype)
+        self.assertEqual((f"{target.id}-original", False), response.get_etag())
+        self.assertTrue(response.cache_control.private)
+        self.assertTrue(response.cache_control.immutable)
+
+    def test_get_target_image_not_modified(self):
+        target = self._save_image_target()
+
+        with self.app.test_client() as client:
+            response = client.get(
+                f"/targets/{target.id}/image?size=128",
+                headers={"If-None-Match": f'"{target.id}-128"'},
+            )
+
+        self.assertEqual(http.HTTPStatus.NOT_MODIFIED, response.status_code)
+        self.assertEmpty(response.data)
+        self.assertEmpty(Target.objects.get(id=target.id).feature_set.image.thumbnails)
+
+    def test_get_target_image_not_modified_checks_target_exists(self):
+        target = self._save_image_target()
+        target.delete()
+
+        with self.app.test_client() as client:
+            response = client.get(
+                f"/targets/{target.id}/image",
+                headers={"If-None-Match": f'"{target.id}-original"'},
+            )
+
+        self.assertEqual(http.HTTPStatus.NOT_FOUND, response.status_code)
+
+    def test_get_target_image_thumbnail_is_made_once(self):
+        target = self._save_image_target()
+
+        with mock.patch.object(
+            image_utils, "make_thumbnail", wraps=image_utils.make_thumbnail
+        ) as mock_make_thumbnail:
+            response = self.get(f"/targets/{target.id}/image?size=128")
+            cached_response = self.get(f"/targets/{target.id}/image?size=128")
+
+        mock_make_thumbnail.assert_called_once()
+        self.assertEqual(image_utils.THUMBNAIL_MIME_TYPE, response.mimetype)
+        self.assertEqual(response.data, cached_response.data)
+        thumbnails = Target.objects.get(id=target.id).feature_set.image.thumbnails
+        self.assertEqual([128], [thumbnail.size for thumbnail in thumbnails])
+
+    def test_get_target_image_invalid_size_raises(self):
+        target = self._save_image_target()
+
+        self.get(
+            f"/targets/{target.id}/image?size=100",
+            expected_status=http.HTTPStatus.BAD_REQUEST,
+            expected_message="Invalid size, expected one of [128, 256, 512].",
+        )
+
+    def test_get_target_image_without_image_raises(self):
+        target = Target(
+            feature_set=FeatureSet(text=features.text.Text(data=b"text"))
+        ).save()
+
+        self.get(
+            f"/targets/{target.id}/image",
+            expected_status=http.HTTPStatus.NOT_FOUND,
+            expected_message=f"Target {target.id} has no image.",
+        )
+
     def test_update_target_invalid_target_id_raises(self):
         self.patch(
             "/targets/foobar",
@@ -350,7 +681,7 @@ class TargetAPITest(ApiTestCase):
                 "title": "Title 2.0",
                 "description": "Description 2.0",
                 "creator": {"ip_address": "1.2.3.5"},
-                "content_bytes": mock.ANY,
+                "image_url": f"/targets/{target.id}/image",
                 "views": 10,
                 "safe_search_scores": {
                     "adult": "UNKNOWN",
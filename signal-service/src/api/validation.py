@@ -17,19 +17,57 @@ from __future__ import annotations
 
 import base64
 import binascii
+import enum
 import functools
 import http
+import itertools
+import json
 import logging
+import os
 from typing import Any, Callable, Iterator
 
 import flask
 import jsonschema
 
+import config
 from api.api_error import ApiError
 
 Schema = dict[str, Any]
 
 
+@enum.unique
+class OutputValidationMode(str, enum.Enum):
+    """How thoroughly responses are validated against their output schema."""
+
+    # Every response is validated, and those that are invalid are replaced by an error.
+    FULL = "FULL"
+    # Only one in `OUTPUT_VALIDATION_SAMPLE_RATE` responses of each endpoint is
+    # validated, and invalid ones are logged but still returned.
+    SAMPLED = "SAMPLED"
+    # Responses are not validated at all.
+    OFF = "OFF"
+
+
+# Validating large responses can take longer than generating them, so production only
+# validates a sample of them to surface contract breaks.
+OUTPUT_VALIDATION_MODE = OutputValidationMode(
+    os.environ.get(
+        "API_OUTPUT_VALIDATION_MODE",
+        OutputValidationMode.SAMPLED
+        if config.PROD_APP_VERSION
+        else OutputValidationMode.FULL,
+    ).upper()
+)
+OUTPUT_VALIDATION_SAMPLE_RATE = int(
+    os.environ.get("API_OUTPUT_VALIDATION_SAMPLE_RATE", 100)
+)
+
+# The form field with the JSON input of multipart requests.
+METADATA_FIELD = "metadata"
+# The header with the JSON input of requests whose body is raw bytes.
+METADATA_HEADER = "X-Metadata"
+
+
 def _validator_decorator(decorator):
     """A decorator for our validation decorator.
 
@@ -47,6 +85,27 @@ def _validator_decorator(decorator):
     return wrapper
 
 
+def get_input(request: flask.Request) -> Any:
+    """Returns the JSON input of a request.
+
+    Requests that upload raw content don't have a JSON body. Their input is read from
+    the `metadata` field of multipart requests, or from the `X-Metadata` header of
+    `application/octet-stream` requests instead, without reading the content.
+    """
+    if request.mimetype == "multipart/form-data":
+        metadata = request.form.get(METADATA_FIELD)
+    elif request.mimetype == "application/octet-stream":
+        metadata = request.headers.get(METADATA_HEADER)
+    else:
+        return request.get_json(silent=True)
+    try:
+        return json.loads(metadata) if metadata else {}
+    except ValueError as e:
+        raise ApiError(
+            http.HTTPStatus.BAD_REQUEST, f"Invalid upload metadata: {e}"
+        ) from e
+
+
 def _validate_content_encoding(unused_validator, encoding, instance, unused_schema):
     if encoding == "base64":
         try:
@@ -102,6 +161,8 @@ class Validator:
         self._input_validator = self.JSON_SCHEMA_VALIDATOR_CLS(self._input_schema)
         self._output_schema = output_schema
         self._output_validator = self.JSON_SCHEMA_VALIDATOR_CLS(self._output_schema)
+        # Counts responses to pick the sample to validate in `SAMPLED` mode.
+        self._response_counter = itertools.count()
 
     @property
     def _schemas(self) -> Iterator[Schema]:
@@ -127,14 +188,34 @@ class Validator:
 
     def _validate_request(self, request: flask.Request):
         try:
-            self._input_validator.validate(request.get_json(silent=True))
+            self._input_validator.validate(get_input(request))
         except jsonschema.ValidationError as e:
             logging.error(e)
             raise ApiError(http.HTTPStatus.BAD_REQUEST, e.message) from e
 
     def _validate_response(self, response: flask.Response):
+        if response.is_streamed:
+            # Streamed responses are generated while they are sent, so they would have
+            # to be buffered in full to be validated.
+            return
+        mode = OUTPUT_VALIDATION_MODE
+        if mode == OutputValidationMode.OFF:
+            return
+        if mode == OutputValidationMode.SAMPLED and (
+            next(self._response_counter) % OUTPUT_VALIDATION_SAMPLE_RATE
+        ):
+            return
         try:
             self._output_validator.validate(response.get_json(silent=True))
         except jsonschema.ValidationError as e:
-            logging.exception(e)
-            raise ApiError(http.HTTPStatus.INTERNAL_SERVER_ERROR) from e
+            # Logged once in a fixed format, so that failures can be counted from the
+            # logs. Only failures that fail the request get the full error.
+            logging.error(
+                "Output validation failed for %s (mode=%s): %s",
+                self._output_schema.get("title", "untitled schema"),
+                mode.value,
+                e.message,
+                exc_info=mode == OutputValidationMode.FULL,
+            )
+            if mode == OutputValidationMode.FULL:
+                raise ApiError(http.HTTPStatus.INTERNAL_SERVER_ERROR) from e
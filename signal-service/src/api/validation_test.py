@@ -16,6 +16,7 @@
 """Tests for the API valdation decorator."""
 
 import base64
+from unittest import mock
 
 import flask
 from absl.testing import absltest
@@ -69,9 +70,12 @@ class ValidatorTest(test_case.TestCase):
             self.assertRaisesWithLiteralMatch(
                 api_error.ApiError, "Server got itself in trouble"
             ),
+            self.assertLogs(level="ERROR") as logs,
         ):
             my_func()
 
+        self.assertLen(logs.output, 1)
+
     def test_base64_validator_validates_base64_string(self):
         @validation.Validator(
             input_schema={
@@ -111,6 +115,61 @@ class ValidatorTest(test_case.TestCase):
         ):
             my_func()
 
+    @mock.patch.object(validation, "OUTPUT_VALIDATION_SAMPLE_RATE", 3)
+    @mock.patch.object(
+        validation,
+        "OUTPUT_VALIDATION_MODE",
+        validation.OutputValidationMode.SAMPLED,
+    )
+    def test_sampled_validator_validates_one_in_n_responses(self):
+        @validation.Validator(
+            input_schema={},
+            output_schema={"title": "My output schema", "type": "number"},
+        )
+        def my_func():  # pylint: disable=unused-argument,disallowed-name
+            return {"bar": "not-a-number"}
+
+        with (
+            flask.Flask(__name__).test_request_context("/"),
+            self.assertLogs(level="ERROR") as logs,
+        ):
+            responses = [my_func() for _ in range(4)]
+
+        self.assertEqual([200] * 4, [response.status_code for response in responses])
+        self.assertEqual(
+            [
+                "ERROR:root:Output validation failed for My output schema "
+                "(mode=SAMPLED): {'bar': 'not-a-number'} is not of type 'number'"
+            ]
+            * 2,
+            logs.output,
+        )
+
+    @mock.patch.object(
+        validation, "OUTPUT_VALIDATION_MODE", validation.OutputValidationMode.OFF
+    )
+    def test_validator_skips_output_validation_when_off(self):
+        @VALIDATOR
+        def my_func():  # pylint: disable=unused-argument,disallowed-name
+            return {"bar": "not-a-number"}
+
+        with flask.Flask(__name__).test_request_context("/", json={"foo": "a string"}):
+            self.assertEqual(200, my_func().status_code)
+
+    @mock.patch.object(
+        validation, "OUTPUT_VALIDATION_MODE", validation.OutputValidationMode.OFF
+    )
+    def test_validator_still_validates_input_when_output_validation_is_off(self):
+        @VALIDATOR
+        def my_func():  # pylint: disable=unused-argument,disallowed-name
+            return {"bar": 123}
+
+        with (
+            flask.Flask(__name__).test_request_context("/", json={"foo": 456}),
+            self.assertRaises(api_error.ApiError),
+        ):
+            my_func()
+
 
 if __name__ == "__main__":
     absltest.main()
@@ -0,0 +1,284 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Define class for bulk importing Signals from hash list files into the DB.
+
+Hash lists are large dumps of hash digests shared by partners, either as CSV files or
+as newline-delimited JSON (NDJSON) files with one object per line. Since they can hold
+millions of hashes, they are validated and written to the database in chunks, rather
+than one signal at a time.
+"""
+
+import csv
+import dataclasses
+import datetime
+import enum
+import json
+import logging
+import os
+import re
+from typing import Any, Iterable, Iterator, Sequence
+
+import pymongo
+from bson.objectid import ObjectId
+
+from importers import importer
+from models.case import Case, Review
+from models.job import Job
+from models.signal import Content, Signal, Source
+from utils import iterators
+
+# The number of records to validate and write to the database at once.
+DEFAULT_CHUNK_SIZE = 5000
+
+# Valid hash digests by content type, after normalizing them to lowercase.
+_DIGEST_PATTERNS = {
+    Content.ContentType.HASH_PDQ: re.compile(r"[0-9a-f]{64}"),
+    Content.ContentType.HASH_MD5: re.compile(r"[0-9a-f]{32}"),
+}
+
+
+@enum.unique
+class FileFormat(str, enum.Enum):
+    CSV = "CSV"
+    NDJSON = "NDJSON"
+
+    @classmethod
+    def from_filepath(cls, filepath: str) -> "FileFormat":
+        """Infers the file format from the extension of a file."""
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension in (".ndjson", ".jsonl"):
+            return cls.NDJSON
+        return cls.CSV
+
+
+@dataclasses.dataclass(frozen=True)
+class ColumnMapping:
+    """Maps the columns (CSV) or keys (NDJSON) of a hash list to signal fields.
+
+    Attributes:
+        value: The column holding the hash digest.
+        content_type: The type of all hashes in the list.
+        source_signal_id: The column holding the ID of the hash at the source.
+        author: The column holding the original author of the hash.
+        report_date: The column holding the ISO 8601 date the hash was reported on.
+    """
+
+    value: str
+    content_type: Content.ContentType = Content.ContentType.HASH_PDQ
+    source_signal_id: str | None = None
+    author: str | None = None
+    report_date: str | None = None
+
+
+class HashListImporter(importer.BaseImporter):
+    """Importer for large lists of hashes in local CSV or NDJSON files.
+
+    Unlike other importers, signals are upserted in bulk: a chunk of records becomes a
+    single database write, which inserts hashes that are new and adds this source to
+    the signals of those that already exist. Progress is checkpointed after each chunk,
+    as the byte offset into the file, so that an interrupted import can be resumed.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        column_mapping: ColumnMapping,
+        file_format: FileFormat | None = None,
+        source_name: Source.Name = Source.Name.UNKNOWN,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        super().__init__(Job.JobSource.HASH_LIST)
+        self._filepath = filepath
+        self._column_mapping = column_mapping
+        self._file_format = file_format or FileFormat.from_filepath(filepath)
+        self._chunk_size = chunk_size
+        self.SIGNAL_SOURCE = source_name  # pylint: disable=invalid-name
+
+    def pre_check(self) -> None:
+        """Checks whether the importer is configured correctly."""
+        if not os.path.isfile(self._filepath):
+            raise importer.PreCheckError(f"{self._filepath} is not a file.")
+        if self._column_mapping.content_type not in _DIGEST_PATTERNS:
+            raise importer.PreCheckError(
+                f"Unsupported content type {self._column_mapping.content_type}, "
+                f"expected one of {list(_DIGEST_PATTERNS)}."
+            )
+
+    def _send_decisions(
+        self, decisions: Iterable[tuple[Signal, Review.Decision]]
+    ) -> None:
+        """Send the given decisions to the platform."""
+        # Hash lists are one-off dumps without a receiver for decisions.
+        return
+
+    def _read_records(
+        self, token: str
+    ) -> Iterator[tuple[list[dict[str, Any] | None], int]]:
+        """Yields chunks of records, with the byte offset into the file after each.
+
+        Reading starts from the offset that the last job for this file got to. Records
+        that cannot be parsed are yielded as `None`.
+
+        Args:
+            token: The continuation token of the file, from `importer.get_file_token`.
+                A file that has been replaced or changed since the last job gets a new
+                token, so it is read from the start.
+        """
+        checkpoint = self._get_checkpoint(token=token)
+        with open(self._filepath, "rb") as file:
+            lines = iterators.read_lines(file)
+            if self._file_format == FileFormat.CSV:
+                fieldnames = next(csv.reader(lines), None)
+            # Start over if the file has been truncated since the last job.
+            is_resumable = checkpoint.offset <= os.path.getsize(self._filepath)
+            if is_resumable and checkpoint.offset > file.tell():
+                file.seek(checkpoint.offset)
+
+            if self._file_format == FileFormat.CSV:
+                records = csv.DictReader(lines, fieldnames=fieldnames)
+            else:
+                records = (_parse_json_line(line) for line in lines if line.strip())
+            for chunk in iterators.grouper(records, self._chunk_size):
+                yield list(chunk), file.tell()
+
+    def _normalize_digests(self, records: Sequence[dict[str, Any] | None]) -> list[str]:
+        """Returns the normalized digest of each record, or "" if it is invalid."""
+        pattern = _DIGEST_PATTERNS[self._column_mapping.content_type]
+        digests = [
+            str(record.get(self._column_mapping.value) or "").strip().lower()
+            if isinstance(record, dict)
+            else ""
+            for record in records
+        ]
+        return [digest if pattern.fullmatch(digest) else "" for digest in digests]
+
+    def _get_column(self, record: dict[str, Any], column: str | None) -> str | None:
+        if column is None or record.get(column) in (None, ""):
+            return None
+        return str(record[column])
+
+    def _to_source(self, record: dict[str, Any]) -> Source:
+        report_date = self._get_column(record, self._column_mapping.report_date)
+        return Source(
+            name=self.SIGNAL_SOURCE,
+            author=self._get_column(record, self._column_mapping.author),
+            source_signal_id=self._get_column(
+                record, self._column_mapping.source_signal_id
+            ),
+            report_date=(
+                datetime.datetime.fromisoformat(report_date) if report_date else None
+            ),
+        )
+
+    def _to_sources(
+        self, records: Sequence[dict[str, Any] | None]
+    ) -> dict[str, Source]:
+        """Validates a chunk of records and returns the source of each valid digest.
+
+        Later records for the same digest take precedence over earlier ones. Invalid
+        records are skipped and counted on the job.
+        """
+        sources: dict[str, Source] = {}
+        for record, digest in zip(records, self._normalize_digests(records)):
+            try:
+                if not digest:
+                    raise ValueError("Invalid digest")
+                sources[digest] = self._to_source(record)
+            except ValueError:
+                self._job.invalid_size += 1
+        return sources
+
+    def _upsert_signals(self, signals: dict[str, Source]) -> list[ObjectId]:
+        """Upserts signals for the given digests and their sources in a single write.
+
+        Args:
+            signals: The source of each digest to import.
+
+        Returns:
+            The IDs of the signals that were newly inserted.
+        """
+        if not signals:
+            return []
+        operations = []
+        content_keys = []
+        for digest, source in signals.items():
+            source.validate()
+            source_doc = source.to_mongo().to_dict()
+            content = Content(
+                value=digest, content_type=self._column_mapping.content_type
+            )
+            signal_doc = {
+                "_id": ObjectId(),
+                "content": [content.to_mongo().to_dict()],
+                "sources": {"sources": [source_doc]},
+                "content_key": content.key,
+            }
+            content_keys.append(content.key)
+            operations.append(
+                pymongo.UpdateOne(
+                    {"content_key": content.key},
+                    {"$setOnInsert": signal_doc},
+                    upsert=True,
+                )
+            )
+            # Existing signals only get this source added, if they didn't have it yet.
+            operations.append(
+                pymongo.UpdateOne(
+                    {
+                        "content_key": content.key,
+                        "sources.sources.name": {"$ne": self.SIGNAL_SOURCE.value},
+                    },
+                    {"$push": {"sources.sources": source_doc}},
+                )
+            )
+        # pylint: disable-next=protected-access
+        result = Signal._get_collection().bulk_write(operations, ordered=True)
+        self._job.import_size += result.upserted_count
+        self._job.update_size += result.modified_count
+        if result.modified_count:
+            # A new source can change the priority of cases with existing signals.
+            updated_signals = Signal.objects(
+                content_key__in=content_keys,
+                sources__sources__name=self.SIGNAL_SOURCE,
+            ).only("id")
+            Case.invalidate_priorities(signal.id for signal in updated_signals)
+        return list(result.upserted_ids.values())
+
+    def _run(self) -> Iterable[ObjectId]:
+        """Imports the hashes of the file in bulk, one chunk of records at a time."""
+        file_size = os.path.getsize(self._filepath)
+        token = importer.get_file_token(self._filepath)
+        for records, offset in self._read_records(token):
+            yield from self._upsert_signals(self._to_sources(records))
+            self._checkpoint(importer.Checkpoint(token=token, offset=offset))
+            self._job.progress = offset / file_size if file_size else 1.0
+            self._save_progress()
+        if self._job.invalid_size:
+            logging.warning(
+                "Skipped %d invalid records in %s",
+                self._job.invalid_size,
+                self._filepath,
+            )
+        self._job.progress = 1.0
+        self._save_progress()
+        self._job.status = Job.JobStatus.SUCCESS
+
+
+def _parse_json_line(line: str) -> dict[str, Any] | None:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return record if isinstance(record, dict) else None
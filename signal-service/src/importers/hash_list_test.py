@@ -0,0 +1,227 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=missing-docstring
+"""Test that the hash list Signal Importer behaves as expected."""
+
+import datetime
+import json
+import os
+from unittest import mock
+
+from absl.testing import absltest, parameterized
+
+from importers import hash_list, importer
+from models.job import Job
+from models.signal import Content, Signal, Source, Sources
+from testing import test_case
+
+_PDQ_1 = "f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0"
+_PDQ_2 = "0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f"
+_PDQ_3 = "000000000000000000000000000000000000000000000000000000000000ffff"
+
+
+class HashListImporterTest(parameterized.TestCase, test_case.TestCase):
+    def _write_csv(self, *rows: str) -> str:
+        hash_file = self.create_tempfile(file_path="hashes.csv")
+        hash_file.write_text("\n".join(("hash,id,date",) + rows) + "\n")
+        return hash_file.full_path
+
+    def _write_ndjson(self, *records) -> str:
+        hash_file = self.create_tempfile(file_path="hashes.ndjson")
+        hash_file.write_text("".join(json.dumps(r) + "\n" for r in records))
+        return hash_file.full_path
+
+    def _run(self, filepath: str, **kwargs) -> tuple[list, Job]:
+        hash_importer = hash_list.HashListImporter(
+            filepath,
+            column_mapping=hash_list.ColumnMapping(
+                value="hash", source_signal_id="id", report_date="date"
+            ),
+            source_name=Source.Name.GIFCT,
+            **kwargs,
+        )
+        job = hash_importer._job  # pylint: disable=protected-access
+        new_ids = list(sum(hash_importer.run(20), ()))
+        del hash_importer
+        return new_ids, Job.objects.get(id=job.id)
+
+    def test_imports_csv(self):
+        filepath = self._write_csv(f"{_PDQ_1},1,2024-01-02", f"{_PDQ_2},2,")
+
+        new_ids, job = self._run(filepath)
+
+        self.assertLen(new_ids, 2)
+        signal = Signal.objects.get(content__value=_PDQ_1)
+        self.assertEqual(Content.ContentType.HASH_PDQ, signal.content[0].content_type)
+        source = signal.sources.sources[0]
+        self.assertEqual(Source.Name.GIFCT, source.name)
+        self.assertEqual("1", source.source_signal_id)
+        self.assertEqual(
+            datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc),
+            source.report_date,
+        )
+        self.assertEqual(Job.JobStatus.SUCCESS, job.status)
+        self.assertEqual(2, job.import_size)
+        self.assertEqual(1.0, job.progress)
+
+    def test_imports_ndjson(self):
+        filepath = self._write_ndjson({"hash": _PDQ_1, "id": 1}, {"hash": _PDQ_2})
+
+        new_ids, _ = self._run(filepath)
+
+        self.assertLen(new_ids, 2)
+        signal = Signal.objects.get(content__value=_PDQ_1)
+        self.assertEqual("1", signal.sources.sources[0].source_signal_id)
+
+    def test_normalizes_and_skips_invalid_digests(self):
+        filepath = self._write_ndjson(
+            {"hash": f" {_PDQ_1.upper()} "},
+            {"hash": "not a hash"},
+            {"hash": _PDQ_2[:-1]},
+            {"hash": _PDQ_2, "date": "yesterday"},
+            {"id": 1},
+        )
+        with open(filepath, "a", encoding="utf-8") as hash_file:
+            hash_file.write("{broken\n")
+
+        new_ids, job = self._run(filepath)
+
+        self.assertLen(new_ids, 1)
+        self.assertEqual(_PDQ_1, Signal.objects.get(id=new_ids[0]).content[0].value)
+        self.assertEqual(5, job.invalid_size)
+
+    def test_adds_source_to_existing_signal(self):
+        existing = Signal(
+            content=[Content(value=_PDQ_1, content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).save()
+        filepath = self._write_csv(f"{_PDQ_1},1,")
+
+        new_ids, job = self._run(filepath)
+
+        self.assertEmpty(new_ids)
+        self.assertEqual(1, Signal.objects.count())
+        self.assertEqual(
+            [Source.Name.TCAP, Source.Name.GIFCT],
+            [s.name for s in existing.reload().sources.sources],
+        )
+        self.assertEqual(1, job.update_size)
+
+    def test_adds_source_to_signal_with_equivalent_digest(self):
+        existing = Signal(
+            content=[
+                Content(value=_PDQ_1.upper(), content_type=Content.ContentType.HASH_PDQ)
+            ],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).save()
+        filepath = self._write_csv(f"{_PDQ_1},1,")
+
+        new_ids, job = self._run(filepath)
+
+        self.assertEmpty(new_ids)
+        self.assertLen(existing.reload().sources.sources, 2)
+        self.assertEqual(1, job.update_size)
+
+    def test_reimport_is_a_noop(self):
+        filepath = self._write_csv(f"{_PDQ_1},1,")
+        self._run(filepath)
+        # Start over from the beginning of the file.
+        Job.objects.update(unset__last_successful_continuation_token=True)
+
+        new_ids, job = self._run(filepath)
+
+        self.assertEmpty(new_ids)
+        self.assertEqual(1, Signal.objects.get().sources.sources.count())
+        self.assertEqual(0, job.update_size)
+
+    def _run_interrupted(self, filepath: str) -> None:
+        """Runs an import of a file that fails after its first chunk of one record."""
+        upsert_signals = hash_list.HashListImporter._upsert_signals
+        calls = []
+
+        def upsert_then_fail(hash_importer, signals):
+            calls.append(signals)
+            if len(calls) > 1:
+                raise RuntimeError("Interrupted")
+            return upsert_signals(hash_importer, signals)
+
+        with mock.patch.object(
+            hash_list.HashListImporter,
+            "_upsert_signals",
+            autospec=True,
+            side_effect=upsert_then_fail,
+        ), self.assertRaises(RuntimeError):
+            self._run(filepath, chunk_size=1)
+
+    def test_resumes_from_last_chunk(self):
+        filepath = self._write_csv(f"{_PDQ_1},1,", f"{_PDQ_2},2,", f"{_PDQ_3},3,")
+        self._run_interrupted(filepath)
+        Signal.objects.delete()
+
+        new_ids, _ = self._run(filepath, chunk_size=1)
+
+        self.assertLen(new_ids, 2)
+        self.assertCountEqual(
+            [_PDQ_2, _PDQ_3], [s.content[0].value for s in Signal.objects]
+        )
+
+    def test_resumes_each_file_from_its_own_checkpoint(self):
+        filepath = self._write_csv(f"{_PDQ_1},1,", f"{_PDQ_3},3,")
+        self._run_interrupted(filepath)
+        other_file = self.create_tempfile(file_path="other.ndjson")
+        other_file.write_text(json.dumps({"hash": _PDQ_2}) + "\n")
+        self._run(other_file.full_path)
+        Signal.objects.delete()
+
+        new_ids, _ = self._run(filepath)
+
+        self.assertLen(new_ids, 1)
+        self.assertEqual(_PDQ_3, Signal.objects.get().content[0].value)
+
+    def test_reads_rewritten_file_from_start(self):
+        filepath = self._write_csv(f"{_PDQ_1},1,", f"{_PDQ_2},2,")
+        self._run(filepath)
+        # The new file is larger, so the old offset is within it.
+        filepath = self._write_csv(f"{_PDQ_3},3,", f"{_PDQ_1},1,", f"{_PDQ_2},2,")
+        os.utime(filepath, ns=(0, 0))
+        Signal.objects.delete()
+
+        new_ids, _ = self._run(filepath)
+
+        self.assertLen(new_ids, 3)
+
+    @parameterized.parameters(
+        ("hashes.csv", hash_list.FileFormat.CSV),
+        ("hashes.txt", hash_list.FileFormat.CSV),
+        ("hashes.ndjson", hash_list.FileFormat.NDJSON),
+        ("hashes.JSONL", hash_list.FileFormat.NDJSON),
+    )
+    def test_file_format_from_filepath(self, filepath, expected):
+        self.assertEqual(expected, hash_list.FileFormat.from_filepath(filepath))
+
+    def test_pre_check_fails_for_unsupported_content_type(self):
+        hash_importer = hash_list.HashListImporter(
+            self._write_csv(),
+            column_mapping=hash_list.ColumnMapping(
+                value="hash", content_type=Content.ContentType.URL
+            ),
+        )
+
+        with self.assertRaises(importer.PreCheckError):
+            hash_importer.pre_check()
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -15,17 +15,33 @@
 """Define abstract class for importing Signals from difference sources into the DB."""
 
 import abc
+import dataclasses
 import datetime
 import enum
+import hashlib
 import logging
-from typing import Iterable
+import os
+from typing import Iterable, Iterator, TypeVar
 
+import pymongo
 from bson.objectid import ObjectId
 
 from models.case import Case, Review
 from models.job import Job
 from models.signal import Signal, Source
 from utils import iterators
+from utils.bloom_filter import BloomFilter
+
+T = TypeVar("T")
+
+# The number of new signals to insert into the database at once.
+_INSERT_BATCH_SIZE = 100
+# The error code of writes that violate a unique index.
+_DUPLICATE_KEY_ERROR = 11000
+# The minimum number of content keys to size the filter of known content for.
+_MIN_KNOWN_CONTENT_CAPACITY = 100_000
+# The number of bytes at the start of a file that are hashed to identify its content.
+_FILE_FINGERPRINT_BYTES = 64 * 1024
 
 
 class Error(Exception):
@@ -46,8 +62,28 @@ class Action(str, enum.Enum):
     UPDATE_OR_INSERT = "UPDATE_OR_INSERT"
 
 
-class Importer(metaclass=abc.ABCMeta):
-    """An abstract base class for importing Signals from different sources."""
+@dataclasses.dataclass(frozen=True)
+class Checkpoint:
+    """A position in the source data that an import can be resumed from.
+
+    Attributes:
+        token: The continuation token identifying a page or file in the source.
+        offset: How far into the data at `token` has already been imported. Paged
+            importers use the number of records, file importers the byte offset.
+    """
+
+    token: str | None = None
+    offset: int = 0
+
+
+class BaseImporter(metaclass=abc.ABCMeta):
+    """An abstract base class for importing Signals from different sources as a job.
+
+    Subclasses import the data in `_run()`. Imports can be resumed where a previous run
+    stopped (e.g. when it ran out of time) by reading `_get_checkpoint()` and calling
+    `_checkpoint()` with how far the data has been imported, which is committed to the
+    job by `_save_progress()`.
+    """
 
     SIGNAL_SOURCE = Source.Name.UNKNOWN
 
@@ -55,6 +91,7 @@ class Importer(metaclass=abc.ABCMeta):
         job_type = Job.JobType.SIGNAL_IMPORT
         logging.info("Starting job with type=%s, source=%s", job_type, source)
         self._job: Job = Job.start(type=job_type, source=source)
+        self._pending_checkpoint: Checkpoint | None = None
         logging.info("Job %s started", self._job.id)
 
     def __del__(self):
@@ -67,18 +104,59 @@ class Importer(metaclass=abc.ABCMeta):
         self._job.end()
         self._job = None
 
-    def _get_last_job(self):
-        """Gets the last job with a successful continuation token."""
+    def _get_last_job(self, token: str | None = None):
+        """Gets the last job with a successful continuation token.
+
+        Args:
+            token: The continuation token the job must have got to, if any. Importers
+                of several independent files use this to keep a checkpoint per file.
+        """
+        query = {"last_successful_continuation_token__exists": True}
+        if token is not None:
+            query = {"last_successful_continuation_token": token}
         return (
             Job.objects(
-                type=Job.JobType.SIGNAL_IMPORT,
-                source=self._job.source,
-                last_successful_continuation_token__exists=True,
+                type=Job.JobType.SIGNAL_IMPORT, source=self._job.source, **query
             )
             .order_by("-start_time")
             .first()
         )
 
+    def _get_checkpoint(self, token: str | None = None) -> Checkpoint:
+        """Gets the checkpoint of the last job to resume importing from.
+
+        Args:
+            token: The continuation token to get the checkpoint for, if any.
+        """
+        job = self._get_last_job(token)
+        if not job:
+            return Checkpoint()
+        return Checkpoint(
+            token=job.last_successful_continuation_token,
+            offset=job.continuation_offset,
+        )
+
+    def _checkpoint(self, checkpoint: Checkpoint) -> None:
+        """Sets the checkpoint reached once the next yielded record is imported."""
+        self._pending_checkpoint = checkpoint
+
+    def _resume_page(
+        self, token: str | None, records: Iterable[T], offset: int = 0
+    ) -> Iterator[T]:
+        """Yields the records of a page, checkpointing after each of them.
+
+        Args:
+            token: The continuation token that the page was requested with.
+            records: The records of the page.
+            offset: The number of records at the start of the page to skip, because
+                they have already been imported by a previous job.
+        """
+        for i, record in enumerate(records, start=1):
+            if i <= offset:
+                continue
+            self._checkpoint(Checkpoint(token=token, offset=i))
+            yield record
+
     def _get_decisions(
         self, start: datetime.datetime, end: datetime.datetime
     ) -> Iterable[tuple[Signal, Review.Decision]]:
@@ -119,11 +197,6 @@ class Importer(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
-    @abc.abstractmethod
-    def _get_data(self) -> Iterable[tuple[Signal, Action]]:
-        """Gets the data from the source."""
-        raise NotImplementedError()
-
     @abc.abstractmethod
     def _send_decisions(
         self, decisions: Iterable[tuple[Signal, Review.Decision]]
@@ -148,6 +221,53 @@ class Importer(metaclass=abc.ABCMeta):
         decisions = self._get_decisions(start=start, end=end)
         self._send_decisions(decisions)
 
+    def _save_progress(self) -> None:
+        """Saves the job, committing the checkpoint of the last imported record."""
+        if self._pending_checkpoint:
+            self._job.last_successful_continuation_token = (
+                self._pending_checkpoint.token
+            )
+            self._job.continuation_offset = self._pending_checkpoint.offset
+        self._job.save()
+
+    @abc.abstractmethod
+    def _run(self) -> Iterable[ObjectId]:
+        """Imports the data from the source, yielding the IDs of new signals."""
+        raise NotImplementedError()
+
+    def run(self, chunk_size) -> Iterable[tuple[ObjectId]]:
+        """Runs the importer job.
+
+        Args:
+            chunk_size: The number of signal IDs to return at a time.
+
+        Returns:
+            Chunks of new signal IDs that have been imported.
+        """
+        try:
+            self.pre_check()
+            yield from iterators.grouper(self._run(), chunk_size)
+        except:
+            self._job.status = Job.JobStatus.FAILURE
+            raise
+        finally:
+            self._close()
+
+
+class Importer(BaseImporter):
+    """An abstract base class for importing Signals from a source record by record.
+
+    Importers can be resumed where a previous run stopped by reading
+    `_get_checkpoint()` in `_get_data()` and calling `_checkpoint()` before yielding
+    each record. A checkpoint is only committed to the job once the record yielded
+    after it has been fully imported.
+    """
+
+    @abc.abstractmethod
+    def _get_data(self) -> Iterable[tuple[Signal, Action]]:
+        """Gets the data from the source."""
+        raise NotImplementedError()
+
     def _insert_signal(self, signal) -> ObjectId:
         signal.save()
         self._job.import_size += 1
@@ -155,11 +275,24 @@ class Importer(metaclass=abc.ABCMeta):
 
     def _update_signal(self, signal) -> ObjectId | None:
         # New imports should only have one item in signal content
-        existing_signal = Signal.objects.get(content__value=signal.content[0].value)
+        existing = (
+            Signal.objects(content_key=signal.content[0].key)
+            .only("id", "fingerprint")
+            .get()
+        )
+        # Skip loading the full signal if it was last updated with the same data.
+        if existing.fingerprint == signal.fingerprint:
+            return None
+        existing_signal = Signal.objects.get(id=existing.id)
         if signal == existing_signal:
+            # Store the fingerprint so that the signal isn't loaded again next time.
+            Signal.objects(id=existing.id).update_one(
+                set__fingerprint=signal.fingerprint
+            )
             return None
         signal.merge(existing_signal)
         signal.save()
+        Case.invalidate_priorities([signal.id])
         self._job.update_size += 1
         return signal.id
 
@@ -167,7 +300,7 @@ class Importer(metaclass=abc.ABCMeta):
         source_name = signal.sources.sources[0].name
         try:
             # TODO: Check against all content items.
-            signal = Signal.objects.get(content=signal.content)
+            signal = Signal.objects.get(content_key=signal.content[0].key)
         except Signal.DoesNotExist:
             logging.info(
                 "Cannot redact Signal that does not exist. "
@@ -177,41 +310,104 @@ class Importer(metaclass=abc.ABCMeta):
             return None
         signal.redact(source_name)
         signal.save()
+        Case.invalidate_priorities([signal.id])
         self._job.delete_size += 1
         return signal.id
 
+    def _load_known_content(self) -> BloomFilter:
+        """Loads the content keys of all existing signals into a Bloom filter."""
+        known_content = BloomFilter(
+            capacity=max(2 * Signal.objects.count(), _MIN_KNOWN_CONTENT_CAPACITY)
+        )
+        for doc in (
+            Signal.objects(content_key__ne=None).only("content_key").as_pymongo()
+        ):
+            known_content.add(doc["content_key"])
+        return known_content
+
+    def _insert_signals(self, signals: Iterable[Signal]) -> list[ObjectId]:
+        signals = list(signals)
+        if not signals:
+            return []
+        for signal in signals:
+            signal.validate()
+        docs = [signal.to_mongo() for signal in signals]
+        try:
+            # pylint: disable-next=protected-access
+            Signal._get_collection().insert_many(docs, ordered=False)
+            duplicates = set()
+        except pymongo.errors.BulkWriteError as e:
+            errors = e.details["writeErrors"]
+            if any(error["code"] != _DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            # Signals with the same content were stored since the known content was
+            # loaded, e.g. by a concurrent import, so these are merged into them.
+            duplicates = {error["index"] for error in errors}
+        ids = []
+        for i, (signal, doc) in enumerate(zip(signals, docs)):
+            if i in duplicates:
+                self._update_signal(signal)
+            else:
+                ids.append(doc["_id"])
+        self._job.import_size += len(ids)
+        return ids
+
     def _run(self) -> Iterable[ObjectId]:
-        """Imports the data retrieved from the source and updates the database."""
+        """Imports the data retrieved from the source and updates the database.
+
+        Signals whose content is definitely not in the database yet are inserted in
+        bulk without looking them up first. Only the rest need a database query to
+        find out whether they should be updated or inserted.
+        """
+        known_content = self._load_known_content()
+        # New signals waiting to be inserted, keyed by their content key.
+        new_signals: dict[str, Signal] = {}
         for signal, action in self._get_data():
             if action == Action.UPDATE_OR_INSERT:
-                try:
-                    self._update_signal(signal)
-                except Signal.DoesNotExist:
-                    yield self._insert_signal(signal)
+                signal.fingerprint = signal.calculate_fingerprint()
+                # New imports should only have one item in signal content.
+                key = signal.content[0].key
+                if key in new_signals:
+                    signal.merge(new_signals.pop(key))
+                    new_signals[key] = signal
+                elif signal.content[0].value is not None and key not in known_content:
+                    known_content.add(key)
+                    new_signals[key] = signal
+                else:
+                    try:
+                        self._update_signal(signal)
+                    except Signal.DoesNotExist:
+                        yield self._insert_signal(signal)
             elif action == Action.DELETE:
+                # The signal to redact may still be waiting to be inserted.
+                yield from self._insert_signals(new_signals.values())
+                new_signals.clear()
                 self._delete_signal(signal)
             else:
                 raise ValueError(f"Unknown action {action}, expected one of {Action}")
-            self._job.save()
+
+            if len(new_signals) >= _INSERT_BATCH_SIZE:
+                yield from self._insert_signals(new_signals.values())
+                new_signals.clear()
+            # Records are only done once their signals have been written, so progress is
+            # not saved while there are new signals waiting to be inserted.
+            if not new_signals:
+                self._save_progress()
+        yield from self._insert_signals(new_signals.values())
+        self._save_progress()
         self._job.status = Job.JobStatus.SUCCESS
 
-    def run(self, chunk_size) -> Iterable[tuple[ObjectId]]:
-        """Runs the importer job.
 
-        Args:
-            chunk_size: The number of signal IDs to return at a time.
+def get_file_token(filepath: str) -> str:
+    """Returns a continuation token that identifies a file and its content.
 
-        Returns:
-            Chunks of new signal IDs that have been imported.
-        """
-        try:
-            self.pre_check()
-            yield from iterators.grouper(self._run(), chunk_size)
-        except:
-            self._job.status = Job.JobStatus.FAILURE
-            raise
-        finally:
-            self._close()
+    The token holds the modification time of the file and a hash of its first block, so
+    that a byte offset is not resumed from once the file has been replaced or changed.
+    """
+    mtime_ns = os.stat(filepath).st_mtime_ns
+    with open(filepath, "rb") as file:
+        digest = hashlib.sha256(file.read(_FILE_FINGERPRINT_BYTES)).hexdigest()
+    return f"{filepath}@{mtime_ns}:{digest[:16]}"
 
 
 def _make_tz_aware(date: datetime.datetime) -> datetime.datetime:
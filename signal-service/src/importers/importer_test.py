@@ -30,6 +30,9 @@ from testing.test_entities import (
     TEST_CASE_RESOLVED_BLOCKED,
     TEST_SIGNAL,
 )
+from utils.bloom_filter import BloomFilter
+
+_MD5 = Content.ContentType.HASH_MD5
 
 SIGNAL_1 = Signal(
     sources=Sources(sources=[Source()]),
@@ -194,6 +197,69 @@ class ImporterLibTest(test_case.TestCase):
         job = Job.objects.get()
         self.assertEqual(0, job.update_size)
 
+    def test_run_skips_updating_data_with_same_fingerprint(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+
+        signal = copy.deepcopy(SIGNAL_1)
+        signal.fingerprint = signal.calculate_fingerprint()
+        # Data that differs from the import is kept as the fingerprint is unchanged.
+        signal.sources.sources[0].name = Source.Name.TCAP
+        signal.save()
+
+        list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        self.assertEqual(Source.Name.TCAP, Signal.objects.get().sources.sources[0].name)
+        self.assertEqual(0, Job.objects.get().update_size)
+
+    def test_run_updates_fingerprint(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+
+        signal = copy.deepcopy(SIGNAL_1)
+        signal.sources.sources[0].name = Source.Name.TCAP
+        signal.save()
+
+        list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        self.assertEqual(
+            copy.deepcopy(SIGNAL_1).calculate_fingerprint(),
+            Signal.objects.get().fingerprint,
+        )
+
+    def test_run_stores_fingerprint_of_unchanged_signal(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+
+        copy.deepcopy(SIGNAL_1).save()
+
+        list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        self.assertEqual(
+            copy.deepcopy(SIGNAL_1).calculate_fingerprint(),
+            Signal.objects.get().fingerprint,
+        )
+        self.assertEqual(0, Job.objects.get().update_size)
+
+    def test_run_updates_redacted_signal_with_same_data(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_5), importer.Action.DELETE
+                yield copy.deepcopy(SIGNAL_5), importer.Action.UPDATE_OR_INSERT
+
+        signal = copy.deepcopy(SIGNAL_5)
+        signal.fingerprint = signal.calculate_fingerprint()
+        signal.save()
+
+        list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        signal = Signal.objects.get()
+        self.assertFalse(signal.sources.sources[0].is_redacted)
+        self.assertEqual(signal.calculate_fingerprint(), signal.fingerprint)
+
     def test_run_updates_data(self):
         class TestImporter(TestImporterWithPrecheck):
             def _get_data(self):
@@ -208,6 +274,179 @@ class ImporterLibTest(test_case.TestCase):
         job = Job.objects.get()
         self.assertEqual(1, job.update_size)
 
+    def test_run_updates_signal_with_equivalent_content(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield Signal(
+                    sources=Sources(sources=[Source(name=Source.Name.GIFCT)]),
+                    content=[Content(value="abcdef", content_type=_MD5)],
+                ), importer.Action.UPDATE_OR_INSERT
+
+        Signal(
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+            content=[Content(value="ABCDEF", content_type=_MD5)],
+        ).save()
+
+        new_ids = list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        self.assertEmpty(new_ids)
+        signal = Signal.objects.get()
+        self.assertCountEqual(
+            [Source.Name.TCAP, Source.Name.GIFCT],
+            [source.name for source in signal.sources.sources],
+        )
+        self.assertEqual(1, Job.objects.get().update_size)
+
+    def test_run_merges_signals_stored_since_content_was_loaded(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+                yield copy.deepcopy(SIGNAL_2), importer.Action.UPDATE_OR_INSERT
+
+        signal = copy.deepcopy(SIGNAL_1)
+        signal.sources.sources[0].name = Source.Name.TCAP
+        signal.save()
+        test_importer = TestImporter(Job.JobSource.UNKNOWN)
+
+        with mock.patch.object(
+            test_importer, "_load_known_content", return_value=BloomFilter(100)
+        ):
+            new_ids = list(sum(test_importer.run(20), ()))
+
+        self.assertEqual(
+            [Signal.objects.get(content_key=SIGNAL_2.content[0].key).id], new_ids
+        )
+        self.assertEqual(2, Signal.objects.count())
+        self.assertLen(signal.reload().sources.sources, 2)
+
+    def test_run_marks_priorities_of_updated_signals_stale(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+
+        signal = copy.deepcopy(SIGNAL_1)
+        signal.sources.sources[0].name = Source.Name.TCAP
+        signal.save()
+        case = Case(signal_ids=[signal.id]).save()
+
+        list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        self.assertTrue(case.reload().is_priority_stale)
+
+    def test_run_commits_checkpoint_after_importing_record(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield from self._resume_page(
+                    "page1",
+                    [
+                        (copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT),
+                        (copy.deepcopy(SIGNAL_2), importer.Action.UPDATE_OR_INSERT),
+                    ],
+                )
+                raise ValueError
+
+        copy.deepcopy(SIGNAL_1).save()
+        copy.deepcopy(SIGNAL_2).save()
+
+        with self.assertRaises(ValueError):
+            list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        job = Job.objects.get()
+        self.assertEqual("page1", job.last_successful_continuation_token)
+        self.assertEqual(2, job.continuation_offset)
+
+    def test_run_does_not_commit_checkpoint_before_inserting_new_signals(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield from self._resume_page(
+                    "page1",
+                    [(copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT)],
+                )
+                raise ValueError
+
+        with self.assertRaises(ValueError):
+            list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        self.assertIsNone(Job.objects.get().last_successful_continuation_token)
+
+    def test_run_inserts_new_signals_without_looking_them_up(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+                yield copy.deepcopy(SIGNAL_2), importer.Action.UPDATE_OR_INSERT
+
+        copy.deepcopy(SIGNAL_1).save()
+        test_importer = TestImporter(Job.JobSource.UNKNOWN)
+
+        update_signal = test_importer._update_signal  # pylint: disable=protected-access
+        with mock.patch.object(
+            test_importer, "_update_signal", wraps=update_signal
+        ) as update_signal:
+            new_ids = list(sum(test_importer.run(20), ()))
+
+        self.assertLen(new_ids, 1)
+        self.assertEqual(SIGNAL_2, Signal.objects.get(id=new_ids[0]))
+        update_signal.assert_called_once()
+
+    def test_run_merges_new_signals_with_same_content(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+                signal = copy.deepcopy(SIGNAL_1)
+                signal.sources.sources[0].name = Source.Name.TCAP
+                yield signal, importer.Action.UPDATE_OR_INSERT
+
+        new_ids = list(sum(TestImporter(Job.JobSource.UNKNOWN).run(20), ()))
+
+        self.assertLen(new_ids, 1)
+        signal = Signal.objects.get()
+        self.assertEqual(
+            [Source.Name.TCAP, Source.Name.UNKNOWN],
+            [source.name for source in signal.sources.sources],
+        )
+
+    def test_run_redacts_new_signal_from_same_run(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                yield copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT
+                yield copy.deepcopy(SIGNAL_1), importer.Action.DELETE
+
+        list(TestImporter(Job.JobSource.UNKNOWN).run(20))
+
+        signal = Signal.objects.get()
+        self.assertEqual("[REDACTED]", signal.content[0].value)
+
+    def test_run_resumes_from_checkpoint(self):
+        class TestImporter(TestImporterWithPrecheck):
+            def _get_data(self):
+                checkpoint = self._get_checkpoint()
+                yield from self._resume_page(
+                    checkpoint.token,
+                    [
+                        (copy.deepcopy(SIGNAL_1), importer.Action.UPDATE_OR_INSERT),
+                        (copy.deepcopy(SIGNAL_2), importer.Action.UPDATE_OR_INSERT),
+                        (copy.deepcopy(SIGNAL_4), importer.Action.UPDATE_OR_INSERT),
+                    ],
+                    checkpoint.offset,
+                )
+
+        Job(
+            status=Job.JobStatus.FAILURE,
+            type=Job.JobType.SIGNAL_IMPORT,
+            source=Job.JobSource.UNKNOWN,
+            start_time=datetime.datetime(2020, 12, 28),
+            last_successful_continuation_token="page1",
+            continuation_offset=2,
+        ).save()
+
+        new_ids = list(sum(TestImporter(Job.JobSource.UNKNOWN).run(20), ()))
+
+        self.assertLen(new_ids, 1)
+        self.assertEqual(SIGNAL_4, Signal.objects.get(id=new_ids[0]))
+        job = Job.objects.order_by("-start_time").first()
+        self.assertEqual("page1", job.last_successful_continuation_token)
+        self.assertEqual(3, job.continuation_offset)
+
     def test_get_decisions_returns_decisions(self):
         signal = copy.deepcopy(TEST_SIGNAL)
         signal.sources.sources[0].name = Source.Name.TCAP
@@ -18,7 +18,7 @@ import enum
 import functools
 import logging
 from typing import Any, Dict, Iterable, Iterator
-from urllib.parse import urljoin
+from urllib.parse import urlencode, urljoin
 
 import requests
 from retry import retry
@@ -34,6 +34,7 @@ from models.signal import (
     Source,
     Sources,
 )
+from utils import json
 from utils.iterators import grouper
 
 # Fields from the TCAP API responses
@@ -41,6 +42,9 @@ _AUTH_TOKEN = "token"
 _RESULTS = "results"
 _NEXT = "next"
 
+# Parameters of the TCAP API requests.
+_PAGE_SIZE = "page_size"
+
 # Fields in the returned signals.
 _ID = "id"
 _URL = "url"
@@ -57,6 +61,9 @@ _RETRY_CONFIG = {"tries": 5, "delay": 1, "backoff": 2}
 
 REQUEST_TIMEOUT_SEC = 30
 
+# The number of bytes to read from a response at a time when streaming it.
+_STREAM_CHUNK_SIZE = 64 * 1024
+
 _GROUP_SIZE = 10
 
 
@@ -82,11 +89,14 @@ class TcapApiImporter(importer.Importer):
         username: str,
         password: str,
         server: Server = Server.STAGING,
+        page_size: int | None = None,
     ):
         super().__init__(Job.JobSource.TCAP_API)
         self._username = username
         self._password = password
         self._server = server
+        # The number of results to request per page. Uses the API default if unset.
+        self._page_size = page_size
 
     @functools.cached_property
     def _auth_token(self) -> str | None:
@@ -181,15 +191,14 @@ class TcapApiImporter(importer.Importer):
             )
             yield (new_signal, importer.Action.UPDATE_OR_INSERT)
 
-    def _get_first_request_url(self) -> str:
-        """Get the first request from after the last successful call."""
-        job = self._get_last_job()
-        next_url = (
-            job.last_successful_continuation_token
-            if job and job.last_successful_continuation_token
-            else None
-        )
-        return next_url or urljoin(self._server.value, "integrations/api/jigsaw/urls/")
+    def _get_first_request_url(self, checkpoint: importer.Checkpoint) -> str:
+        """Get the first request from the last successful call."""
+        if checkpoint.token:
+            return checkpoint.token
+        url = urljoin(self._server.value, "integrations/api/jigsaw/urls/")
+        if self._page_size:
+            url += "?" + urlencode({_PAGE_SIZE: self._page_size})
+        return url
 
     def pre_check(self) -> None:
         """Checks whether the importer is configured correctly."""
@@ -199,7 +208,10 @@ class TcapApiImporter(importer.Importer):
     def _get_data(
         self,
     ) -> Iterable[tuple[Signal, importer.Action]]:
-        next_request_url = self._get_first_request_url()
+        checkpoint = self._get_checkpoint()
+        next_request_url = self._get_first_request_url(checkpoint)
+        # Records of the first page that have already been imported by a previous job.
+        offset = checkpoint.offset
 
         while next_request_url:
             token = self._auth_token
@@ -207,21 +219,36 @@ class TcapApiImporter(importer.Importer):
                 logging.error("Failed to get authorization token. Aborting.")
                 return
             try:
-                response = _send_request(
+                response = _request(
                     next_request_url,
                     headers={"Authorization": f"Bearer {token}"},
+                    stream=True,
                 )
             except importer.Error:
                 logging.warning("Failed to get data from TCAP.")
                 return
 
-            response_data = response.get(_RESULTS)
-            if not response_data:
+            with response:
+                # Results are converted as they are read from the response, so that
+                # only a single result is held in memory regardless of the page size.
+                response_data = json.ObjectStream(
+                    response.iter_content(_STREAM_CHUNK_SIZE), array_field=_RESULTS
+                )
+                try:
+                    yield from self._resume_page(
+                        next_request_url,
+                        self._convert_to_signals(response_data),
+                        offset,
+                    )
+                except json.JSONDecodeError as e:
+                    raise importer.SourceResponseError(
+                        f"Bad response from TCAP API: {e}"
+                    ) from e
+            if not response_data.item_count:
                 return
-            yield from self._convert_to_signals(response_data)
+            offset = 0
 
-            next_request_url = response.get(_NEXT)
-            self._job.last_successful_continuation_token = self._job.continuation_token
+            next_request_url = response_data.fields.get(_NEXT)
             self._job.continuation_token = next_request_url
 
     def _send_decisions(
@@ -257,7 +284,7 @@ class TcapApiImporter(importer.Importer):
 # The TCAP API seems to allow very few QPS for both API endpoints. We pause and
 # retry these calls.
 @retry((importer.SourceResponseError), **_RETRY_CONFIG)
-def _send_request(url: str, method: str = "GET", **kwargs) -> Dict[str, any]:
+def _request(url: str, method: str = "GET", **kwargs) -> requests.Response:
     response = requests.request(
         method=method, url=url, timeout=REQUEST_TIMEOUT_SEC, **kwargs
     )
@@ -265,4 +292,8 @@ def _send_request(url: str, method: str = "GET", **kwargs) -> Dict[str, any]:
         raise importer.SourceResponseError(
             f"Bad response from TCAP API: {response.text}"
         )
-    return response.json()
+    return response
+
+
+def _send_request(url: str, method: str = "GET", **kwargs) -> Dict[str, any]:
+    return _request(url, method=method, **kwargs).json()
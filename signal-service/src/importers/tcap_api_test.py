@@ -196,6 +196,64 @@ class TcapApiImporterLibTest(parameterized.TestCase, test_case.TestCase):
         assert adapter.called
         self.assertEqual({"page": ["3"]}, adapter.last_request.qs)
 
+    def test_resumes_from_job_checkpoint_offset(self):
+        page_url = "https://staging.terrorismanalytics.org/integrations/api/jigsaw/urls/?page=3"
+        second_result = copy.deepcopy(_MOCK_RESULT)
+        second_result["id"] = 456
+        second_result["url"] = "jigsaw.com/Cato_Street"
+        self.mock_requests.get(
+            page_url, json={"results": [_MOCK_RESULT, second_result]}
+        )
+        Job(
+            status=Job.JobStatus.FAILURE,
+            type=Job.JobType.SIGNAL_IMPORT,
+            source=Job.JobSource.TCAP_API,
+            start_time=datetime.datetime(2020, 12, 28),
+            last_successful_continuation_token=page_url,
+            continuation_offset=1,
+        ).save()
+
+        new_ids = list(
+            sum(
+                tcap_api.TcapApiImporter(username="user1", password="pass1").run(20), ()
+            )
+        )
+
+        self.assertLen(new_ids, 1)
+        self.assertEqual(
+            "jigsaw.com/Cato_Street", Signal.objects.get(id=new_ids[0]).content[0].value
+        )
+        job = Job.objects.order_by("-start_time").first()
+        self.assertEqual(page_url, job.last_successful_continuation_token)
+        self.assertEqual(2, job.continuation_offset)
+
+    def test_get_data_fails_on_truncated_response(self):
+        self.mock_requests.get(
+            "https://staging.terrorismanalytics.org/integrations/api/jigsaw/urls/",
+            text='{"results": [' + json.dumps(_MOCK_RESULT) + ", {",
+        )
+
+        with self.assertRaises(importer.SourceResponseError):
+            list(tcap_api.TcapApiImporter(username="user1", password="pass1").run(20))
+
+        job = Job.objects.order_by("-start_time").first()
+        self.assertEqual(Job.JobStatus.FAILURE, job.status)
+
+    def test_requests_page_size(self):
+        adapter = self.mock_requests.get(
+            "https://staging.terrorismanalytics.org/integrations/api/jigsaw/urls/",
+            json={},
+        )
+
+        list(
+            tcap_api.TcapApiImporter(
+                username="user1", password="pass1", page_size=500
+            ).run(20)
+        )
+
+        assert adapter.called
+        self.assertEqual({"page_size": ["500"]}, adapter.last_request.qs)
+
     def test_api_calls_retry(self):
         adapter = self.mock_requests.get(
             "https://staging.terrorismanalytics.org/integrations/api/jigsaw/urls/",
@@ -29,6 +29,7 @@ from models.signal import (
     Source,
     Sources,
 )
+from utils import iterators
 
 
 class TcapCsvImporter(importer.Importer):
@@ -77,9 +78,23 @@ class TcapCsvImporter(importer.Importer):
     def _get_data(
         self,
     ) -> Iterable[tuple[Signal, importer.Action]]:
-        """Gets the raw data from the CSV."""
-        with open(self._filepath, encoding="utf-8") as csv_file:
-            csvreader = csv.DictReader(csv_file)
+        """Gets the raw data from the CSV.
+
+        Rows are read from the byte offset that the last job for this file got to, so
+        that rows that have already been imported are not read again.
+        """
+        checkpoint = self._get_checkpoint()
+        token = importer.get_file_token(self._filepath)
+        with open(self._filepath, "rb") as csv_file:
+            lines = iterators.read_lines(csv_file)
+            fieldnames = next(csv.reader(lines), None)
+            # Start over if the file has been replaced or changed since the last job.
+            is_resumable = checkpoint.token == token and (
+                checkpoint.offset <= os.path.getsize(self._filepath)
+            )
+            if is_resumable and checkpoint.offset > csv_file.tell():
+                csv_file.seek(checkpoint.offset)
+            csvreader = csv.DictReader(lines, fieldnames=fieldnames)
             for line in csvreader:
                 features = ContentFeatures(
                     description=line[self._DESCRIPTION_COL],
@@ -114,4 +129,7 @@ class TcapCsvImporter(importer.Importer):
                     content_features=features,
                     content_status=content_status,
                 )
+                self._checkpoint(
+                    importer.Checkpoint(token=token, offset=csv_file.tell())
+                )
                 yield (signal, importer.Action.UPDATE_OR_INSERT)
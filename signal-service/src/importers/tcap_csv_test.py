@@ -17,12 +17,14 @@
 
 import csv
 import datetime
+import os
 import random
 from unittest import mock
 
 from absl.testing import parameterized
 
-from importers import tcap_csv
+from importers import importer, tcap_csv
+from models.job import Job
 from models.signal import (
     Content,
     ContentFeatures,
@@ -33,6 +35,28 @@ from models.signal import (
 )
 from testing import test_case
 
+_HEADER = [
+    "ID",
+    "Description",
+    "URL",
+    "Created On",
+    "Extreme Content",
+    "Pi I",
+    "Core Terrorist Group - Terrorist Group Fk → Name",
+]
+
+
+def _make_row(signal_id: str) -> list[str]:
+    return [
+        signal_id,
+        "This is bad content because it is.",
+        f"google.com/{signal_id}",
+        "12/21/22 16:41:59",
+        "NO",
+        "NTS",
+        "Terrorist Entity ABC",
+    ]
+
 
 class TcapCsvImporterLibTest(parameterized.TestCase, test_case.TestCase):
     @mock.patch.object(random, "randrange", return_value=2)
@@ -122,3 +146,60 @@ class TcapCsvImporterLibTest(parameterized.TestCase, test_case.TestCase):
             expected,
             Signal.objects.get(id=new_ids[0]),
         )
+
+    def _write_csv(self, filepath: str, signal_ids: list[str]) -> int:
+        """Writes a CSV with the given rows and returns the offset after the first."""
+        with open(filepath, "w", encoding="utf-8", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(_HEADER)
+            writer.writerow(_make_row(signal_ids[0]))
+            offset = csv_file.tell()
+            for signal_id in signal_ids[1:]:
+                writer.writerow(_make_row(signal_id))
+        return offset
+
+    def _save_checkpoint(self, token: str, offset: int) -> None:
+        Job(
+            type=Job.JobType.SIGNAL_IMPORT,
+            source=Job.JobSource.TCAP_CSV,
+            status=Job.JobStatus.FAILURE,
+            last_successful_continuation_token=token,
+            continuation_offset=offset,
+        ).save()
+
+    def test_csv_resumes_from_last_imported_row(self):
+        filepath = self.create_tempfile().full_path
+        offset = self._write_csv(filepath, ["1", "2"])
+        self._save_checkpoint(importer.get_file_token(filepath), offset)
+
+        new_ids = list(sum(tcap_csv.TcapCsvImporter(filepath).run(20), ()))
+
+        self.assertLen(new_ids, 1)
+        self.assertEqual(
+            "google.com/2", Signal.objects.get(id=new_ids[0]).content[0].value
+        )
+
+    def test_csv_starts_over_when_file_is_replaced(self):
+        filepath = self.create_tempfile().full_path
+        offset = self._write_csv(filepath, ["1", "2"])
+        self._save_checkpoint(importer.get_file_token(filepath), offset)
+        # The new file is larger, and the old offset is now in the middle of a row.
+        self._write_csv(filepath, ["40", "3"])
+        os.utime(filepath, ns=(0, 0))
+
+        new_ids = list(sum(tcap_csv.TcapCsvImporter(filepath).run(20), ()))
+
+        self.assertLen(new_ids, 2)
+        self.assertEqual(2, Signal.objects.count())
+
+    def test_csv_checkpoint_is_committed_per_file_content(self):
+        filepath = self.create_tempfile().full_path
+        self._write_csv(filepath, ["1", "2"])
+
+        list(tcap_csv.TcapCsvImporter(filepath).run(20))
+
+        job = Job.objects.order_by("-start_time").first()
+        self.assertEqual(
+            importer.get_file_token(filepath), job.last_successful_continuation_token
+        )
+        self.assertEqual(os.path.getsize(filepath), job.continuation_offset)
@@ -27,6 +27,7 @@ from importers import importer
 from models.case import Review
 from models.job import Job
 from models.signal import Content, ContentFeatures, Signal, Source, Sources
+from utils import json
 
 # Fields in the ThreatExchange API response.
 _RESPONSE_DATA = "data"
@@ -54,6 +55,9 @@ _TAGS = "tags"
 
 REQUEST_TIMEOUT_SEC = 30
 
+# The number of bytes to read from a response at a time when streaming it.
+_STREAM_CHUNK_SIZE = 64 * 1024
+
 SignalData = dict[str, Any]
 
 GIFCT_DECISION_MAP = {
@@ -161,10 +165,13 @@ class ThreatExchangeImporter(importer.Importer):
         self,
         privacy_group_id: str,
         access_token: str,
+        page_size: int | None = None,
     ):
         super().__init__(Job.JobSource.THREAT_EXCHANGE_API)
         self._privacy_group_id = privacy_group_id
         self._access_token = access_token
+        # The number of updates to request per page. Uses the API default if unset.
+        self._page_size = page_size
 
     def _convert_to_signals(
         self, signals: list[SignalData]
@@ -191,11 +198,8 @@ class ThreatExchangeImporter(importer.Importer):
             )
             yield (new_signal, action)
 
-    def _get_first_request_url(self) -> str:
-        """Get the threat_updates request from after the last successful call."""
-        job = self._get_last_job()
-        after = job.last_successful_continuation_token if job else None
-
+    def _get_first_request_url(self, after: str | None) -> str:
+        """Get the threat_updates request from the last successful call."""
         threat_updates_url = (
             "https://graph.facebook.com/v16.0/"
             f"{self._privacy_group_id}/threat_updates?"
@@ -203,6 +207,7 @@ class ThreatExchangeImporter(importer.Importer):
             "fields=id,indicator,type,creation_time,last_updated,should_delete"
             ",tags,status,applications_with_opinions,descriptors"
             f"{'&after=' + after if after else ''}"
+            f"{'&limit=' + str(self._page_size) if self._page_size else ''}"
         )
         return threat_updates_url
 
@@ -233,24 +238,39 @@ class ThreatExchangeImporter(importer.Importer):
     def _get_data(
         self,
     ) -> Iterable[tuple[Signal, importer.Action]]:
-        next_request_url = self._get_first_request_url()
+        checkpoint = self._get_checkpoint()
+        # The `after` cursor that the current page was requested with. The first page of
+        # a full import has no cursor, which is checkpointed as an empty string.
+        after = checkpoint.token or ""
+        # Records of the first page that have already been imported by a previous job.
+        offset = checkpoint.offset
+        next_request_url = self._get_first_request_url(after)
         while next_request_url:
-            response = self._session.get(
-                next_request_url, timeout=REQUEST_TIMEOUT_SEC
-            ).json()
-            response_data = response.get(_RESPONSE_DATA)
-
-            if not response_data:
+            with self._session.get(
+                next_request_url, timeout=REQUEST_TIMEOUT_SEC, stream=True
+            ) as response:
+                # Updates are converted as they are read from the response, so that
+                # only a single update is held in memory regardless of the page size.
+                response_data = json.ObjectStream(
+                    response.iter_content(_STREAM_CHUNK_SIZE),
+                    array_field=_RESPONSE_DATA,
+                )
+                try:
+                    yield from self._resume_page(
+                        after, self._convert_to_signals(response_data), offset
+                    )
+                except json.JSONDecodeError as e:
+                    raise importer.SourceResponseError(
+                        f"Bad response from ThreatExchange API: {e}"
+                    ) from e
+            if not response_data.item_count:
                 return
-            yield from self._convert_to_signals(response_data)
+            offset = 0
 
-            self._job.last_successful_continuation_token = self._job.continuation_token
-            self._job.continuation_token = (
-                response.get(_RESPONSE_PAGING)
-                .get(_RESPONSE_CURSORS)
-                .get(_RESPONSE_AFTER)
-            )
-            next_request_url = response.get(_RESPONSE_PAGING).get(_RESPONSE_NEXT)
+            paging = response_data.fields.get(_RESPONSE_PAGING)
+            after = paging.get(_RESPONSE_CURSORS).get(_RESPONSE_AFTER)
+            self._job.continuation_token = after
+            next_request_url = paging.get(_RESPONSE_NEXT)
 
     def _send_decisions(self, decisions: Iterable[tuple[str, Review.Decision]]) -> None:
         """Send the given decisions to the platform."""
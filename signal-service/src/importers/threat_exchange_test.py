@@ -51,6 +51,7 @@ def _make_response(
         content["paging"] = {"cursors": {"before": "123", "after": "456"}, "next": ""}
     # pylint: disable=protected-access
     response._content = json.dumps(content).encode("utf-8")
+    response._content_consumed = True
     return response
 
 
@@ -373,6 +374,7 @@ class ThreatExchangeImporterLibTest(parameterized.TestCase, test_case.TestCase):
             "last_updated,should_delete,tags,status,"
             "applications_with_opinions,descriptors",
             timeout=mock.ANY,
+            stream=True,
         )
 
     @mock.patch.object(time, "time", return_value=3600)
@@ -437,9 +439,10 @@ class ThreatExchangeImporterLibTest(parameterized.TestCase, test_case.TestCase):
                     "last_updated,should_delete,tags,status,"
                     "applications_with_opinions,descriptors",
                     timeout=mock.ANY,
+                    stream=True,
                 ),
-                mock.call(_SESSION_SELF_OBJECT, "next1", timeout=mock.ANY),
-                mock.call(_SESSION_SELF_OBJECT, "next2", timeout=mock.ANY),
+                mock.call(_SESSION_SELF_OBJECT, "next1", timeout=mock.ANY, stream=True),
+                mock.call(_SESSION_SELF_OBJECT, "next2", timeout=mock.ANY, stream=True),
             ]
         )
 
@@ -533,7 +536,7 @@ class ThreatExchangeImporterLibTest(parameterized.TestCase, test_case.TestCase):
         list(threat_exchange_importer.run(20))
 
         self.mock_get.assert_called_with(
-            _SESSION_SELF_OBJECT, expected_call, timeout=mock.ANY
+            _SESSION_SELF_OBJECT, expected_call, timeout=mock.ANY, stream=True
         )
 
     def test_job_continuation_token_updates(self):
@@ -555,6 +558,24 @@ class ThreatExchangeImporterLibTest(parameterized.TestCase, test_case.TestCase):
         self.assertLen(new_ids, 1)
         self.assertEqual(continuation_token, Job.objects.get().continuation_token)
 
+    @mock.patch.object(time, "time", return_value=3600)
+    def test_get_data_requests_page_size(self, _):
+        threat_exchange_importer = threat_exchange.ThreatExchangeImporter(
+            privacy_group_id="group", access_token="token", page_size=500
+        )
+
+        list(threat_exchange_importer.run(20))
+
+        self.mock_get.assert_called_with(
+            _SESSION_SELF_OBJECT,
+            "https://graph.facebook.com/v16.0/group/threat_updates?"
+            "access_token=token&fields=id,indicator,type,creation_time,"
+            "last_updated,should_delete,tags,status,"
+            "applications_with_opinions,descriptors&limit=500",
+            timeout=mock.ANY,
+            stream=True,
+        )
+
     def test_send_decisions(self):
         self.mock_get.return_value = _make_response(
             {
@@ -89,6 +89,9 @@ class Index:
     """
 
     STORAGE_PATH_DIR = pathlib.Path("/data/index")
+    # The greatest ID of the signals in the index, which later signals are added after.
+    # A class attribute so that indices pickled before it existed still load.
+    last_signal_id: str | None = None
 
     def __init__(self, index_type: SignalType):
         """Constructor.
@@ -154,21 +157,40 @@ class Index:
         )
         return self
 
+    def _get_entries(self, signals: Iterable[Signal]) -> Iterator[IndexEntry]:
+        """Yields the index entries for the content of the signals of this type."""
+        for signal in signals:
+            signal_id = str(signal.id)
+            if self.last_signal_id is None or signal_id > self.last_signal_id:
+                self.last_signal_id = signal_id
+            for content in signal.content:
+                if content.content_type.value == self.index_type.INDICATOR_TYPE:
+                    yield (content.value, IndexEntryMetadata(signal_id=str(signal.id)))
+
     def build(self, signals: Iterable[Signal]) -> Index:
         """Builds a new index based on a collection of signals."""
         index_name = self._get_index_name(self.index_type)
         logging.info("Building `%s` index.", index_name)
-        entries: list[IndexEntry] = []
-        for signal in signals:
-            for content in signal.content:
-                if content.content_type.value == self.index_type.INDICATOR_TYPE:
-                    entries.append(
-                        (content.value, IndexEntryMetadata(signal_id=str(signal.id)))
-                    )
+        self.last_signal_id = None
+        entries: list[IndexEntry] = list(self._get_entries(signals))
         self._index = self.index_type.get_index_cls().build(entries)
         logging.info("Built `%s` index of size %d", index_name, len(self))
         return self
 
+    def add(self, signals: Iterable[Signal]) -> Index:
+        """Adds a collection of signals to an existing index.
+
+        This is much cheaper than rebuilding the index when only a few signals are new.
+        The signals must not already be in the index, or they would be matched twice.
+        """
+        if self._index is None:
+            raise TypeError("Cannot add to index that has not been built.")
+        index_name = self._get_index_name(self.index_type)
+        size = len(self)
+        self._index.add_all(self._get_entries(signals))
+        logging.info("Added %d entries to `%s` index.", len(self) - size, index_name)
+        return self
+
     def query(self, value: str) -> Iterator[IndexMatch]:
         """Queries the index for a given value.
 
@@ -167,6 +167,27 @@ class IndexTest(test_case.TestCase):
 
         self.assertLen(self.index, 1)
 
+    def test_add_to_index_queries_added_signals(self):
+        self.index.build(signals=TEST_SIGNALS[:1])
+
+        self.index.add(signals=TEST_SIGNALS[1:])
+
+        self.assertLen(self.index, 5)
+        matches = list(self.index.query(TEST_SIGNALS[4].content[0].value))
+        self.assertEqual(["signal-id-5"], [m.metadata.signal_id for m in matches])
+
+    def test_build_and_add_track_last_signal_id(self):
+        self.index.build(signals=TEST_SIGNALS[:2])
+        self.assertEqual("signal-id-2", self.index.last_signal_id)
+
+        self.index.add(signals=TEST_SIGNALS[2:])
+
+        self.assertEqual("signal-id-5", self.index.last_signal_id)
+
+    def test_add_to_unbuilt_index_raises_error(self):
+        with self.assertRaises(TypeError):
+            self.index.add(signals=TEST_SIGNALS)
+
     def test_query_index_returns_matches(self):
         self.index.build(signals=TEST_SIGNALS)
 
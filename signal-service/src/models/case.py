@@ -17,11 +17,13 @@
 import datetime
 import enum
 from functools import cached_property
+from typing import Any, Iterable
 
 from bson.objectid import ObjectId
 from mongoengine import Document, EmbeddedDocument, fields
 
 from prioritization import case_priority
+from utils import case_events
 
 
 class Review(EmbeddedDocument):
@@ -119,12 +121,48 @@ class Case(Document):
             return None
         return self.review_history[-1]
 
-    # NOTE: You should only need to reference the cached variants when doing a DB query.
-    # If you want to read the value for an instance, use the non-cached variabts (e.g.
-    # `self.confidence` instead of `self.cached_confidence`).
+    @property
+    def review_stats_key(self) -> tuple[State, Review.Decision | None]:
+        """The state and latest decision of the case, which `ReviewStats` counts."""
+        latest_review = self.latest_review
+        return self.state, latest_review.decision if latest_review else None
+
+    # NOTE: The non-cached variants (e.g. `self.confidence` instead of
+    # `self.cached_confidence`) are calculated from the signals of the case, which
+    # takes a DB query each. Use the cached variants when reading many cases at once,
+    # and check `is_priority_stale` to find out whether they need to be recalculated.
     cached_confidence = fields.FloatField(db_field="confidence")
     cached_severity = fields.FloatField(db_field="severity")
     cached_priority = fields.IntField(db_field="priority")
+    # The version of the priority calculation that the cached values were set with.
+    # Unset if they may be outdated, e.g. because the signals of the case changed.
+    cached_priority_version = fields.IntField(db_field="priority_version")
+
+    @property
+    def is_priority_stale(self) -> bool:
+        """Whether the cached priority fields need to be recalculated."""
+        return self.cached_priority_version != case_priority.VERSION
+
+    @property
+    def cached_confidence_level(self) -> case_priority.Level | None:
+        """The confidence level of the case, based on the cached confidence."""
+        if not self.cached_confidence:
+            return None
+        return case_priority.get_confidence_level(int(self.cached_confidence))
+
+    @property
+    def cached_severity_level(self) -> case_priority.Level | None:
+        """The severity level of the case, based on the cached severity."""
+        if not self.cached_severity:
+            return None
+        return case_priority.get_severity_level(int(self.cached_severity))
+
+    @property
+    def cached_priority_level(self) -> case_priority.Level | None:
+        """The priority level of the case, based on the cached priority."""
+        if self.cached_priority is None or self.cached_priority == -1:
+            return None
+        return case_priority.get_priority_level(self.cached_priority)
 
     @cached_property
     def confidence(self) -> int | None:
@@ -182,21 +220,175 @@ class Case(Document):
         return case_priority.get_priority_level(int(self.priority))
 
     meta = {
-        "indexes": ["-cached_priority"],
+        # The compound indexes serve the keyset pagination of cases in priority order.
+        "indexes": [
+            ("-cached_priority", "id"),
+            ("state", "-cached_priority", "id"),
+            # Serves finding the draft reviews that are due to be published.
+            ("review_history.state", "review_history.create_time"),
+        ],
         "ordering": ["-cached_priority"],
     }
 
-    def clean(self):
-        """Cleans the document before validation."""
-        # Update the state of the Case based on the latest Review state.
+    @property
+    def review_state(self) -> State:
+        """The state of the case based on its latest review, which `clean()` sets."""
         if self.latest_review and self.latest_review.state in {
             Review.State.DRAFT,
             Review.State.PUBLISHED,
         }:
-            self.state = Case.State.RESOLVED
-        else:
-            self.state = Case.State.ACTIVE
+            return Case.State.RESOLVED
+        return Case.State.ACTIVE
+
+    def clean(self):
+        """Cleans the document before validation."""
+        self.state = self.review_state
 
         self.cached_confidence = self.confidence
         self.cached_severity = self.severity
         self.cached_priority = self.priority
+        self.cached_priority_version = case_priority.VERSION
+
+    def save(self, *args, **kwargs) -> "Case":
+        is_new = self._created
+        result = super().save(*args, **kwargs)
+        if is_new:
+            ReviewStats.record(None, self.review_stats_key)
+        case_events.publish([self.id])
+        return result
+
+    @classmethod
+    def invalidate_priorities(cls, signal_ids: Iterable[ObjectId]) -> None:
+        """Marks the cached priorities of all cases with the given signals as stale."""
+        cls.objects(signal_ids__in=list(signal_ids)).update(
+            unset__cached_priority_version=True
+        )
+
+
+# The ID of the single `ReviewStats` document.
+_REVIEW_STATS_ID = "review_stats"
+
+
+class ReviewStats(Document):
+    """The number of cases by their state and latest review decision.
+
+    This is a materialized view of the cases, so that reading the stats takes a single
+    document lookup rather than a scan of all reviewed cases. Changes to cases are
+    applied as atomic increments with `record()`, which new cases do on save and which
+    callers have to do themselves when they change the reviews of an existing case.
+    The counters are only incremented once they exist, as `get()` builds them from the
+    cases when they are first read. `rebuild()` corrects any drift from writes that
+    raced with the build or bypassed `record()`.
+    """
+
+    id = fields.StringField(primary_key=True, default=_REVIEW_STATS_ID)
+
+    # The number of cases whose latest review approved them.
+    count_approved = fields.IntField(default=0)
+
+    # The number of cases whose latest review blocked them.
+    count_removed = fields.IntField(default=0)
+
+    # The number of cases that are waiting for a review.
+    count_active = fields.IntField(default=0)
+
+    # The timestamp of when the counters were last built from the cases.
+    rebuild_time = fields.DateTimeField()
+
+    @staticmethod
+    def _get_counts(
+        state: Case.State, decision: Review.Decision | None, count: int = 1
+    ) -> dict[str, int]:
+        counts = {"count_approved": 0, "count_removed": 0, "count_active": 0}
+        if decision == Review.Decision.APPROVE:
+            counts["count_approved"] = count
+        elif decision == Review.Decision.BLOCK:
+            counts["count_removed"] = count
+        if state == Case.State.ACTIVE:
+            counts["count_active"] = count
+        return counts
+
+    @classmethod
+    def get(cls) -> "ReviewStats":
+        """Gets the stats, building them from the cases if they don't exist yet."""
+        stats = cls.objects(id=_REVIEW_STATS_ID).first()
+        return stats or cls.rebuild()
+
+    @classmethod
+    def rebuild(cls) -> "ReviewStats":
+        """Recounts the cases by their state and latest decision and saves the stats."""
+        # pylint: disable-next=protected-access
+        groups = Case._get_collection().aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": {
+                            "state": "$state",
+                            "decision": {
+                                "$arrayElemAt": ["$review_history.decision", -1]
+                            },
+                        },
+                        "count": {"$sum": 1},
+                    }
+                }
+            ]
+        )
+        counts: dict[str, Any] = {}
+        for group in groups:
+            decision = group["_id"].get("decision")
+            group_counts = cls._get_counts(
+                Case.State(group["_id"].get("state", Case.State.ACTIVE)),
+                Review.Decision(decision) if decision else None,
+                group["count"],
+            )
+            for name, count in group_counts.items():
+                counts[name] = counts.get(name, 0) + count
+        stats = cls(**counts, rebuild_time=datetime.datetime.utcnow())
+        stats.save()
+        return stats
+
+    @classmethod
+    def record(
+        cls,
+        old_key: tuple[Case.State, Review.Decision | None] | None,
+        new_key: tuple[Case.State, Review.Decision | None],
+    ) -> None:
+        """Applies the change of a case to the stats.
+
+        Args:
+            old_key: The `review_stats_key` of the case before the change, or `None` if
+                the case is new.
+            new_key: The `review_stats_key` of the case after the change.
+        """
+        cls.record_all([(old_key, new_key)])
+
+    @classmethod
+    def record_all(
+        cls,
+        changes: Iterable[
+            tuple[
+                tuple[Case.State, Review.Decision | None] | None,
+                tuple[Case.State, Review.Decision | None],
+            ]
+        ],
+    ) -> None:
+        """Applies the changes of many cases to the stats in a single update.
+
+        Args:
+            changes: The old and new `review_stats_key` of each changed case, as in
+                `record()`.
+        """
+        increments: dict[str, int] = {}
+        for old_key, new_key in changes:
+            if old_key == new_key:
+                continue
+            for name, count in cls._get_counts(*new_key).items():
+                increments[name] = increments.get(name, 0) + count
+            if old_key:
+                for name, count in cls._get_counts(*old_key).items():
+                    increments[name] = increments.get(name, 0) - count
+        increments = {
+            f"inc__{name}": count for name, count in increments.items() if count
+        }
+        if increments:
+            cls.objects(id=_REVIEW_STATS_ID).update_one(**increments)
@@ -21,12 +21,17 @@ from unittest import mock
 from absl.testing import absltest, parameterized
 from bson.objectid import ObjectId
 
-from models.case import Case, Review
+from models.case import Case, Review, ReviewStats
 from models.signal import Content, ContentFeatures, Signal, Source, Sources
 from models.target import FeatureSet, Target
 from prioritization import case_priority
 from testing import test_case
-from testing.test_entities import TEST_CASE_RESOLVED_APPROVAL
+from testing.test_entities import (
+    TEST_CASE_ACTIVE,
+    TEST_CASE_RESOLVED_APPROVAL,
+    TEST_CASE_RESOLVED_BLOCKED,
+)
+from utils import case_events
 
 
 class CaseTest(parameterized.TestCase, test_case.TestCase):
@@ -79,6 +84,36 @@ class CaseTest(parameterized.TestCase, test_case.TestCase):
 
         self.assertEqual(3, case.priority)
 
+    @mock.patch.object(case_priority, "calculate_confidence", return_value=3)
+    @mock.patch.object(case_priority, "calculate_severity", return_value=1)
+    def test_cached_priority_levels_set_on_save(self, *_):
+        case = Case(signal_ids=[ObjectId()])
+        self.assertTrue(case.is_priority_stale)
+
+        case.save()
+
+        self.assertFalse(case.is_priority_stale)
+        self.assertEqual(case_priority.Level.MEDIUM, case.cached_priority_level)
+        self.assertEqual(case_priority.Level.HIGH, case.cached_confidence_level)
+        self.assertEqual(case_priority.Level.LOW, case.cached_severity_level)
+
+    def test_cached_priority_levels_without_values(self):
+        case = Case(signal_ids=[ObjectId()], cached_priority=-1)
+
+        self.assertIsNone(case.cached_priority_level)
+        self.assertIsNone(case.cached_confidence_level)
+        self.assertIsNone(case.cached_severity_level)
+
+    def test_invalidate_priorities_marks_cases_with_signals_stale(self):
+        signal_id = ObjectId()
+        case = Case(signal_ids=[signal_id, ObjectId()]).save()
+        other_case = Case(signal_ids=[ObjectId()]).save()
+
+        Case.invalidate_priorities([signal_id])
+
+        self.assertTrue(case.reload().is_priority_stale)
+        self.assertFalse(other_case.reload().is_priority_stale)
+
     def test_get_latest_review_no_review(self):
         self.assertIsNone(Case().latest_review)
 
@@ -104,6 +139,89 @@ class CaseTest(parameterized.TestCase, test_case.TestCase):
 
         self.assertEqual(case.state, Case.State.ACTIVE)
 
+    @mock.patch.object(case_events, "publish", autospec=True)
+    def test_save_publishes_change(self, mock_publish):
+        case = copy.deepcopy(TEST_CASE_ACTIVE).save()
+
+        mock_publish.assert_called_once_with([case.id])
+
+
+class ReviewStatsTest(test_case.TestCase):
+    def _assert_counts(self, approved: int, removed: int, active: int) -> None:
+        stats = ReviewStats.objects.get()
+        self.assertEqual(
+            (stats.count_approved, stats.count_removed, stats.count_active),
+            (approved, removed, active),
+        )
+
+    def test_get_builds_stats_from_cases(self):
+        copy.deepcopy(TEST_CASE_ACTIVE).save()
+        copy.deepcopy(TEST_CASE_RESOLVED_APPROVAL).save()
+        copy.deepcopy(TEST_CASE_RESOLVED_BLOCKED).save()
+        self.assertEqual(ReviewStats.objects.count(), 0)
+
+        stats = ReviewStats.get()
+
+        self.assertEqual(stats.count_approved, 1)
+        self.assertEqual(stats.count_removed, 1)
+        self.assertEqual(stats.count_active, 1)
+        self.assertIsNotNone(stats.rebuild_time)
+        self._assert_counts(1, 1, 1)
+
+    def test_get_builds_stats_without_cases(self):
+        stats = ReviewStats.get()
+
+        self.assertEqual(stats.count_approved, 0)
+        self.assertEqual(stats.count_removed, 0)
+        self.assertEqual(stats.count_active, 0)
+
+    def test_new_cases_increment_stats(self):
+        ReviewStats.get()
+
+        copy.deepcopy(TEST_CASE_ACTIVE).save()
+        copy.deepcopy(TEST_CASE_RESOLVED_BLOCKED).save()
+
+        self._assert_counts(0, 1, 1)
+
+    def test_saving_existing_case_does_not_increment_stats(self):
+        case = copy.deepcopy(TEST_CASE_ACTIVE).save()
+        ReviewStats.get()
+
+        case.notes = "Some notes"
+        case.save()
+
+        self._assert_counts(0, 0, 1)
+
+    def test_record_moves_case_between_counts(self):
+        copy.deepcopy(TEST_CASE_ACTIVE).save()
+        copy.deepcopy(TEST_CASE_RESOLVED_APPROVAL).save()
+        ReviewStats.get()
+
+        ReviewStats.record(
+            (Case.State.ACTIVE, None), (Case.State.RESOLVED, Review.Decision.BLOCK)
+        )
+        self._assert_counts(1, 1, 0)
+
+        ReviewStats.record(
+            (Case.State.RESOLVED, Review.Decision.APPROVE),
+            (Case.State.RESOLVED, Review.Decision.BLOCK),
+        )
+        self._assert_counts(0, 2, 0)
+
+    def test_record_before_stats_exist_is_a_noop(self):
+        ReviewStats.record(None, (Case.State.ACTIVE, None))
+
+        self.assertEqual(ReviewStats.objects.count(), 0)
+
+    def test_rebuild_corrects_drift(self):
+        copy.deepcopy(TEST_CASE_ACTIVE).save()
+        ReviewStats.get()
+        ReviewStats.objects.update_one(inc__count_active=5)
+
+        ReviewStats.rebuild()
+
+        self._assert_counts(0, 0, 1)
+
 
 if __name__ == "__main__":
     absltest.main()
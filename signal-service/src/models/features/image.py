@@ -36,6 +36,19 @@ class Likelihood(enum.IntEnum):
     VERY_LIKELY = 5
 
 
+class Thumbnail(EmbeddedDocument):
+    """A downscaled copy of an image, to display it without loading the original."""
+
+    # The maximum width and height of the thumbnail, in pixels.
+    size = fields.IntField(required=True)
+
+    # The MIME type of the thumbnail data.
+    mime_type = fields.StringField(required=True)
+
+    # The thumbnail data in bytes.
+    data = fields.BinaryField(required=True)
+
+
 class Image(EmbeddedDocument):
     """Corresponds to the representation of an Image feature in a Target in the DB.
 
@@ -49,6 +62,9 @@ class Image(EmbeddedDocument):
     # The image data in bytes.
     data = fields.BinaryField()
 
+    # Downscaled copies of the image data, made when they are first requested.
+    thumbnails = fields.EmbeddedDocumentListField(Thumbnail)
+
     # Text extracted from image through OCR processing and perspective api scores.
     ocr_text = fields.EmbeddedDocumentField(Text)
 
@@ -20,3 +20,5 @@ from mongoengine import EmbeddedDocument, fields
 class User(EmbeddedDocument):
     # The IP address of the User.
     ip_address = fields.StringField()
+    # The country the IP address is located in, looked up when the address is set.
+    ip_region = fields.StringField()
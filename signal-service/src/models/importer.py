@@ -57,6 +57,9 @@ class ImporterConfig(Document):
     # Whether decisions are regularly sent back to the Importer.
     diagnostics_state = fields.EnumField(State, default=State.UNKNOWN, required=True)
     credential = fields.EmbeddedDocumentField(Credential, required=True)
+    # The number of signals to request per page from the source. Larger pages need
+    # fewer requests. Uses the default of the source if unset.
+    page_size = fields.IntField(min_value=1)
 
     @property
     def enabled(self):
@@ -76,12 +79,14 @@ class ImporterConfig(Document):
                 username=self.credential.identifier,
                 password=self.credential.token,
                 server=tcap_server,
+                page_size=self.page_size,
             )
 
         if self.type == ImporterConfig.Type.THREAT_EXCHANGE_API:
             return threat_exchange.ThreatExchangeImporter(
                 privacy_group_id=self.credential.identifier,
                 access_token=self.credential.token,
+                page_size=self.page_size,
             )
 
         raise NotImplementedError(f"Importer of type {self.type} not configured.")
@@ -21,6 +21,10 @@ import enum
 
 from mongoengine import Document, fields
 
+# How long to keep jobs for once a newer job of their source has ended. The most recent
+# checkpoint of each source is kept until it is superseded, so imports can be resumed.
+JOB_RETENTION = datetime.timedelta(days=30)
+
 
 class Job(Document):
     """Corresponds to the representation of a Job in the DB."""
@@ -42,6 +46,7 @@ class Job(Document):
         TCAP_CSV = "TCAP_CSV"
         TCAP_API = "TCAP_API"
         THREAT_EXCHANGE_API = "THREAT_EXCHANGE_API"
+        HASH_LIST = "HASH_LIST"
         UNKNOWN = "UNKNOWN"
 
     status = fields.EnumField(JobStatus, default=JobStatus.UNKNOWN)
@@ -51,18 +56,120 @@ class Job(Document):
     import_size = fields.IntField(default=0)
     update_size = fields.IntField(default=0)
     delete_size = fields.IntField(default=0)
+    # The number of records that were skipped because they failed validation.
+    invalid_size = fields.IntField(default=0)
+    # The fraction of the source data processed so far, if the total size is known.
+    progress = fields.FloatField(min_value=0, max_value=1)
     continuation_token = fields.StringField()
     # The continuation token of the last succesful call.
     last_successful_continuation_token = fields.StringField()
+    # How far into the data at `last_successful_continuation_token` the job got, e.g.
+    # the number of records imported from a page or the byte offset into a file.
+    continuation_offset = fields.IntField(default=0)
+    # When the job is deleted. Unset until a newer job of the same source has ended.
+    expire_time = fields.DateTimeField()
+
+    meta = {
+        "indexes": [
+            # Serves finding the latest jobs of a source, e.g. the last checkpoint.
+            ("source", "-start_time"),
+            {"fields": ["expire_time"], "expireAfterSeconds": 0},
+        ],
+    }
 
     @classmethod
     def start(cls, **kwargs) -> Job:
         self = cls(**kwargs, status=Job.JobStatus.IN_PROGRESS)
-        return self.save()
+        self.save()
+        JobStats.objects(source=self.source).update_one(
+            max__last_start_time=self.start_time
+        )
+        return self
 
     def end(self) -> Job:
         if self.status == Job.JobStatus.IN_PROGRESS:
             # We expect the job to be in a resting state. `IN_PROGRESS` means something
             # unexpected happened, and the job is still in an unexpected active state.
             self.status = Job.JobStatus.UNKNOWN
-        return self.save()
+        self.save()
+        JobStats.record(self)
+        self._expire_older_jobs()
+        return self
+
+    def _expire_older_jobs(self) -> None:
+        """Schedules the deletion of the jobs of this source before this one."""
+        older_jobs = Job.objects(
+            source=self.source,
+            start_time__lt=self.start_time,
+            expire_time=None,
+        )
+        if self.last_successful_continuation_token is None:
+            # Keep the last checkpoint, which the next job resumes from.
+            older_jobs = older_jobs(last_successful_continuation_token=None)
+        older_jobs.update(set__expire_time=datetime.datetime.utcnow() + JOB_RETENTION)
+
+
+class JobStats(Document):
+    """Running totals of the jobs of a source.
+
+    These outlive the jobs themselves, which expire after `JOB_RETENTION`. The totals
+    are built from the jobs when they are first read, and then updated as each job
+    starts and ends.
+    """
+
+    source = fields.EnumField(Job.JobSource, primary_key=True)
+    # The total number of signals imported by the ended jobs.
+    import_size = fields.IntField(default=0)
+    # The start time of the latest job.
+    last_start_time = fields.DateTimeField()
+
+    @classmethod
+    def get(cls, source: Job.JobSource) -> JobStats:
+        """Gets the stats of a source, building them from its jobs if needed."""
+        stats = cls.objects(source=source).first()
+        return stats or cls.rebuild(source)
+
+    @classmethod
+    def rebuild(cls, source: Job.JobSource) -> JobStats:
+        """Sums up the existing jobs of a source and saves the stats."""
+        groups = Job.objects(source=source).aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": None,
+                        "import_size": {
+                            "$sum": {
+                                "$cond": [
+                                    {
+                                        "$eq": [
+                                            "$status",
+                                            Job.JobStatus.IN_PROGRESS.value,
+                                        ]
+                                    },
+                                    0,
+                                    "$import_size",
+                                ]
+                            }
+                        },
+                        "last_start_time": {"$max": "$start_time"},
+                    }
+                },
+            ]
+        )
+        group = next(groups, {})
+        stats = cls(
+            source=source,
+            import_size=group.get("import_size", 0),
+            last_start_time=group.get("last_start_time"),
+        )
+        return stats.save()
+
+    @classmethod
+    def record(cls, job: Job) -> None:
+        """Adds an ended job to the stats of its source."""
+        updated = cls.objects(source=job.source).update_one(
+            inc__import_size=job.import_size, max__last_start_time=job.start_time
+        )
+        if not updated:
+            # The ended job is counted when building the stats.
+            cls.rebuild(job.source)
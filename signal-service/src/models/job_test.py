@@ -15,9 +15,11 @@
 # pylint: disable=missing-docstring
 """Tests for the job data models."""
 
+import datetime
+
 from absl.testing import absltest
 
-from models.job import Job
+from models.job import Job, JobStats
 from testing import test_case
 
 
@@ -43,6 +45,91 @@ class JobTest(test_case.TestCase):
         job = Job.objects.get()
         self.assertEqual(Job.JobStatus.UNKNOWN, job.status)
 
+    def test_end_expires_older_jobs(self):
+        old_job = Job.start(source=Job.JobSource.TCAP_API)
+        old_job.start_time = datetime.datetime(2024, 1, 1)
+        old_job.save()
+        other_source_job = Job.start(
+            source=Job.JobSource.HASH_LIST, start_time=datetime.datetime(2024, 1, 1)
+        )
+
+        job = Job.start(source=Job.JobSource.TCAP_API)
+        job.last_successful_continuation_token = "token"
+        job.end()
+
+        self.assertIsNotNone(old_job.reload().expire_time)
+        self.assertIsNone(other_source_job.reload().expire_time)
+        self.assertIsNone(job.reload().expire_time)
+
+    def test_end_without_checkpoint_keeps_last_checkpoint(self):
+        checkpoint_job = Job.start(
+            source=Job.JobSource.TCAP_API,
+            start_time=datetime.datetime(2024, 1, 1),
+            last_successful_continuation_token="token",
+        )
+        old_job = Job.start(
+            source=Job.JobSource.TCAP_API, start_time=datetime.datetime(2024, 1, 2)
+        )
+
+        Job.start(source=Job.JobSource.TCAP_API).end()
+
+        self.assertIsNone(checkpoint_job.reload().expire_time)
+        self.assertIsNotNone(old_job.reload().expire_time)
+
+
+class JobStatsTest(test_case.TestCase):
+    def test_get_builds_stats_from_ended_jobs(self):
+        Job(
+            source=Job.JobSource.TCAP_API,
+            status=Job.JobStatus.SUCCESS,
+            start_time=datetime.datetime(2024, 1, 1),
+            import_size=3,
+        ).save()
+        Job(
+            source=Job.JobSource.TCAP_API,
+            status=Job.JobStatus.IN_PROGRESS,
+            start_time=datetime.datetime(2024, 1, 2),
+            import_size=5,
+        ).save()
+        Job(source=Job.JobSource.HASH_LIST, import_size=7).save()
+
+        stats = JobStats.get(Job.JobSource.TCAP_API)
+
+        self.assertEqual(stats.import_size, 3)
+        self.assertEqual(
+            stats.last_start_time,
+            datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc),
+        )
+
+    def test_get_builds_empty_stats_without_jobs(self):
+        stats = JobStats.get(Job.JobSource.TCAP_API)
+
+        self.assertEqual(stats.import_size, 0)
+        self.assertIsNone(stats.last_start_time)
+
+    def test_jobs_update_stats(self):
+        first_job = Job.start(source=Job.JobSource.TCAP_API)
+        first_job.import_size = 3
+        first_job.end()
+
+        job = Job.start(source=Job.JobSource.TCAP_API)
+        stats = JobStats.objects.get(source=Job.JobSource.TCAP_API)
+        self.assertEqual(stats.import_size, 3)
+        self.assertEqual(stats.last_start_time, job.reload().start_time)
+
+        job.import_size = 4
+        job.end()
+        self.assertEqual(stats.reload().import_size, 7)
+
+    def test_stats_outlive_jobs(self):
+        job = Job.start(source=Job.JobSource.TCAP_API)
+        job.import_size = 3
+        job.end()
+
+        Job.objects.delete()
+
+        self.assertEqual(JobStats.get(Job.JobSource.TCAP_API).import_size, 3)
+
 
 if __name__ == "__main__":
     absltest.main()
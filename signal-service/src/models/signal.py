@@ -17,9 +17,21 @@
 from __future__ import annotations
 
 import enum
+import hashlib
+import json
 
 import pytz
-from mongoengine import Document, EmbeddedDocument, fields, queryset_manager
+from mongoengine import (
+    Document,
+    EmbeddedDocument,
+    NotUniqueError,
+    SaveConditionError,
+    fields,
+    queryset_manager,
+)
+
+# The number of times to retry merging a signal that is concurrently modified.
+_MAX_MERGE_ATTEMPTS = 5
 
 
 class Source(EmbeddedDocument):
@@ -133,10 +145,27 @@ class Content(EmbeddedDocument):
         ContentType, default=ContentType.UNKNOWN, required=True
     )
 
+    @property
+    def key(self) -> str:
+        """A key that is the same for all content with an equivalent value."""
+        value = (self.value or "").strip()
+        if self.content_type in (
+            Content.ContentType.HASH_PDQ,
+            Content.ContentType.HASH_MD5,
+        ):
+            value = value.lower()
+        return f"{self.content_type.value}:{value}"
+
 
 class Signal(Document):
     """Corresponds to the representation of a Signal in the DB."""
 
+    @enum.unique
+    class UpsertResult(str, enum.Enum):
+        INSERTED = "INSERTED"
+        MERGED = "MERGED"
+        UNCHANGED = "UNCHANGED"
+
     _REDACTED = "[REDACTED]"
 
     content = fields.EmbeddedDocumentListField(Content, required=True)
@@ -146,8 +175,20 @@ class Signal(Document):
     )
     content_features = fields.EmbeddedDocumentField(ContentFeatures)
     content_status = fields.EmbeddedDocumentField(ContentStatus)
-
-    meta = {"indexes": ["content.value", "content.content_type"]}
+    # A fingerprint of the imported data this signal was last updated with. If the
+    # same data is imported again, it can be skipped without loading the signal.
+    fingerprint = fields.StringField()
+    # The key of the content this signal was created with, which makes sure that the
+    # same content is stored as a single signal. Redacted signals have no key.
+    content_key = fields.StringField()
+
+    meta = {
+        "indexes": [
+            "content.value",
+            "content.content_type",
+            {"fields": ["content_key"], "unique": True, "sparse": True},
+        ]
+    }
 
     @queryset_manager
     def pdq(doc_cls, queryset):  # pylint: disable=no-self-argument
@@ -164,6 +205,50 @@ class Signal(Document):
             and self.content[0].content_type == Content.ContentType.URL
         )
 
+    def clean(self):
+        if not self.content or (self.sources and self.is_redacted):
+            self.content_key = None
+        else:
+            self.content_key = self.content[0].key
+
+    def upsert(self) -> tuple[Signal, Signal.UpsertResult]:
+        """Inserts this signal, or merges it into the signal with the same content.
+
+        Concurrent upserts of the same content are safe: the unique content key makes
+        all but one insert fail, and a merge is only saved if the sources of the
+        existing signal haven't changed since it was loaded, otherwise it is retried.
+
+        Returns:
+            The stored signal, and whether it was inserted, merged into an existing
+            signal, or left that signal unchanged.
+
+        Raises:
+            SaveConditionError: If the existing signal kept being modified concurrently.
+        """
+        self.clean()
+        if self.content_key is None:
+            self.save(force_insert=True)
+            return self, Signal.UpsertResult.INSERTED
+        for _ in range(_MAX_MERGE_ATTEMPTS):
+            existing = Signal.objects(content_key=self.content_key).first()
+            if existing is None:
+                try:
+                    self.save(force_insert=True)
+                except NotUniqueError:
+                    continue
+                return self, Signal.UpsertResult.INSERTED
+            source_count = len(existing.sources.sources)
+            existing.merge(self)
+            # Submitting the same signal again doesn't need a write.
+            if not existing._get_changed_fields():  # pylint: disable=protected-access
+                return existing, Signal.UpsertResult.UNCHANGED
+            try:
+                existing.save(save_condition={"sources__sources__size": source_count})
+            except SaveConditionError:
+                continue
+            return existing, Signal.UpsertResult.MERGED
+        raise SaveConditionError(f"Failed to merge signal {self.content_key}")
+
     def redact(self, source_name: Source.Name) -> Signal:
         """Redacts a given source of this signal.
 
@@ -183,17 +268,28 @@ class Signal(Document):
                 break
         else:
             raise ValueError(f"No source found with name {source_name}.")
+        # The data changed, so importing the same data again has to update the signal.
+        self.fingerprint = None
         # Remove the content if all the sources have now been redacted.
         if self.is_redacted:
             self.content = [Content(value=Signal._REDACTED)]
         return self
 
+    def calculate_fingerprint(self) -> str:
+        """Calculates a stable fingerprint of the data of this signal."""
+        data = self.to_mongo().to_dict()
+        data.pop("_id", None)
+        data.pop("fingerprint", None)
+        data.pop("content_key", None)
+        normalized = json.dumps(data, sort_keys=True, default=str)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
     def __eq__(self, other) -> bool:
-        """Compare equality of Signals ignoring ID field."""
+        """Compare equality of Signals ignoring ID, fingerprint and key fields."""
         if not isinstance(other, self.__class__):
             return False
 
-        ignore_keys = {"id"}
+        ignore_keys = {"id", "fingerprint", "content_key"}
         self_data = {k: v for (k, v) in self._data.items() if k not in ignore_keys}
         other_data = {k: v for k, v in other._data.items() if k not in ignore_keys}
         return self_data == other_data
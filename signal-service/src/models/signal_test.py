@@ -19,6 +19,7 @@ import datetime
 
 from absl.testing import absltest, parameterized
 from bson.objectid import ObjectId
+from mongoengine import NotUniqueError
 
 from models.signal import (
     Content,
@@ -115,6 +116,22 @@ class SignalTest(parameterized.TestCase, test_case.TestCase):
         self.assertFalse(signal.sources.sources[1].is_redacted)
         self.assertEqual("https://abc.xyz/", signal.content[0].value)
 
+    def test_redact_signal_clears_fingerprint(self):
+        signal = Signal(
+            content=[Content(value="https://abc.xyz/")],
+            sources=Sources(
+                sources=[
+                    Source(name=Source.Name.TCAP),
+                    Source(name=Source.Name.GIFCT),
+                ]
+            ),
+        )
+        signal.fingerprint = signal.calculate_fingerprint()
+
+        signal.redact(Source.Name.TCAP)
+
+        self.assertIsNone(signal.fingerprint)
+
     def test_redact_signal_with_multiple_sources_redacts_content_if_all_sources_redacted(
         self,
     ):
@@ -582,6 +599,117 @@ class SignalTest(parameterized.TestCase, test_case.TestCase):
         signal_1.merge(signal_2)
         self.assertEqual(signal_1, expected_merge)
 
+    def test_calculate_fingerprint_ignores_id_and_fingerprint(self):
+        signal = Signal(
+            content=[Content(value="foo.com", content_type=Content.ContentType.URL)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        )
+        fingerprint = signal.calculate_fingerprint()
+
+        signal.id = ObjectId()
+        signal.fingerprint = "abc"
+
+        self.assertEqual(fingerprint, signal.calculate_fingerprint())
+
+    def test_calculate_fingerprint_changes_with_data(self):
+        signal = Signal(
+            content=[Content(value="foo.com", content_type=Content.ContentType.URL)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        )
+        fingerprint = signal.calculate_fingerprint()
+
+        signal.sources.sources[0].report_date = datetime.datetime(2023, 1, 1)
+
+        self.assertNotEqual(fingerprint, signal.calculate_fingerprint())
+
+    @parameterized.parameters(
+        (" ABCdef ", Content.ContentType.HASH_PDQ, "HASH_PDQ:abcdef"),
+        ("ABCdef", Content.ContentType.HASH_MD5, "HASH_MD5:abcdef"),
+        (" https://abc.xyz/ABC", Content.ContentType.URL, "URL:https://abc.xyz/ABC"),
+    )
+    def test_content_key_is_normalized(self, value, content_type, expected_key):
+        self.assertEqual(
+            Content(value=value, content_type=content_type).key, expected_key
+        )
+
+    def test_save_sets_content_key(self):
+        signal = Signal(
+            content=[Content(value="ABC", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).save()
+
+        self.assertEqual(signal.content_key, "HASH_PDQ:abc")
+
+    def test_save_same_content_raises(self):
+        Signal(
+            content=[Content(value="abc", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).save()
+
+        with self.assertRaises(NotUniqueError):
+            Signal(
+                content=[
+                    Content(value="ABC", content_type=Content.ContentType.HASH_PDQ)
+                ],
+                sources=Sources(sources=[Source(name=Source.Name.GIFCT)]),
+            ).save()
+
+    def test_save_redacted_signals_without_content_key(self):
+        for _ in range(2):
+            signal = Signal(
+                content=[Content(value="abc", content_type=Content.ContentType.URL)],
+                sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+            )
+            signal.redact(Source.Name.TCAP).save()
+
+            self.assertIsNone(signal.content_key)
+        self.assertEqual(Signal.objects.count(), 2)
+
+    def test_upsert_inserts_new_signal(self):
+        signal = Signal(
+            content=[Content(value="abc", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        )
+
+        stored, result = signal.upsert()
+
+        self.assertEqual(result, Signal.UpsertResult.INSERTED)
+        self.assertEqual(stored.id, signal.id)
+        self.assertEqual(Signal.objects.count(), 1)
+
+    def test_upsert_merges_new_source(self):
+        existing = Signal(
+            content=[Content(value="abc", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).save()
+
+        stored, result = Signal(
+            content=[Content(value="ABC", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.GIFCT, author="foo")]),
+        ).upsert()
+
+        self.assertEqual(result, Signal.UpsertResult.MERGED)
+        self.assertEqual(stored.id, existing.id)
+        self.assertEqual(Signal.objects.count(), 1)
+        self.assertEqual(
+            [(s.name, s.author) for s in Signal.objects.get().sources.sources],
+            [(Source.Name.TCAP, None), (Source.Name.GIFCT, "foo")],
+        )
+
+    def test_upsert_same_signal_leaves_it_unchanged(self):
+        existing = Signal(
+            content=[Content(value="abc", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).save()
+
+        stored, result = Signal(
+            content=[Content(value="abc", content_type=Content.ContentType.HASH_PDQ)],
+            sources=Sources(sources=[Source(name=Source.Name.TCAP)]),
+        ).upsert()
+
+        self.assertEqual(result, Signal.UpsertResult.UNCHANGED)
+        self.assertEqual(stored.id, existing.id)
+
 
 if __name__ == "__main__":
     absltest.main()
@@ -15,6 +15,7 @@
 """Target-related models."""
 
 import datetime
+import enum
 
 from mongoengine import Document, EmbeddedDocument, fields
 
@@ -40,6 +41,44 @@ class FeatureSet(EmbeddedDocument):
     text = fields.EmbeddedDocumentField(Text)
 
 
+class ProcessingStage(EmbeddedDocument):
+    """When a stage of processing a target started and finished."""
+
+    start_time = fields.DateTimeField()
+    end_time = fields.DateTimeField()
+    # The error that the last run of the stage failed with, if any.
+    error = fields.StringField()
+
+
+class Processing(EmbeddedDocument):
+    """The progress of processing a target after it has been created."""
+
+    @enum.unique
+    class State(str, enum.Enum):
+        PROCESSING = "PROCESSING"
+        DONE = "DONE"
+        # A stage failed without being retried, so processing won't finish.
+        FAILED = "FAILED"
+
+    @enum.unique
+    class Stage(str, enum.Enum):
+        HASHING = "HASHING"
+        INDEX_QUERY = "INDEX_QUERY"
+        OCR = "OCR"
+        SAFE_SEARCH = "SAFE_SEARCH"
+        THUMBNAILS = "THUMBNAILS"
+        PERSPECTIVE = "PERSPECTIVE"
+        CASE_GENERATION = "CASE_GENERATION"
+
+    state = fields.EnumField(State, default=State.PROCESSING)
+    # The stages that have been started so far, keyed by their name.
+    stages = fields.MapField(fields.EmbeddedDocumentField(ProcessingStage))
+    # The time that processing finished, once it's done or has failed.
+    end_time = fields.DateTimeField()
+    # The URL to notify once processing is done, if any.
+    callback_url = fields.StringField()
+
+
 class Target(Document):
     """Corresponds to the representation of a Target in the DB.
 
@@ -61,3 +100,7 @@ class Target(Document):
 
     # The collection of features that make up the entity.
     feature_set = fields.EmbeddedDocumentField(FeatureSet, required=True)
+
+    # The progress of processing the target. Targets created before this was tracked
+    # don't have it.
+    processing = fields.EmbeddedDocumentField(Processing)
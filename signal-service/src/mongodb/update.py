@@ -16,13 +16,19 @@
 
 # pylint: disable=protected-access
 
+import collections
 import logging
 
 import pymongo
+from bson.objectid import ObjectId
 
 import config
+from models.case import Case
 from models.settings import Settings
-from models.signal import Signal
+from models.signal import Content, Signal
+
+# The number of documents to update in a single bulk write.
+_UPDATE_BATCH_SIZE = 1000
 
 
 def update():
@@ -81,5 +87,111 @@ def update():
 
         settings.version = "0.0.1"
 
+    if settings.version < "0.0.2":
+        print("Updating database to version 0.0.2")
+
+        # Key signals by their content. Only the oldest of any existing duplicates can
+        # get the key, as the unique index doesn't allow more, so the others are merged
+        # into it.
+        collection = Signal._get_collection()
+        keepers = {
+            doc["content_key"]: doc["_id"]
+            for doc in collection.find(
+                {"content_key": {"$ne": None}}, {"content_key": 1}
+            )
+        }
+        duplicates = collections.defaultdict(list)
+        updates = []
+        for doc in collection.find(
+            {"content_key": None},
+            {"content": 1, "sources.sources.is_redacted": 1},
+        ).sort("_id", pymongo.ASCENDING):
+            sources = doc.get("sources", {}).get("sources", [])
+            if not doc.get("content") or all(s.get("is_redacted") for s in sources):
+                continue
+            content = doc["content"][0]
+            key = Content(
+                value=content.get("value"),
+                content_type=Content.ContentType(content["content_type"]),
+            ).key
+            if key in keepers:
+                duplicates[keepers[key]].append(doc["_id"])
+                continue
+            keepers[key] = doc["_id"]
+            updates.append(
+                pymongo.UpdateOne({"_id": doc["_id"]}, {"$set": {"content_key": key}})
+            )
+            if len(updates) >= _UPDATE_BATCH_SIZE:
+                collection.bulk_write(updates, ordered=False)
+                updates = []
+        if updates:
+            collection.bulk_write(updates, ordered=False)
+        del keepers
+        for keeper_id, duplicate_ids in duplicates.items():
+            _merge_duplicate_signals(keeper_id, duplicate_ids)
+
+        settings.version = "0.0.2"
+
+    if settings.version < "0.0.3":
+        print("Updating database to version 0.0.3")
+
+        # Drop the index on the priority of cases, as the compound index that starts
+        # with it serves the same queries.
+        try:
+            Case._get_collection().drop_index("priority_-1")
+        except pymongo.errors.OperationFailure:
+            logging.info("No separate index on the priority of cases to drop.")
+
+        settings.version = "0.0.3"
+
     settings.save()
     print(f"Current database version after updates: {settings.version}")
+
+
+def _merge_duplicate_signals(keeper_id: ObjectId, duplicate_ids: list[ObjectId]):
+    """Merges signals into the signal with the same content that is kept.
+
+    The kept signal gets the sources that it doesn't have yet, and the cases of the
+    duplicates get the kept signal as well. The duplicates are then redacted rather
+    than deleted, so that their cases still show what they were created for.
+    """
+    signals = Signal._get_collection()
+    keeper = signals.find_one({"_id": keeper_id}, {"sources.sources": 1})
+    sources = keeper["sources"]["sources"]
+    names = {source.get("name") for source in sources}
+    redacted_content = [Content(value=Signal._REDACTED).to_mongo().to_dict()]
+    updates = []
+    for doc in signals.find(
+        {"_id": {"$in": duplicate_ids}}, {"sources.sources": 1}
+    ).sort("_id", pymongo.ASCENDING):
+        for source in doc["sources"]["sources"]:
+            if source.get("name") not in names:
+                names.add(source.get("name"))
+                sources.append(dict(source))
+            source["is_redacted"] = True
+        updates.append(
+            pymongo.UpdateOne(
+                {"_id": doc["_id"]},
+                {
+                    "$set": {
+                        "content": redacted_content,
+                        "sources.sources": doc["sources"]["sources"],
+                    },
+                    "$unset": {"fingerprint": ""},
+                },
+            )
+        )
+    updates.append(
+        pymongo.UpdateOne(
+            {"_id": keeper_id},
+            {"$set": {"sources.sources": sources}, "$unset": {"fingerprint": ""}},
+        )
+    )
+    signals.bulk_write(updates, ordered=False)
+
+    cases = Case._get_collection()
+    cases.update_many(
+        {"signal_ids": {"$in": duplicate_ids}}, {"$addToSet": {"signal_ids": keeper_id}}
+    )
+    # The priority of a case depends on the sources of its signals.
+    cases.update_many({"signal_ids": keeper_id}, {"$unset": {"priority_version": ""}})
@@ -33,6 +33,10 @@ MAXIMUM_SEVERITY_SCORE = PRIORITY_FEATURE_SCORE_MAP["HIGH"] * 2 + 1
 # cases to the top.
 MAXIMUM_PRIORITY_SCORE = MAXIMUM_SEVERITY_SCORE + PRIORITY_FEATURE_SCORE_MAP["HIGH"]
 
+# The version of the way priorities are calculated. Bump this whenever that changes,
+# so that priorities cached by an older version get recalculated.
+VERSION = 1
+
 TRUSTED_SOURCES = frozenset([Source.Name.TCAP])
 
 MAX_SEVERITY_TAGS = frozenset(["media_priority_s3"])
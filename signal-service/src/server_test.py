@@ -73,10 +73,15 @@ _EXPECTED_ROUTES_GOLDEN_STRING = """
 /importers/<importer_type>    DELETE OPTIONS    Importer._delete
 /importers/<importer_type>    GET HEAD OPTIONS    Importer._get
 /reviews/<review_id>    DELETE OPTIONS    Review._delete
+/reviews:batchCreate    OPTIONS POST    Review._batch_create
+/reviews:batchDelete    OPTIONS POST    Review._batch_delete
 /signals/    GET HEAD OPTIONS    Signal._list
 /signals/    OPTIONS POST    Signal._create
 /signals/<signal_id>    GET HEAD OPTIONS    Signal._get
+/signals:batchCreate    OPTIONS POST    Signal._batch_create
 /targets/    OPTIONS POST    Target._create
 /targets/<target_id>    GET HEAD OPTIONS    Target._get
 /targets/<target_id>    OPTIONS PATCH    Target._update
+/targets/<target_id>/image    GET HEAD OPTIONS    Target._get_image
+/targets/<target_id>/status    GET HEAD OPTIONS    Target._get_status
 """.strip()
@@ -41,6 +41,10 @@ task_soft_time_limit = 60 * 15
 # How often to export diagnostics in days.
 EXPORT_DIAGNOSTICS_FREQUENCY_DAYS = 7
 
+# How often to publish draft reviews in seconds. The reviews published together are
+# delivered in batches, so this is also the window that verdicts are batched over.
+REVIEW_DELIVERY_WINDOW_SEC = int(os.environ.get("REVIEW_DELIVERY_WINDOW_SEC", 10))
+
 # Crontab schedules.
 beat_schedule = {
     "import-signals": {
@@ -51,6 +55,18 @@ beat_schedule = {
         "task": "taskqueue.tasks.rebuild_indices",
         "schedule": timedelta(minutes=15),
     },
+    "update-case-priorities": {
+        "task": "taskqueue.tasks.update_case_priorities",
+        "schedule": timedelta(minutes=5),
+    },
+    "publish-draft-reviews": {
+        "task": "taskqueue.tasks.publish_draft_reviews",
+        "schedule": timedelta(seconds=REVIEW_DELIVERY_WINDOW_SEC),
+    },
+    "rebuild-review-stats": {
+        "task": "taskqueue.tasks.rebuild_review_stats",
+        "schedule": timedelta(hours=1),
+    },
     "export-signal-diagnostics": {
         "task": "taskqueue.tasks.export_signal_diagnostics",
         "schedule": timedelta(days=EXPORT_DIAGNOSTICS_FREQUENCY_DAYS),
@@ -27,32 +27,35 @@ TODO: Consider wrapping tasks in an easier interface to abstract more of Celery
 
 import datetime
 import enum
+import functools
+import inspect
 import itertools
-import json
 import logging
 import os
-from typing import Iterable
+from typing import Any, Callable, Iterable, Sequence
 
+import pymongo
 import requests
 from bson.objectid import ObjectId
-from celery import chain, chord, group, shared_task
+from celery import chain, chord, current_task, group, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 from celery_singleton import Singleton as SingletonTask
-from mongoengine import DoesNotExist
 from threatexchange.signal_type.pdq import PdqSignal
 
 import config
 from analyzers import ocr, perspective, safe_search, translation
-from importers import importer, tcap_csv
+from importers import hash_list, importer, tcap_csv
 from indexing.index import Index, IndexMatch, IndexNotFoundError, SerializedIndexMatch
 from models import features
-from models.case import Case, Review
-from models.features.image import Likelihood
+from models.case import Case, Review, ReviewStats
+from models.features.image import Likelihood, Thumbnail
 from models.importer import ImporterConfig, ImporterLoadError
 from models.signal import Content, Signal, Source, Sources
-from models.target import FeatureSet, Target
+from models.target import FeatureSet, Processing, Target
+from prioritization import case_priority
+from taskqueue import verdicts
 from taskqueue.config import EXPORT_DIAGNOSTICS_FREQUENCY_DAYS
-from utils import hashing
+from utils import callbacks, case_events, hashing, image, iterators
 
 # The expiration time for importer task locks.
 SIGNAL_IMPORTER_LOCK_EXPIRATION_SEC = 60 * 60 * 1  # 1 hour
@@ -61,10 +64,32 @@ SIGNAL_IMPORTER_CHUNK_SIZE = 200
 # TODO: Configure CSV filepath in the UI using the `ImporterConfig` class.
 SIGNAL_IMPORTER_CSV_FILEPATH = os.environ.get("CSV_FILEPATH")
 
+# How many cases with outdated priorities to update at a time in the background.
+CASE_PRIORITY_UPDATE_BATCH_SIZE = 500
+
+# How long draft reviews can be deleted for, before they are published.
+DRAFT_TO_PUBLISH_DELAY_SEC = 60
+# How many cases with draft reviews to publish with a single database write.
+DRAFT_PUBLISH_BATCH_SIZE = 500
+# The maximum number of published reviews to deliver in a single batch.
+REVIEW_DELIVERY_BATCH_SIZE = int(os.environ.get("REVIEW_DELIVERY_BATCH_SIZE", 100))
+# The expiration time for the lock of the draft review publisher.
+DRAFT_PUBLISH_LOCK_EXPIRATION_SEC = 60 * 5
+
 # The local filepath where to write logs for tasks, if any.
 LOG_FILEPATH = "/logs/tasks"
 
 ACTION_RECEIVER_URL = os.environ.get("ACTION_RECEIVER_URL")
+# Whether the action receiver accepts batches of verdicts, as described in the README.
+ACTION_RECEIVER_BATCHING = (
+    os.environ.get("ACTION_RECEIVER_BATCHING", "").lower() == "true"
+)
+# The size at which the verdict log files are rotated, if there's no action receiver.
+VERDICT_LOG_MAX_FILE_BYTES = int(
+    os.environ.get("VERDICT_LOG_MAX_FILE_BYTES", verdicts.DEFAULT_MAX_FILE_BYTES)
+)
+# Whether to gzip the verdict log files.
+VERDICT_LOG_COMPRESS = os.environ.get("VERDICT_LOG_COMPRESS", "").lower() == "true"
 DEFAULT_MAX_RETRIES = 5
 
 DEFAULT_SAFE_SEARCH_THRESHOLD = Likelihood.POSSIBLE
@@ -90,7 +115,110 @@ ENABLE_PERSPECTIVE_API = os.environ.get("ENABLE_PERSPECTIVE_API", "").lower() ==
 ENABLE_TRANSLATION_API = os.environ.get("ENABLE_TRANSLATION_API", "").lower() == "true"
 
 
+def _update_processing(target_id: str, **updates: Any) -> None:
+    """Sets fields of the processing status of a target, given by their dotted path."""
+    # pylint: disable-next=protected-access
+    Target._get_collection().update_one(
+        {"_id": ObjectId(target_id)},
+        {"$set": {f"processing.{path}": value for path, value in updates.items()}},
+    )
+
+
+def _finish_processing(
+    target_id: str, state: Processing.State, end_time: datetime.datetime
+) -> None:
+    """Records that processing a target has finished, and notifies its callback URL.
+
+    Only the first stage to finish processing is recorded, so that the callback is
+    notified once even if several stages fail.
+    """
+    # pylint: disable-next=protected-access
+    result = Target._get_collection().update_one(
+        {"_id": ObjectId(target_id), "processing.end_time": None},
+        {"$set": {"processing.state": state.value, "processing.end_time": end_time}},
+    )
+    if result.modified_count:
+        notify_target_processed.delay(target_id=target_id)
+
+
+def _will_retry(exception: Exception) -> bool:
+    """Returns whether the running task will be retried after failing with an exception.
+
+    Like Celery, tasks that are called directly rather than run by a worker are not
+    retried.
+    """
+    if (
+        not current_task
+        or current_task.request.called_directly
+        or not isinstance(exception, tuple(getattr(current_task, "autoretry_for", ())))
+    ):
+        return False
+    max_retries = getattr(current_task, "retry_kwargs", {}).get(
+        "max_retries", current_task.max_retries
+    )
+    return max_retries is None or current_task.request.retries < max_retries
+
+
+def _tracks_stage(
+    stage: Processing.Stage, is_last: bool = False, is_optional: bool = False
+) -> Callable:
+    """Decorates a task to record when it starts and finishes processing a target.
+
+    The duration of each stage is also logged in a fixed format, so that the stages
+    that hold up processing can be found from the logs.
+
+    Args:
+        stage: The processing stage that the task runs.
+        is_last: Whether processing is done once the task finishes. Processing has
+            failed once any task fails without being retried.
+        is_optional: Whether processing is done without waiting for the task, in
+            which case it doesn't fail processing when it fails.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target_id = signature.bind(*args, **kwargs).arguments.get("target_id")
+            if target_id is None or not ObjectId.is_valid(target_id):
+                return func(*args, **kwargs)
+            target_id = str(target_id)
+            start_time = datetime.datetime.utcnow()
+            _update_processing(
+                target_id,
+                **{f"stages.{stage.value}": {"start_time": start_time}},
+            )
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _update_processing(target_id, **{f"stages.{stage.value}.error": str(e)})
+                if not is_optional and not _will_retry(e):
+                    _finish_processing(
+                        target_id, Processing.State.FAILED, datetime.datetime.utcnow()
+                    )
+                raise
+            end_time = datetime.datetime.utcnow()
+            _update_processing(
+                target_id, **{f"stages.{stage.value}.end_time": end_time}
+            )
+            logging.info(
+                "Processing stage %s of target %s took %.3f s",
+                stage.value,
+                target_id,
+                (end_time - start_time).total_seconds(),
+            )
+            if is_last:
+                _finish_processing(target_id, Processing.State.DONE, end_time)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
 @shared_task()
+@_tracks_stage(Processing.Stage.HASHING)
 def generate_hashes(target_id: str):
     """Generates required hashes for the given Target entity.
 
@@ -125,6 +253,7 @@ def generate_hashes(target_id: str):
     retry_jitter=True,
     retry_kwargs={"max_retries": 5},
 )
+@_tracks_stage(Processing.Stage.INDEX_QUERY)
 def query_indices(pdq_digest: str | None, target_id: str) -> list[SerializedIndexMatch]:
     """Queries the existing indices using a PDQ hash digest to find a match.
 
@@ -182,6 +311,7 @@ def process_matches(
 
 
 @shared_task()
+@_tracks_stage(Processing.Stage.SAFE_SEARCH)
 def process_safe_search(target_id: str) -> list[str] | None:
     """Processes Target entity throught Safe Search Detection API.
 
@@ -239,10 +369,34 @@ def process_safe_search(target_id: str) -> list[str] | None:
     return [str(signal.id)]
 
 
+@shared_task()
+@_tracks_stage(Processing.Stage.THUMBNAILS, is_optional=True)
+def generate_thumbnails(target_id: str) -> None:
+    """Makes thumbnails of the image of a Target entity in all available sizes.
+
+    Storing them with the target means that clients browsing many targets at once don't
+    need to download their full images, or wait for thumbnails to be made on request.
+
+    Args:
+        target_id: The Target entity ObjectId identifier.
+    """
+    logging.info("Generating thumbnails for target %s", target_id)
+    target = Target.objects.only("feature_set.image.data").get(id=target_id)
+    thumbnails = image.make_thumbnails(
+        target.feature_set.image.data, image.THUMBNAIL_SIZES
+    )
+    Target.objects(id=target_id).update_one(
+        set__feature_set__image__thumbnails=[
+            Thumbnail(size=size, mime_type=image.THUMBNAIL_MIME_TYPE, data=data)
+            for size, data in sorted(thumbnails.items())
+        ]
+    )
+
+
 @shared_task()
 def process_new_image_target(target_id: str):
     """Processes a new Target entity by sending it through Safe Search,
-       OCR, and Hash & Query processing.
+       OCR, and Hash & Query processing, and making thumbnails of it.
 
     Args:
         target_id: The Target entity ObjectId identifier.
@@ -250,6 +404,9 @@ def process_new_image_target(target_id: str):
     logging.info("Running processing task for new target %s", target_id)
 
     kwargs = {"target_id": target_id}
+    # Thumbnails are only for display, so cases are generated without waiting for them,
+    # and even if they can't be made.
+    generate_thumbnails.delay(**kwargs)
     # Workflow order is specific to avoid errors. Chains cannot be the first in Groups.
     workflow = chord(
         group(
@@ -267,6 +424,7 @@ def process_new_image_target(target_id: str):
 
 
 @shared_task()
+@_tracks_stage(Processing.Stage.CASE_GENERATION, is_last=True)
 def generate_cases(results: Iterable[Iterable[str] | None], target_id: str):
     """Creates cases based on the results from various evaluation sub-processes.
 
@@ -312,6 +470,7 @@ def generate_cases(results: Iterable[Iterable[str] | None], target_id: str):
 
 
 @shared_task()
+@_tracks_stage(Processing.Stage.OCR)
 def process_ocr(target_id: str) -> list[str] | None:
     """Extracts text from a given Target entity using Optical Character Recognition (OCR).
 
@@ -384,6 +543,41 @@ def process_ocr(target_id: str) -> list[str] | None:
     return [str(signal.id)]
 
 
+@shared_task(
+    autoretry_for=(requests.exceptions.RequestException,),
+    retry_backoff=60,  # 1 minute
+    retry_jitter=True,
+    retry_kwargs={"max_retries": DEFAULT_MAX_RETRIES},
+)
+def notify_target_processed(target_id: str):
+    """Notifies the callback URL of a target, if any, that it has been processed.
+
+    Callback URLs that aren't allowed, e.g. as they are internal to the deployment, are
+    not notified.
+
+    Args:
+        target_id: The Target entity ObjectId identifier.
+    """
+    target = Target.objects(id=target_id).only("client_context", "processing").first()
+    if not target or not target.processing or not target.processing.callback_url:
+        return
+    logging.info("Notifying callback URL that target %s is processed", target_id)
+    try:
+        response = callbacks.post(
+            target.processing.callback_url,
+            json={
+                "target_id": target_id,
+                "client_context": target.client_context,
+                "state": target.processing.state.value,
+            },
+            timeout=verdicts.REQUEST_TIMEOUT_SEC,
+        )
+    except callbacks.Error as e:
+        logging.warning("Not notifying callback URL of target %s: %s", target_id, e)
+        return
+    response.raise_for_status()
+
+
 @shared_task()
 def process_new_signals(signal_ids: Iterable[str]):
     """Processes new Signal entities after they are first imported.
@@ -422,6 +616,41 @@ def process_new_signals(signal_ids: Iterable[str]):
 
 
 @shared_task()
+def update_case_priorities(case_ids: Iterable[str] | None = None):
+    """Recalculates the cached priorities of cases where they are out of date.
+
+    Args:
+        case_ids: The Case entity ObjectId identifiers to limit the update to. If unset,
+            a batch of all cases with outdated priorities is updated.
+    """
+    cases = Case.objects(cached_priority_version__ne=case_priority.VERSION)
+    if case_ids is not None:
+        cases = cases(id__in=[ObjectId(i) for i in case_ids])
+    else:
+        cases = cases.limit(CASE_PRIORITY_UPDATE_BATCH_SIZE)
+
+    count = 0
+    for case in cases:
+        # Saving a case recalculates its cached priority.
+        case.save()
+        count += 1
+    logging.info("Updated priorities of %d cases", count)
+
+
+@shared_task()
+def rebuild_review_stats():
+    """Recounts the review stats from the cases, correcting any drift."""
+    stats = ReviewStats.rebuild()
+    logging.info(
+        "Rebuilt review stats: %d approved, %d removed, %d active",
+        stats.count_approved,
+        stats.count_removed,
+        stats.count_active,
+    )
+
+
+@shared_task()
+@_tracks_stage(Processing.Stage.PERSPECTIVE)
 def generate_perspective_scores(target_id: str):
     """Populates a text target's score if there is a match by making a call to Perspective API.
 
@@ -451,6 +680,7 @@ def generate_perspective_scores(target_id: str):
 
 
 @shared_task()
+@_tracks_stage(Processing.Stage.CASE_GENERATION, is_last=True)
 def process_perspective_scores(scores: dict[str, float], target_id: str):
     """Uses Perspective API scores of a text Target to create a case if
     a score is any score is above the threshold.
@@ -479,7 +709,7 @@ def process_perspective_scores(scores: dict[str, float], target_id: str):
         "Creating a new case for text target %s",
         target_id,
     )
-    Case.objects.insert(case)
+    case.save()
 
 
 @shared_task()
@@ -519,38 +749,88 @@ def rebuild_indices():
     index.save()
 
 
-def _send_review(decision_json):
-    "Sends review to action receiver and raises exception on error."
-    if not ACTION_RECEIVER_URL:
-        log_dir = os.path.join(LOG_FILEPATH, "verdict-notifier")
-        try:
-            os.mkdir(log_dir)
-        except OSError:
-            logging.info("Directory `%s` already exists.", log_dir)
-        verdict_path = os.path.join(
-            log_dir,
-            f"{datetime.date.today().strftime('%Y%m%d')}.txt",
-        )
-        with open(verdict_path, "a+", encoding="utf-8") as verdict_file:
-            verdict_file.write(json.dumps(decision_json, sort_keys=True))
-            verdict_file.write("\n")
-        return
+@shared_task()
+def update_indices(since_signal_id: str):
+    """Adds the signals imported since the indices were last built or updated.
 
-    try:
-        response = requests.post(ACTION_RECEIVER_URL, json=decision_json, timeout=30)
-    except requests.exceptions.RequestException as e:
-        logging.error("%s POST Request failed: %s", ACTION_RECEIVER_URL, e)
-        raise
+    Signal IDs increase over time, so these are all the signals with a greater ID than
+    the last one in the index, which may already include signals imported after the
+    given one. If there is no index yet, it is built from scratch instead.
 
+    Args:
+        since_signal_id: The Signal entity ObjectId identifier to add signals after,
+            if the index doesn't know which signal it was last updated with.
+    """
     try:
-        response.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        logging.error("HTTP Error occured: %s", e)
-        raise
+        index = Index.load(index_type=PdqSignal)
+    except IndexNotFoundError:
+        rebuild_indices()
+        return
+    since_signal_id = index.last_signal_id or since_signal_id
+    logging.info("Running index update task for signals after %s.", since_signal_id)
+    index.add(Signal.pdq(id__gt=ObjectId(since_signal_id)))
+    index.save()
+
+
+def _get_verdict_sink() -> verdicts.Sink:
+    if ACTION_RECEIVER_URL:
+        return verdicts.WebhookSink(
+            ACTION_RECEIVER_URL, batching=ACTION_RECEIVER_BATCHING
+        )
+    return verdicts.FileSink(
+        os.path.join(LOG_FILEPATH, "verdict-notifier"),
+        max_file_bytes=VERDICT_LOG_MAX_FILE_BYTES,
+        compress=VERDICT_LOG_COMPRESS,
+    )
+
+
+def _send_reviews(reviews: Sequence[tuple[Case, Review]]) -> list[Exception | None]:
+    """Sends review decisions to the client, acknowledging each of them.
+
+    Returns:
+        For each review, `None` if it was delivered or the error it failed with.
+    """
+    targets = Target.objects(id__in=[case.target_id for case, _ in reviews]).only(
+        "client_context"
+    )
+    client_contexts = {target.id: target.client_context for target in targets}
+    return _get_verdict_sink().send(
+        [
+            {
+                "client_context": client_contexts.get(case.target_id),
+                "decision": review.decision.value,
+                "decision_time": review.create_time.isoformat(),
+            }
+            for case, review in reviews
+        ]
+    )
+
+
+def _set_delivery_status(
+    reviews: Iterable[tuple[ObjectId, ObjectId]], status: Review.DeliveryStatus
+) -> None:
+    """Sets the delivery status of many reviews with a single bulk write."""
+    reviews = list(reviews)
+    operations = [
+        pymongo.UpdateOne(
+            {"_id": case_id, "review_history._id": review_id},
+            {"$set": {"review_history.$.status": status.value}},
+        )
+        for case_id, review_id in reviews
+    ]
+    if operations:
+        # pylint: disable-next=protected-access
+        Case._get_collection().bulk_write(operations, ordered=False)
+        case_events.publish([case_id for case_id, _ in reviews])
 
 
 @shared_task(
-    autoretry_for=(requests.exceptions.RequestException, requests.exceptions.HTTPError),
+    autoretry_for=(
+        requests.exceptions.RequestException,
+        requests.exceptions.HTTPError,
+        verdicts.Error,
+        OSError,
+    ),
     retry_backoff=5 * 60,  # 5 minutes
     retry_jitter=True,
     retry_kwargs={"max_retries": DEFAULT_MAX_RETRIES},
@@ -562,46 +842,124 @@ def deliver_review(case_id: str, review_id: str):
     )
 
     case = Case.objects.get(id=case_id)
-    target = Target.objects.get(id=case.target_id)
     review = case.review_history.get(id=review_id)
-    decision_json = {
-        "client_context": target.client_context,
-        "decision": review.decision.value,
-        "decision_time": review.create_time.isoformat(),
-    }
-    try:
-        _send_review(decision_json)
-    except (requests.exceptions.RequestException, requests.exceptions.HTTPError) as e:
-        logging.error("%s POST Request failed: %s", ACTION_RECEIVER_URL, e)
-        if deliver_review.request.retries < DEFAULT_MAX_RETRIES:
-            raise
-        review.delivery_status = Review.DeliveryStatus.FAILED
-        logging.info("Seting `delivery_status` to failed: %s", review.delivery_status)
+    [error] = _send_reviews([(case, review)])
+    if error is None:
+        status = Review.DeliveryStatus.ACCEPTED
+    elif deliver_review.request.retries < DEFAULT_MAX_RETRIES:
+        raise error
     else:
-        review.delivery_status = Review.DeliveryStatus.ACCEPTED
-    case.save()
+        status = Review.DeliveryStatus.FAILED
+        logging.info("Seting `delivery_status` to failed for review %s", review_id)
+    _set_delivery_status([(case.id, review.id)], status)
 
 
 @shared_task()
-def publish_review(case_id: str, review_id: str):
-    """Publishes a draft review and delivers it to clients."""
-    logging.info(
-        "Running publish review task for case %s and review %s",
-        case_id,
-        review_id,
-    )
+def deliver_reviews(reviews: Iterable[tuple[str, str]]):
+    """Sends case review decisions to the client in a single batch.
 
-    case = Case.objects.get(id=case_id)
-    try:
-        review = case.review_history.get(id=review_id, state=Review.State.DRAFT)
-    except DoesNotExist:
-        logging.info("No review found for case %s and review %s", case_id, review_id)
-        # The draft review may have been deleted or already published. Nothing to do here.
+    Reviews that fail to be delivered are retried by their own `deliver_review` task.
+
+    Args:
+        reviews: The Case and Review entity ObjectId identifiers of the reviews.
+    """
+    logging.info("Running deliver reviews task for %d reviews", len(reviews))
+    review_ids = {ObjectId(review_id) for _, review_id in reviews}
+    cases = Case.objects(id__in=[ObjectId(case_id) for case_id, _ in reviews]).only(
+        "target_id", "review_history"
+    )
+    case_reviews = [
+        (case, review)
+        for case in cases
+        for review in case.review_history
+        if review.id in review_ids
+    ]
+    if not case_reviews:
         return
 
-    review.state = Review.State.PUBLISHED
-    case.save()
-    deliver_review.delay(case_id=case_id, review_id=review_id)
+    delivered = []
+    for (case, review), error in zip(case_reviews, _send_reviews(case_reviews)):
+        if error is None:
+            delivered.append((case.id, review.id))
+        else:
+            deliver_review.delay(case_id=str(case.id), review_id=str(review.id))
+    _set_delivery_status(delivered, Review.DeliveryStatus.ACCEPTED)
+    logging.info("Delivered %d of %d reviews", len(delivered), len(case_reviews))
+
+
+@shared_task(
+    base=SingletonTask,
+    lock_expiry=DRAFT_PUBLISH_LOCK_EXPIRATION_SEC,
+    soft_time_limit=DRAFT_PUBLISH_LOCK_EXPIRATION_SEC,
+)
+def publish_draft_reviews():
+    """Publishes the draft reviews that can no longer be deleted and delivers them.
+
+    This runs periodically, rather than scheduling a delayed task per review, so that
+    the number of pending task messages does not grow with the number of reviews.
+    """
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=DRAFT_TO_PUBLISH_DELAY_SEC
+    )
+    due_cases = Case.objects(
+        review_history__match={
+            "state": Review.State.DRAFT,
+            "create_time__lte": cutoff,
+        }
+    ).only("review_history")
+
+    count = 0
+    for cases in iterators.grouper(iter(due_cases), DRAFT_PUBLISH_BATCH_SIZE):
+        drafts = [
+            (case.id, review.id)
+            for case in cases
+            for review in case.review_history
+            if review.state == Review.State.DRAFT
+        ]
+        # Publishing does not change the state of the cases, so only the reviews need
+        # to be updated. Drafts that are too recent, or that were deleted in the
+        # meantime, are not matched.
+        now = datetime.datetime.utcnow()
+        # pylint: disable-next=protected-access
+        Case._get_collection().bulk_write(
+            [
+                pymongo.UpdateOne(
+                    {
+                        "_id": case_id,
+                        "review_history": {
+                            "$elemMatch": {
+                                "_id": review_id,
+                                "state": Review.State.DRAFT.value,
+                                "create_time": {"$lte": cutoff},
+                            }
+                        },
+                    },
+                    {
+                        "$set": {
+                            "review_history.$.state": Review.State.PUBLISHED.value,
+                            "review_history.$.update_time": now,
+                        }
+                    },
+                )
+                for case_id, review_id in drafts
+            ],
+            ordered=False,
+        )
+
+        draft_ids = {review_id for _, review_id in drafts}
+        published = [
+            (str(case.id), str(review.id))
+            for case in Case.objects(id__in=[case_id for case_id, _ in drafts]).only(
+                "review_history"
+            )
+            for review in case.review_history
+            if review.id in draft_ids and review.state == Review.State.PUBLISHED
+        ]
+        case_events.publish([case_id for case_id, _ in published])
+        for reviews in iterators.grouper(iter(published), REVIEW_DELIVERY_BATCH_SIZE):
+            deliver_reviews.delay(reviews=list(reviews))
+        count += len(published)
+    logging.info("Published %d draft reviews", count)
 
 
 @enum.unique
@@ -736,3 +1094,60 @@ def export_signal_diagnostics():
 
     workflow = group(*tasks)
     workflow()
+
+
+@shared_task(
+    base=SingletonTask,
+    lock_expiry=SIGNAL_IMPORTER_LOCK_EXPIRATION_SEC,
+    time_limit=SIGNAL_IMPORTER_LOCK_EXPIRATION_SEC,
+    soft_time_limit=SIGNAL_IMPORTER_LOCK_EXPIRATION_SEC - 60 * 5,
+)
+def import_hash_list(
+    filepath: str,
+    value_column: str,
+    content_type: str = Content.ContentType.HASH_PDQ.value,
+    source_name: str = Source.Name.UNKNOWN.value,
+    file_format: str | None = None,
+    source_signal_id_column: str | None = None,
+    author_column: str | None = None,
+    report_date_column: str | None = None,
+):
+    """Imports a local hash list file in bulk and adds the new hashes to the indices.
+
+    Like other importers, this picks up where the last run for the same file stopped,
+    so it can be run again if it exceeds its time limit.
+
+    Args:
+        filepath: The local path of the CSV or NDJSON file to import.
+        value_column: The column (or key) holding the hash digests.
+        content_type: The type of all hashes in the file.
+        source_name: The name of the source that shared the hash list.
+        file_format: The format of the file. Inferred from its extension if unset.
+        source_signal_id_column: The column holding the IDs of the hashes, if any.
+        author_column: The column holding the authors of the hashes, if any.
+        report_date_column: The column holding ISO 8601 report dates, if any.
+    """
+    signal_importer = hash_list.HashListImporter(
+        filepath=filepath,
+        column_mapping=hash_list.ColumnMapping(
+            value=value_column,
+            content_type=Content.ContentType(content_type),
+            source_signal_id=source_signal_id_column,
+            author=author_column,
+            report_date=report_date_column,
+        ),
+        file_format=hash_list.FileFormat(file_format) if file_format else None,
+        source_name=Source.Name(source_name),
+    )
+    # Every signal inserted from now on gets a greater ID than this one.
+    since_signal_id = str(ObjectId())
+    try:
+        for signal_ids in signal_importer.run(SIGNAL_IMPORTER_CHUNK_SIZE):
+            logging.info("Enqueueing %d new signals", len(signal_ids))
+            process_new_signals.delay(signal_ids=tuple(str(id) for id in signal_ids))
+    except importer.Error as e:
+        logging.error("Unexpected importer error: %s", e)
+    except SoftTimeLimitExceeded:
+        logging.info("Maximum running time exceeded for import")
+    # Update the indices with whatever was imported, even if the import was cut short.
+    update_indices.delay(since_signal_id=since_signal_id)
@@ -27,6 +27,7 @@ from unittest import mock
 import requests
 from absl.testing import absltest
 from bson.objectid import ObjectId
+from celery.exceptions import Retry
 from threatexchange.signal_type.pdq import PdqSignal
 
 from analyzers import ocr, perspective, safe_search, translation
@@ -36,9 +37,11 @@ from models import features
 from models.case import Case, Review
 from models.importer import Credential, ImporterConfig
 from models.signal import Content, Signal, Source, Sources
-from models.target import FeatureSet, Target
+from models.target import FeatureSet, Processing, Target
 from taskqueue import tasks
 from testing import test_case, test_entities
+from utils import callbacks, case_events
+from utils import image as image_utils
 
 MOCK_SCORES = {
     "TOXICITY": 0.4,
@@ -107,7 +110,7 @@ class TasksTest(test_case.TestCase):
         ocr.ENABLE_VISION_OCR_API = True
         requests_get_patch = mock.patch.object(requests, "get", autospec=True)
         self.mock_get = requests_get_patch.start()
-        requests_post_patch = mock.patch.object(requests, "post", autospec=True)
+        requests_post_patch = mock.patch.object(requests.Session, "post", autospec=True)
         self.mock_post = requests_post_patch.start()
         self.mock_post.return_value = _make_response({})
         mock_datetime_patch = mock.patch("models.case.datetime", wraps=datetime)
@@ -177,6 +180,136 @@ class TasksTest(test_case.TestCase):
             target.feature_set.image.pdq_digest,
         )
 
+    def test_generate_hashes_records_processing_stage(self):
+        target = Target(
+            feature_set=FeatureSet(
+                image=features.image.Image(
+                    data=self.file_to_bytes("testing/testdata/logo.png")
+                )
+            ),
+            processing=Processing(),
+        ).save()
+
+        tasks.generate_hashes(str(target.id))
+
+        target.reload()
+        self.assertEqual(target.processing.state, Processing.State.PROCESSING)
+        stage = target.processing.stages[Processing.Stage.HASHING.value]
+        self.assertIsNotNone(stage.start_time)
+        self.assertGreaterEqual(stage.end_time, stage.start_time)
+        self.assertIsNone(stage.error)
+
+    @mock.patch.object(PdqSignal, "hash_from_bytes", side_effect=ValueError("Bad"))
+    def test_generate_hashes_records_processing_stage_error(self, _):
+        target = Target(
+            feature_set=FeatureSet(image=features.image.Image(data=b"abc")),
+            processing=Processing(),
+        ).save()
+
+        with self.assertRaises(ValueError):
+            tasks.generate_hashes(str(target.id))
+
+        target.reload()
+        stage = target.processing.stages[Processing.Stage.HASHING.value]
+        self.assertIsNone(stage.end_time)
+        self.assertEqual(stage.error, "Bad")
+
+    @mock.patch.object(callbacks, "post", autospec=True)
+    def test_generate_cases_finishes_processing_and_notifies_callback(self, mock_post):
+        target = Target(
+            client_context="abc",
+            feature_set=FeatureSet(),
+            processing=Processing(callback_url="http://test-url/"),
+        ).save()
+
+        tasks.generate_cases([None], target_id=str(target.id))
+
+        target.reload()
+        self.assertEqual(target.processing.state, Processing.State.DONE)
+        self.assertIsNotNone(target.processing.end_time)
+        mock_post.assert_called_once_with(
+            "http://test-url/",
+            json={
+                "target_id": str(target.id),
+                "client_context": "abc",
+                "state": "DONE",
+            },
+            timeout=mock.ANY,
+        )
+
+    @mock.patch.object(callbacks, "post", autospec=True)
+    @mock.patch.object(PdqSignal, "hash_from_bytes", side_effect=ValueError("Bad"))
+    def test_failed_stage_fails_processing_and_notifies_callback(self, _, mock_post):
+        target = Target(
+            feature_set=FeatureSet(image=features.image.Image(data=b"abc")),
+            processing=Processing(callback_url="http://test-url/"),
+        ).save()
+
+        with self.assertRaises(ValueError):
+            tasks.generate_hashes(str(target.id))
+        with self.assertRaises(ValueError):
+            tasks.generate_hashes(str(target.id))
+
+        target.reload()
+        self.assertEqual(target.processing.state, Processing.State.FAILED)
+        self.assertIsNotNone(target.processing.end_time)
+        mock_post.assert_called_once_with(
+            "http://test-url/",
+            json={
+                "target_id": str(target.id),
+                "client_context": None,
+                "state": "FAILED",
+            },
+            timeout=mock.ANY,
+        )
+
+    @mock.patch.object(Index, "load", side_effect=IndexNotFoundError("No index"))
+    def test_retried_stage_does_not_fail_processing(self, _):
+        target = Target(feature_set=FeatureSet(), processing=Processing()).save()
+        task = tasks.query_indices
+        task.push_request(called_directly=False, retries=0)
+        self.addCleanup(task.pop_request)
+
+        with mock.patch.object(tasks, "current_task", task), mock.patch.object(
+            task, "retry", autospec=True, side_effect=Retry
+        ) as mock_retry:
+            with self.assertRaises(Retry):
+                task.run("abc", target_id=str(target.id))
+
+        mock_retry.assert_called_once()
+        target.reload()
+        self.assertEqual(target.processing.state, Processing.State.PROCESSING)
+        self.assertEqual(
+            target.processing.stages[Processing.Stage.INDEX_QUERY.value].error,
+            "No index",
+        )
+
+    @mock.patch.object(Index, "load", side_effect=IndexNotFoundError("No index"))
+    def test_retried_stage_fails_processing_once_out_of_retries(self, _):
+        target = Target(feature_set=FeatureSet(), processing=Processing()).save()
+        task = tasks.query_indices
+        task.push_request(called_directly=False, retries=tasks.DEFAULT_MAX_RETRIES)
+        self.addCleanup(task.pop_request)
+
+        with mock.patch.object(tasks, "current_task", task):
+            with self.assertRaises(IndexNotFoundError):
+                task.run("abc", target_id=str(target.id))
+
+        target.reload()
+        self.assertEqual(target.processing.state, Processing.State.FAILED)
+
+    def test_notify_target_processed_skips_disallowed_callback_url(self):
+        target = Target(
+            feature_set=FeatureSet(),
+            processing=Processing(
+                state=Processing.State.DONE, callback_url="http://127.0.0.1:8082/"
+            ),
+        ).save()
+
+        tasks.notify_target_processed(target_id=str(target.id))
+
+        self.mock_post.assert_not_called()
+
     @mock.patch.object(
         perspective.Perspective,
         "analyze",
@@ -332,6 +465,44 @@ class TasksTest(test_case.TestCase):
         target.save()
         self.assertIsNone(tasks.process_safe_search(str(target.id)))
 
+    def test_generate_thumbnails_stores_all_sizes(self):
+        test_image_bytes = self.file_to_bytes("testing/testdata/jigsaw.png")
+        target = Target(
+            feature_set=FeatureSet(image=features.image.Image(data=test_image_bytes))
+        ).save()
+
+        tasks.generate_thumbnails(str(target.id))
+
+        image = Target.objects.get(id=target.id).feature_set.image
+        self.assertEqual(test_image_bytes, bytes(image.data))
+        self.assertEqual(
+            list(image_utils.THUMBNAIL_SIZES), [t.size for t in image.thumbnails]
+        )
+        for thumbnail in image.thumbnails:
+            self.assertEqual(image_utils.THUMBNAIL_MIME_TYPE, thumbnail.mime_type)
+            self.assertNotEmpty(thumbnail.data)
+
+    @mock.patch.object(Index, "load", autospec=True)
+    @mock.patch.object(image_utils, "make_thumbnails", side_effect=OSError("Bad"))
+    def test_process_new_image_target_does_not_wait_for_thumbnails(
+        self, _, mock_load_index
+    ):
+        mock_load_index.return_value.query.return_value = []
+        test_image_bytes = self.file_to_bytes("testing/testdata/jigsaw.png")
+        target = Target(
+            feature_set=FeatureSet(image=features.image.Image(data=test_image_bytes)),
+            processing=Processing(),
+        ).save()
+
+        tasks.process_new_image_target(str(target.id))
+
+        target.reload()
+        self.assertEqual(Processing.State.DONE, target.processing.state)
+        self.assertEqual(
+            "Bad", target.processing.stages[Processing.Stage.THUMBNAILS.value].error
+        )
+        self.assertIn(Processing.Stage.CASE_GENERATION.value, target.processing.stages)
+
     def test_query_indices_returns_matches(self):
         Index.STORAGE_PATH_DIR = pathlib.Path(self.create_tempdir())
         signal = Signal(
@@ -469,33 +640,200 @@ class TasksTest(test_case.TestCase):
         self.assertIsNotNone(index)
         self.assertLen(index, 1)
 
-    def test_publish_review_on_draft_updates_case_and_review_states(self):
+    def test_update_indices_adds_new_signals_to_index(self):
+        Index.STORAGE_PATH_DIR = pathlib.Path(self.create_tempdir())
+        old_signal = Signal(
+            content=[
+                Content(
+                    value="f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0",
+                    content_type=Content.ContentType.HASH_PDQ,
+                )
+            ],
+            sources=Sources(sources=[Source()]),
+        ).save()
+        tasks.rebuild_indices()
+        new_signal = Signal(
+            content=[
+                Content(
+                    value="0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f",
+                    content_type=Content.ContentType.HASH_PDQ,
+                )
+            ],
+            sources=Sources(sources=[Source()]),
+        ).save()
+
+        tasks.update_indices(since_signal_id=str(old_signal.id))
+
+        index = Index.load(index_type=PdqSignal)
+        self.assertLen(index, 2)
+        matches = tasks.query_indices(new_signal.content[0].value, target_id=None)
+        self.assertEqual(
+            [str(new_signal.id)], [m["metadata"]["signal_id"] for m in matches]
+        )
+
+    def test_update_indices_skips_signals_already_in_index(self):
+        Index.STORAGE_PATH_DIR = pathlib.Path(self.create_tempdir())
+        since_signal_id = str(ObjectId())
+        Signal(
+            content=[
+                Content(
+                    value="f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0",
+                    content_type=Content.ContentType.HASH_PDQ,
+                )
+            ],
+            sources=Sources(sources=[Source()]),
+        ).save()
+        # The index was rebuilt with the new signal before it got updated.
+        tasks.rebuild_indices()
+
+        tasks.update_indices(since_signal_id=since_signal_id)
+        tasks.update_indices(since_signal_id=since_signal_id)
+
+        self.assertLen(Index.load(index_type=PdqSignal), 1)
+
+    def test_update_indices_builds_missing_index(self):
+        Index.STORAGE_PATH_DIR = pathlib.Path(self.create_tempdir())
+        signal = Signal(
+            content=[
+                Content(
+                    value="f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0",
+                    content_type=Content.ContentType.HASH_PDQ,
+                )
+            ],
+            sources=Sources(sources=[Source()]),
+        ).save()
+
+        tasks.update_indices(since_signal_id=str(signal.id))
+
+        self.assertLen(Index.load(index_type=PdqSignal), 1)
+
+    @mock.patch.object(tasks.update_indices, "delay", autospec=True)
+    @mock.patch.object(tasks.process_new_signals, "delay", autospec=True)
+    def test_import_hash_list_processes_new_signals(
+        self, mock_process_new_signals, mock_update_indices
+    ):
+        hash_file = self.create_tempfile(
+            content="hash\n"
+            "f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0f0\n"
+        )
+
+        tasks.import_hash_list(filepath=hash_file.full_path, value_column="hash")
+
+        signal = Signal.objects.get()
+        mock_process_new_signals.assert_called_once_with(signal_ids=(str(signal.id),))
+        mock_update_indices.assert_called_once()
+
+    def test_update_case_priorities_updates_stale_cases(self):
+        stale_case = copy.deepcopy(test_entities.TEST_CASE_SPARSE_DATA).save()
+        fresh_case = copy.deepcopy(test_entities.TEST_CASE_SPARSE_DATA).save()
+        Case.objects(id=stale_case.id).update(
+            set__cached_priority=7, unset__cached_priority_version=True
+        )
+        Case.objects(id=fresh_case.id).update(set__cached_priority=7)
+
+        tasks.update_case_priorities()
+
+        stale_case.reload()
+        self.assertEqual(-1, stale_case.cached_priority)
+        self.assertFalse(stale_case.is_priority_stale)
+        self.assertEqual(7, fresh_case.reload().cached_priority)
+
+    def test_update_case_priorities_limits_to_given_cases(self):
+        cases = [
+            copy.deepcopy(test_entities.TEST_CASE_SPARSE_DATA).save() for _ in range(2)
+        ]
+        Case.objects.update(set__cached_priority=7, unset__cached_priority_version=True)
+
+        tasks.update_case_priorities(case_ids=[str(cases[0].id)])
+
+        self.assertEqual(-1, cases[0].reload().cached_priority)
+        self.assertTrue(cases[1].reload().is_priority_stale)
+
+    def test_publish_draft_reviews_updates_case_and_review_states(self):
         case = copy.deepcopy(test_entities.TEST_CASE)
         case.target_id = copy.deepcopy(test_entities.TEST_TARGET).save().id
         review = case.review_history[0]
         review.state = Review.State.DRAFT
         case.save()
 
-        tasks.publish_review(str(case.id), str(review.id))
+        tasks.publish_draft_reviews()
 
         case.reload()
         self.assertEqual(case.review_history[0].state, Review.State.PUBLISHED)
+        self.assertEqual(
+            case.review_history[0].delivery_status, Review.DeliveryStatus.ACCEPTED
+        )
         self.assertEqual(case.state, Case.State.RESOLVED)
 
-    def test_publish_review_on_published_is_a_noop(self):
+    def test_publish_draft_reviews_publishes_case_changes(self):
+        case = copy.deepcopy(test_entities.TEST_CASE)
+        case.target_id = copy.deepcopy(test_entities.TEST_TARGET).save().id
+        case.review_history[0].state = Review.State.DRAFT
+        case.save()
+
+        with mock.patch.object(case_events, "publish", autospec=True) as mock_publish:
+            tasks.publish_draft_reviews()
+
+        # Once when the review is published, and once when it is delivered.
+        mock_publish.assert_has_calls([mock.call([str(case.id)]), mock.call([case.id])])
+
+    def test_publish_draft_reviews_skips_recent_drafts(self):
+        case = copy.deepcopy(test_entities.TEST_CASE)
+        case.target_id = copy.deepcopy(test_entities.TEST_TARGET).save().id
+        old_review = case.review_history[0]
+        old_review.state = Review.State.DRAFT
+        new_review = Review(
+            create_time=datetime.datetime.utcnow(),
+            state=Review.State.DRAFT,
+            decision=Review.Decision.BLOCK,
+        )
+        case.review_history.append(new_review)
+        case.save()
+
+        tasks.publish_draft_reviews()
+
+        case.reload()
+        self.assertEqual(
+            [review.state for review in case.review_history],
+            [Review.State.PUBLISHED, Review.State.DRAFT],
+        )
+        self.assertEqual(
+            case.review_history[1].delivery_status, Review.DeliveryStatus.PENDING
+        )
+
+    def test_publish_draft_reviews_delivers_in_batches(self):
+        target_id = copy.deepcopy(test_entities.TEST_TARGET).save().id
+        for _ in range(3):
+            case = copy.deepcopy(test_entities.TEST_CASE)
+            case.id = None
+            case.target_id = target_id
+            case.review_history[0].id = ObjectId()
+            case.review_history[0].state = Review.State.DRAFT
+            case.save()
+
+        with mock.patch.object(
+            tasks, "REVIEW_DELIVERY_BATCH_SIZE", 2
+        ), mock.patch.object(tasks.deliver_reviews, "delay") as mock_delay:
+            tasks.publish_draft_reviews()
+
+        self.assertEqual(
+            [len(call.kwargs["reviews"]) for call in mock_delay.call_args_list], [2, 1]
+        )
+
+    def test_publish_draft_reviews_without_drafts_is_a_noop(self):
         case = copy.deepcopy(test_entities.TEST_CASE)
         review = case.review_history[0]
         review.state = Review.State.PUBLISHED
         case.save()
 
-        tasks.publish_review(str(case.id), str(review.id))
+        tasks.publish_draft_reviews()
 
         case.reload()
         self.assertEqual(case.review_history[0].state, Review.State.PUBLISHED)
         self.assertEqual(case.state, Case.State.RESOLVED)
         self.mock_post.assert_not_called()
 
-    def test_publish_review_delivers_review_to_receiver_webhook(self):
+    def test_publish_draft_reviews_delivers_review_to_receiver_webhook(self):
         tasks.ACTION_RECEIVER_URL = "http://test-url/"
         case = copy.deepcopy(test_entities.TEST_CASE_RESOLVED_APPROVAL)
         case.target_id = copy.deepcopy(test_entities.TEST_TARGET).save().id
@@ -503,9 +841,10 @@ class TasksTest(test_case.TestCase):
         review.state = Review.State.DRAFT
         case.save()
 
-        tasks.publish_review(str(case.id), str(review.id))
+        tasks.publish_draft_reviews()
 
         self.mock_post.assert_called_with(
+            mock.ANY,
             "http://test-url/",
             json={
                 "client_context": "abc-context",
@@ -517,8 +856,10 @@ class TasksTest(test_case.TestCase):
         case.reload()
         review.delivery_status = Review.DeliveryStatus.ACCEPTED
 
-    @mock.patch("taskqueue.tasks.datetime", wraps=datetime)
-    def test_publish_review_without_receiver_webhook_logs_to_file(self, mock_datetime):
+    @mock.patch("taskqueue.verdicts.datetime", wraps=datetime)
+    def test_publish_draft_reviews_without_receiver_webhook_logs_to_file(
+        self, mock_datetime
+    ):
         # The filename will be the current date. We mock it so we can test the correct filename.
         mock_datetime.date.today.return_value = datetime.date(2010, 2, 17)
         tasks.ACTION_RECEIVER_URL = None
@@ -528,7 +869,7 @@ class TasksTest(test_case.TestCase):
         review.state = Review.State.DRAFT
         case.save()
 
-        tasks.publish_review(str(case.id), str(review.id))
+        tasks.publish_draft_reviews()
 
         self.mock_post.assert_not_called()
         output_dir = os.path.join(tasks.LOG_FILEPATH + "/verdict-notifier")
@@ -585,6 +926,25 @@ class TasksTest(test_case.TestCase):
             Review.DeliveryStatus.FAILED,
         )
 
+    def test_deliver_reviews_retries_failed_reviews_individually(self):
+        tasks.ACTION_RECEIVER_URL = "http://test-url/"
+        case = copy.deepcopy(test_entities.TEST_CASE_RESOLVED_APPROVAL)
+        case.target_id = copy.deepcopy(test_entities.TEST_TARGET).save().id
+        review = case.review_history[0]
+        case.save()
+        self.mock_post.return_value = _make_response({}, http.HTTPStatus.NOT_FOUND)
+
+        with mock.patch.object(tasks.deliver_review, "delay") as mock_delay:
+            tasks.deliver_reviews([(str(case.id), str(review.id))])
+
+        mock_delay.assert_called_once_with(
+            case_id=str(case.id), review_id=str(review.id)
+        )
+        self.assertEqual(
+            case.reload().review_history[0].delivery_status,
+            Review.DeliveryStatus.PENDING,
+        )
+
     @mock.patch.object(perspective.Perspective, "analyze")
     def test_generate_perspective_scores(self, mock_get_scores):
         """Tests 'generate_perspective_scores' by mocking perspective.get_response."""
@@ -0,0 +1,191 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sinks that review decisions (verdicts) are delivered to.
+
+Verdicts are sent in batches, and each sink acknowledges every verdict of a batch
+individually, so that only the ones that failed need to be retried.
+"""
+
+import abc
+import datetime
+import gzip
+import itertools
+import json
+import logging
+import os
+from typing import Any, Sequence
+
+import requests
+from requests import adapters
+
+# The timeout for requests to the action receiver.
+REQUEST_TIMEOUT_SEC = 30
+# The size at which verdict log files are rotated.
+DEFAULT_MAX_FILE_BYTES = 64 * 2**20  # 64 MiB
+
+Verdict = dict[str, Any]
+
+# The session to reuse connections to the action receiver across tasks. It is created
+# on first use, so that each worker process gets its own.
+_session: requests.Session | None = None
+
+
+class Error(Exception):
+    """Base class for exceptions in this module."""
+
+
+class RejectedError(Error):
+    """Raised when the action receiver did not accept a verdict."""
+
+
+def _get_session() -> requests.Session:
+    global _session  # pylint: disable=global-statement
+    if _session is None:
+        _session = requests.Session()
+        # Keep a connection per worker thread alive between requests.
+        adapter = adapters.HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+class Sink(metaclass=abc.ABCMeta):
+    """An abstract base class for where verdicts are delivered to."""
+
+    @abc.abstractmethod
+    def send(self, verdicts: Sequence[Verdict]) -> list[Exception | None]:
+        """Delivers a batch of verdicts.
+
+        Args:
+            verdicts: The verdicts to deliver.
+
+        Returns:
+            For each verdict, `None` if it was delivered or the error it failed with.
+        """
+        raise NotImplementedError()
+
+
+class WebhookSink(Sink):
+    """Sends verdicts to the action receiver webhook.
+
+    By default, each verdict is posted on its own. If the receiver supports batches,
+    all verdicts are posted at once as `{"verdicts": [...]}`. The receiver can then
+    acknowledge them individually by responding with `{"results": [...]}`, holding an
+    `{"accepted": bool}` object per verdict in the same order. Otherwise, a successful
+    response accepts the whole batch.
+    """
+
+    def __init__(self, url: str, batching: bool = False):
+        self._url = url
+        self._batching = batching
+
+    def send(self, verdicts: Sequence[Verdict]) -> list[Exception | None]:
+        if self._batching:
+            return self._send_batch(verdicts)
+        errors: list[Exception | None] = []
+        for verdict in verdicts:
+            try:
+                self._post(verdict)
+            except requests.exceptions.ConnectionError as e:
+                # The receiver can't be reached, so don't wait on it for the rest.
+                return errors + [e] * (len(verdicts) - len(errors))
+            except requests.exceptions.RequestException as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    def _post(self, body: Any) -> requests.Response:
+        try:
+            response = _get_session().post(
+                self._url, json=body, timeout=REQUEST_TIMEOUT_SEC
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logging.error("%s POST Request failed: %s", self._url, e)
+            raise
+        return response
+
+    def _send_batch(self, verdicts: Sequence[Verdict]) -> list[Exception | None]:
+        try:
+            response = self._post({"verdicts": list(verdicts)})
+        except requests.exceptions.RequestException as e:
+            return [e] * len(verdicts)
+        try:
+            results = response.json()["results"]
+        except (ValueError, TypeError, KeyError):
+            return [None] * len(verdicts)
+        if not isinstance(results, list) or len(results) != len(verdicts):
+            logging.warning(
+                "Ignoring %s results for a batch of %d verdicts",
+                len(results) if isinstance(results, list) else "invalid",
+                len(verdicts),
+            )
+            return [None] * len(verdicts)
+        return [
+            (
+                None
+                if isinstance(result, dict) and result.get("accepted", True)
+                else RejectedError(f"Verdict rejected by {self._url}")
+            )
+            for result in results
+        ]
+
+
+class FileSink(Sink):
+    """Appends verdicts to dated files, one JSON object per line.
+
+    Each batch is written at once. Once the file of the day reaches `max_file_bytes`,
+    further verdicts go to a new file with an increasing suffix, e.g. `20240101.1.txt`.
+    Compressed files are gzipped, with a gzip member per batch.
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        compress: bool = False,
+    ):
+        self._log_dir = log_dir
+        self._max_file_bytes = max_file_bytes
+        self._compress = compress
+
+    def _get_filepath(self) -> str:
+        date = datetime.date.today().strftime("%Y%m%d")
+        extension = ".txt.gz" if self._compress else ".txt"
+        for i in itertools.count():
+            suffix = f".{i}" if i else ""
+            filepath = os.path.join(self._log_dir, f"{date}{suffix}{extension}")
+            if (
+                not os.path.exists(filepath)
+                or os.path.getsize(filepath) < self._max_file_bytes
+            ):
+                return filepath
+        raise AssertionError("unreachable")
+
+    def send(self, verdicts: Sequence[Verdict]) -> list[Exception | None]:
+        data = "".join(
+            json.dumps(verdict, sort_keys=True) + "\n" for verdict in verdicts
+        ).encode("utf-8")
+        if self._compress:
+            data = gzip.compress(data)
+        try:
+            os.makedirs(self._log_dir, exist_ok=True)
+            with open(self._get_filepath(), "ab") as verdict_file:
+                verdict_file.write(data)
+        except OSError as e:
+            logging.error("Writing verdicts to %s failed: %s", self._log_dir, e)
+            return [e] * len(verdicts)
+        return [None] * len(verdicts)
@@ -0,0 +1,174 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=missing-docstring
+"""Tests for the verdict sinks."""
+
+import datetime
+import gzip
+import http
+import json
+import os
+from typing import Any
+from unittest import mock
+
+import requests
+from absl.testing import absltest, parameterized
+
+from taskqueue import verdicts
+from testing import test_case
+
+_VERDICTS = [
+    {"client_context": "abc", "decision": "BLOCK"},
+    {"client_context": "def", "decision": "APPROVE"},
+]
+
+
+def _make_response(content: Any, status: int = http.HTTPStatus.OK) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    # pylint: disable=protected-access
+    response._content = json.dumps(content).encode("utf-8")
+    return response
+
+
+class WebhookSinkTest(parameterized.TestCase, test_case.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.mock_post = self.enter_context(
+            mock.patch.object(requests.Session, "post", autospec=True)
+        )
+        self.mock_post.return_value = _make_response({})
+
+    def test_send_posts_each_verdict(self):
+        self.mock_post.side_effect = [
+            _make_response({}),
+            _make_response({}, http.HTTPStatus.INTERNAL_SERVER_ERROR),
+        ]
+
+        errors = verdicts.WebhookSink("http://test-url/").send(_VERDICTS)
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], requests.exceptions.HTTPError)
+        self.mock_post.assert_has_calls(
+            [
+                mock.call(mock.ANY, "http://test-url/", json=verdict, timeout=mock.ANY)
+                for verdict in _VERDICTS
+            ]
+        )
+
+    def test_send_reuses_session(self):
+        sink = verdicts.WebhookSink("http://test-url/")
+        sink.send(_VERDICTS[:1])
+        sink.send(_VERDICTS[1:])
+
+        sessions = {call.args[0] for call in self.mock_post.call_args_list}
+        self.assertLen(sessions, 1)
+
+    def test_send_stops_when_receiver_is_unreachable(self):
+        self.mock_post.side_effect = requests.exceptions.ConnectionError()
+
+        errors = verdicts.WebhookSink("http://test-url/").send(_VERDICTS)
+
+        self.assertLen(errors, 2)
+        for error in errors:
+            self.assertIsInstance(error, requests.exceptions.ConnectionError)
+        self.mock_post.assert_called_once()
+
+    def test_send_batch_acknowledges_each_verdict(self):
+        self.mock_post.return_value = _make_response(
+            {"results": [{"accepted": True}, {"accepted": False}]}
+        )
+
+        errors = verdicts.WebhookSink("http://test-url/", batching=True).send(_VERDICTS)
+
+        self.mock_post.assert_called_once_with(
+            mock.ANY,
+            "http://test-url/",
+            json={"verdicts": _VERDICTS},
+            timeout=mock.ANY,
+        )
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], verdicts.RejectedError)
+
+    @parameterized.parameters((None,), ({},), ({"results": [{"accepted": False}]},))
+    def test_send_batch_without_valid_results_accepts_all(self, content):
+        self.mock_post.return_value = _make_response(content)
+
+        errors = verdicts.WebhookSink("http://test-url/", batching=True).send(_VERDICTS)
+
+        self.assertEqual(errors, [None, None])
+
+    def test_send_batch_failure_fails_all(self):
+        self.mock_post.return_value = _make_response(
+            {}, http.HTTPStatus.SERVICE_UNAVAILABLE
+        )
+
+        errors = verdicts.WebhookSink("http://test-url/", batching=True).send(_VERDICTS)
+
+        self.assertLen(errors, 2)
+        for error in errors:
+            self.assertIsInstance(error, requests.exceptions.HTTPError)
+
+
+@mock.patch.object(verdicts, "datetime", wraps=datetime)
+class FileSinkTest(test_case.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.log_dir = os.path.join(self.create_tempdir().full_path, "verdicts")
+
+    def test_send_appends_verdicts_to_dated_file(self, mock_datetime):
+        mock_datetime.date.today.return_value = datetime.date(2010, 2, 17)
+        sink = verdicts.FileSink(self.log_dir)
+
+        self.assertEqual(sink.send(_VERDICTS[:1]), [None])
+        self.assertEqual(sink.send(_VERDICTS[1:]), [None])
+
+        self.assertEqual(os.listdir(self.log_dir), ["20100217.txt"])
+        with open(
+            os.path.join(self.log_dir, "20100217.txt"), encoding="utf-8"
+        ) as log_file:
+            self.assertEqual(
+                [json.loads(line) for line in log_file],
+                _VERDICTS,
+            )
+
+    def test_send_rotates_full_files(self, mock_datetime):
+        mock_datetime.date.today.return_value = datetime.date(2010, 2, 17)
+        sink = verdicts.FileSink(self.log_dir, max_file_bytes=1)
+
+        sink.send(_VERDICTS[:1])
+        sink.send(_VERDICTS[1:])
+        sink.send(_VERDICTS)
+
+        self.assertCountEqual(
+            os.listdir(self.log_dir),
+            ["20100217.txt", "20100217.1.txt", "20100217.2.txt"],
+        )
+
+    def test_send_compresses_files(self, mock_datetime):
+        mock_datetime.date.today.return_value = datetime.date(2010, 2, 17)
+        sink = verdicts.FileSink(self.log_dir, compress=True)
+
+        sink.send(_VERDICTS[:1])
+        sink.send(_VERDICTS[1:])
+
+        with gzip.open(
+            os.path.join(self.log_dir, "20100217.txt.gz"), "rt", encoding="utf-8"
+        ) as log_file:
+            self.assertEqual([json.loads(line) for line in log_file], _VERDICTS)
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -134,12 +134,20 @@ class ApiTestCase(TestCase):
         )
         cls.app = api.Api(__name__, blueprints={cls.blueprint}, static_folder=None)
 
-    def _send(self, method, url, expected_status=200, expected_message=None, json=None):
-        if method in ("POST", "PATCH") and json is None:
+    def _send(
+        self,
+        method,
+        url,
+        expected_status=200,
+        expected_message=None,
+        json=None,
+        **kwargs,
+    ):
+        if method in ("POST", "PATCH") and json is None and "data" not in kwargs:
             json = {}
         with self.app.test_client() as client:
             try:
-                response = getattr(client, method.lower())(url, json=json)
+                response = getattr(client, method.lower())(url, json=json, **kwargs)
             except Exception as e:
                 self.assertEqual(expected_status, 500, f"{e}\n{traceback.format_exc()}")
                 raise
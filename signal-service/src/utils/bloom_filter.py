@@ -0,0 +1,57 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A space-efficient probabilistic set of strings."""
+
+import hashlib
+import math
+from typing import Iterator
+
+
+class BloomFilter:
+    """A Bloom filter of strings.
+
+    Membership checks can return false positives, at roughly the given error rate as
+    long as no more than `capacity` items are added, but never false negatives. This
+    makes it useful to cheaply rule out that an item has been seen before.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """Initializes an empty filter.
+
+        Args:
+            capacity: The number of items the filter is expected to hold.
+            error_rate: The expected false positive rate at capacity.
+        """
+        capacity = max(capacity, 1)
+        self._num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._num_hashes = max(1, round(self._num_bits / capacity * math.log(2)))
+        self._bits = bytearray(math.ceil(self._num_bits / 8))
+
+    def _indexes(self, item: str) -> Iterator[int]:
+        # Derive all bit indexes from two independent hashes (Kirsch-Mitzenmacher).
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        hash1 = int.from_bytes(digest[:8], "little")
+        hash2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._num_hashes):
+            yield (hash1 + i * hash2) % self._num_bits
+
+    def add(self, item: str) -> None:
+        for index in self._indexes(item):
+            self._bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item)
+        )
@@ -0,0 +1,48 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=missing-docstring
+"""Tests for the Bloom filter."""
+
+from absl.testing import absltest
+
+from utils.bloom_filter import BloomFilter
+
+
+class BloomFilterTest(absltest.TestCase):
+    def test_contains_added_items(self):
+        bloom_filter = BloomFilter(capacity=1000)
+        items = [f"https://example.com/{i}" for i in range(1000)]
+
+        for item in items:
+            bloom_filter.add(item)
+
+        for item in items:
+            self.assertIn(item, bloom_filter)
+
+    def test_empty_filter_contains_nothing(self):
+        self.assertNotIn("foo", BloomFilter(capacity=0))
+
+    def test_false_positive_rate(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(f"added-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom_filter for i in range(10000))
+
+        self.assertLess(false_positives, 300)
+
+
+if __name__ == "__main__":
+    absltest.main()
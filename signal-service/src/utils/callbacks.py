@@ -0,0 +1,144 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Utilities for checking the callback URLs that clients give for their targets.
+
+Callbacks are sent from within the deployment, so without checks a client could make
+the service send requests to hosts that are only reachable from inside it. Unless
+`CALLBACK_URL_ALLOWED_HOSTS` lists the hosts that callbacks may be sent to, callbacks
+are only sent to hosts with public IP addresses.
+"""
+
+import ipaddress
+import os
+import socket
+import urllib.parse
+from typing import Optional, Union
+
+import requests
+
+# The hosts that callbacks may be sent to, separated by commas. If empty, any host with
+# only public IP addresses is allowed.
+ALLOWED_HOSTS = frozenset(
+    host.strip().lower()
+    for host in os.environ.get("CALLBACK_URL_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+)
+_ALLOWED_SCHEMES = ("http", "https")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class Error(Exception):
+    pass
+
+
+class _HostnameAdapter(requests.adapters.HTTPAdapter):
+    """Verifies TLS certificates against a hostname rather than the URL's IP address."""
+
+    def __init__(self, hostname: str):
+        self._hostname = hostname
+        super().__init__()
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["server_hostname"] = self._hostname
+        kwargs["assert_hostname"] = self._hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+def check_url(url: str, resolve: bool = True) -> Optional[IPAddress]:
+    """Checks that callbacks may be sent to a URL.
+
+    Args:
+        url: The callback URL.
+        resolve: Whether to look up the IP addresses of the host. Otherwise, only hosts
+            that are IP addresses are checked for being public.
+
+    Returns:
+        The checked IP address to send callbacks to, or `None` if the host is allowed
+        by `ALLOWED_HOSTS` or wasn't resolved.
+
+    Raises:
+        Error: If callbacks may not be sent to the URL.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in _ALLOWED_SCHEMES:
+        raise Error(f"Callback URL scheme must be one of {', '.join(_ALLOWED_SCHEMES)}")
+    try:
+        host, port = parsed.hostname, parsed.port
+    except ValueError as e:
+        raise Error(f"Invalid callback URL: {e}") from e
+    if not host:
+        raise Error("Callback URL has no host")
+    if ALLOWED_HOSTS:
+        if host not in ALLOWED_HOSTS:
+            raise Error(f"Callback URL host {host} is not allowed")
+        return None
+
+    try:
+        addresses = [ipaddress.ip_address(host)]
+    except ValueError:
+        if not resolve:
+            return None
+        try:
+            infos = socket.getaddrinfo(
+                host, port or _DEFAULT_PORTS[parsed.scheme], proto=socket.IPPROTO_TCP
+            )
+        except (OSError, UnicodeError) as e:
+            raise Error(f"Unable to resolve callback URL host {host}: {e}") from e
+        addresses = [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+    if not addresses or not all(address.is_global for address in addresses):
+        raise Error(f"Callback URL host {host} is not a public address")
+    return addresses[0]
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Sends a callback POST request to a URL once it has been checked.
+
+    The request is sent to the IP address that was checked rather than to the host, as
+    otherwise the host could resolve to another address between the check and the
+    request. Redirects aren't followed, as they could lead to URLs that aren't allowed.
+
+    Args:
+        url: The callback URL.
+        **kwargs: Other arguments for `requests.Session.post`.
+
+    Returns:
+        The response to the callback.
+
+    Raises:
+        Error: If callbacks may not be sent to the URL.
+        requests.exceptions.RequestException: If the request fails.
+    """
+    address = check_url(url)
+    with requests.Session() as session:
+        if address is None:
+            return session.post(url, allow_redirects=False, **kwargs)
+        parsed = urllib.parse.urlsplit(url)
+        netloc = f"[{address}]" if address.version == 6 else str(address)
+        if parsed.port:
+            netloc += f":{parsed.port}"
+        session.mount("https://", _HostnameAdapter(parsed.hostname))
+        headers = {
+            **kwargs.pop("headers", {}),
+            "Host": parsed.netloc.rpartition("@")[2],
+        }
+        return session.post(
+            parsed._replace(netloc=netloc).geturl(),
+            headers=headers,
+            allow_redirects=False,
+            **kwargs,
+        )
@@ -0,0 +1,179 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=missing-docstring
+"""Tests for checking callback URLs."""
+
+import socket
+from unittest import mock
+
+from absl.testing import absltest, parameterized
+
+from testing import test_case
+from utils import callbacks
+
+
+def _addrinfo(*addresses):
+    return [
+        (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, 80))
+        for address in addresses
+    ]
+
+
+class CheckUrlTest(parameterized.TestCase, test_case.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.mock_getaddrinfo = self.enter_context(
+            mock.patch.object(
+                callbacks.socket,
+                "getaddrinfo",
+                autospec=True,
+                return_value=_addrinfo("93.184.216.34"),
+            )
+        )
+
+    @parameterized.parameters(
+        "http://example.com/callback",
+        "https://example.com:8443/callback?a=b",
+        "https://93.184.216.34/",
+    )
+    def test_public_url(self, url):
+        self.assertEqual(str(callbacks.check_url(url)), "93.184.216.34")
+
+    @parameterized.parameters(
+        "ftp://example.com/",
+        "file:///etc/passwd",
+        "gopher://example.com/",
+        "http:///callback",
+        "http://example.com:foo/",
+        "http://127.0.0.1:8082/cases/",
+        "http://10.0.0.1/",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://[::1]/",
+    )
+    def test_invalid_url_raises(self, url):
+        with self.assertRaises(callbacks.Error):
+            callbacks.check_url(url, resolve=False)
+
+    def test_host_with_private_address_raises(self):
+        self.mock_getaddrinfo.return_value = _addrinfo("93.184.216.34", "10.0.0.1")
+
+        with self.assertRaisesRegex(callbacks.Error, "not a public address"):
+            callbacks.check_url("http://signal-service/")
+
+    def test_unresolvable_host_raises(self):
+        self.mock_getaddrinfo.side_effect = socket.gaierror("Name not known")
+
+        with self.assertRaisesRegex(callbacks.Error, "Unable to resolve"):
+            callbacks.check_url("http://foo.invalid/")
+
+    def test_without_resolve_does_not_look_up_host(self):
+        callbacks.check_url("http://signal-service/", resolve=False)
+
+        self.mock_getaddrinfo.assert_not_called()
+
+    def test_allowed_hosts(self):
+        with mock.patch.object(callbacks, "ALLOWED_HOSTS", {"receiver"}):
+            self.assertIsNone(callbacks.check_url("http://receiver:8080/callback"))
+            with self.assertRaisesRegex(callbacks.Error, "not allowed"):
+                callbacks.check_url("http://example.com/")
+
+        self.mock_getaddrinfo.assert_not_called()
+
+
+class PostTest(parameterized.TestCase, test_case.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.mock_getaddrinfo = self.enter_context(
+            mock.patch.object(
+                callbacks.socket,
+                "getaddrinfo",
+                autospec=True,
+                return_value=_addrinfo("93.184.216.34"),
+            )
+        )
+        self.mock_post = self.enter_context(
+            mock.patch.object(callbacks.requests.Session, "post", autospec=True)
+        )
+
+    @parameterized.parameters(
+        ("http://example.com/a?b=c", "http://93.184.216.34/a?b=c", "example.com"),
+        (
+            "https://user@example.com:8443/a",
+            "https://93.184.216.34:8443/a",
+            "example.com:8443",
+        ),
+    )
+    def test_posts_to_checked_address(self, url, expected_url, expected_host):
+        callbacks.post(url, json={"a": 1}, timeout=5)
+
+        self.mock_post.assert_called_once_with(
+            mock.ANY,
+            expected_url,
+            headers={"Host": expected_host},
+            allow_redirects=False,
+            json={"a": 1},
+            timeout=5,
+        )
+
+    def test_posts_to_checked_ipv6_address(self):
+        self.mock_getaddrinfo.return_value = [
+            (
+                socket.AF_INET6,
+                socket.SOCK_STREAM,
+                socket.IPPROTO_TCP,
+                "",
+                ("2606:2800:220:1::1", 80, 0, 0),
+            )
+        ]
+
+        callbacks.post("http://example.com/")
+
+        self.mock_post.assert_called_once_with(
+            mock.ANY,
+            "http://[2606:2800:220:1::1]/",
+            headers={"Host": "example.com"},
+            allow_redirects=False,
+        )
+
+    def test_verifies_certificate_against_host(self):
+        callbacks.post("https://example.com/")
+
+        session = self.mock_post.call_args.args[0]
+        pool_manager = session.get_adapter("https://93.184.216.34/").poolmanager
+        self.assertEqual(
+            pool_manager.connection_pool_kw["server_hostname"], "example.com"
+        )
+        self.assertEqual(
+            pool_manager.connection_pool_kw["assert_hostname"], "example.com"
+        )
+
+    def test_allowed_host_is_posted_to_directly(self):
+        with mock.patch.object(callbacks, "ALLOWED_HOSTS", {"receiver"}):
+            callbacks.post("http://receiver:8080/callback")
+
+        self.mock_post.assert_called_once_with(
+            mock.ANY, "http://receiver:8080/callback", allow_redirects=False
+        )
+        self.mock_getaddrinfo.assert_not_called()
+
+    def test_disallowed_url_raises(self):
+        with self.assertRaises(callbacks.Error):
+            callbacks.post("http://127.0.0.1:8082/")
+
+        self.mock_post.assert_not_called()
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -0,0 +1,66 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Publishes which cases changed, so that other services can drop cached copies.
+
+Events are published on a Redis pub/sub channel as `{"case_ids": [...]}`. Delivery is
+best-effort: subscribers are expected to expire what they cache, and a failure to
+publish never fails the change itself.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Iterable
+
+import redis
+
+# The channel that changed cases are published on.
+CHANNEL = "altitude:case-changes"
+# The Redis server to publish on. Defaults to the Celery broker, which is Redis.
+REDIS_URL = os.environ.get("CASE_EVENTS_REDIS_URL") or os.environ.get(
+    "CELERY_BROKER_URL"
+)
+# How long to wait for Redis, so that an unreachable server doesn't hold up requests.
+_SOCKET_TIMEOUT_SEC = 1
+
+# The client to publish with, created on first use.
+_client: redis.Redis | None = None
+
+
+def _get_client() -> redis.Redis | None:
+    global _client  # pylint: disable=global-statement
+    if _client is None and REDIS_URL and REDIS_URL.startswith("redis"):
+        _client = redis.Redis.from_url(
+            REDIS_URL,
+            socket_timeout=_SOCKET_TIMEOUT_SEC,
+            socket_connect_timeout=_SOCKET_TIMEOUT_SEC,
+        )
+    return _client
+
+
+def publish(case_ids: Iterable[Any]) -> None:
+    """Publishes that the given cases were created or changed.
+
+    Args:
+        case_ids: The IDs of the cases.
+    """
+    case_ids = sorted({str(case_id) for case_id in case_ids})
+    client = _get_client()
+    if not case_ids or client is None:
+        return
+    try:
+        client.publish(CHANNEL, json.dumps({"case_ids": case_ids}))
+    except redis.exceptions.RedisError as e:
+        logging.warning("Publishing changes to %d cases failed: %s", len(case_ids), e)
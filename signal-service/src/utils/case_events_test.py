@@ -0,0 +1,67 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=missing-docstring
+"""Tests for publishing case changes."""
+
+import json
+from unittest import mock
+
+import redis
+from absl.testing import absltest
+from bson.objectid import ObjectId
+
+from testing import test_case
+from utils import case_events
+
+
+class PublishTest(test_case.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.mock_client = mock.create_autospec(redis.Redis, instance=True)
+        self.enter_context(
+            mock.patch.object(case_events, "_get_client", return_value=self.mock_client)
+        )
+
+    def test_publishes_unique_case_ids(self):
+        case_id = ObjectId()
+
+        case_events.publish([case_id, str(case_id), "abc"])
+
+        self.mock_client.publish.assert_called_once_with(case_events.CHANNEL, mock.ANY)
+        self.assertEqual(
+            {"case_ids": sorted(["abc", str(case_id)])},
+            json.loads(self.mock_client.publish.call_args.args[1]),
+        )
+
+    def test_skips_empty_changes(self):
+        case_events.publish([])
+
+        self.mock_client.publish.assert_not_called()
+
+    def test_ignores_redis_errors(self):
+        self.mock_client.publish.side_effect = redis.exceptions.ConnectionError()
+
+        case_events.publish(["abc"])
+
+    def test_skips_without_redis(self):
+        case_events._get_client.return_value = None  # pylint: disable=protected-access
+
+        case_events.publish(["abc"])
+
+        self.mock_client.publish.assert_not_called()
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -0,0 +1,85 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Utilities for looking up the region of IP addresses offline.
+
+Regions are read from a local MaxMind DB file (e.g. GeoLite2 Country or DB-IP
+Country Lite), which is memory-mapped so that it is shared between the processes of a
+host and only the pages that are needed get loaded.
+"""
+
+import functools
+import ipaddress
+import logging
+import os
+import threading
+from typing import Any
+
+import maxminddb
+
+# The path of the MaxMind DB file to look up regions in.
+DATABASE_PATH = os.environ.get("GEOIP_DATABASE_PATH", "/data/geoip/country.mmdb")
+# The number of IP addresses to keep the region of in memory.
+CACHE_SIZE = 4096
+
+# The reader of the database, opened on first use so that each worker process maps
+# the file itself. `False` once opening it failed, so that it isn't retried.
+_reader: Any = None
+_reader_lock = threading.Lock()
+
+
+def _get_reader() -> Any:
+    global _reader  # pylint: disable=global-statement
+    with _reader_lock:
+        if _reader is None:
+            _reader = False
+            if not os.path.isfile(DATABASE_PATH):
+                logging.warning(
+                    "No GeoIP database at %s, IP regions are disabled", DATABASE_PATH
+                )
+            else:
+                _reader = maxminddb.open_database(DATABASE_PATH, maxminddb.MODE_MMAP)
+        return _reader
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def get_region(ip_address: str | None) -> str | None:
+    """Returns the English name of the country an IP address is located in.
+
+    Args:
+        ip_address: The IP address to look up.
+
+    Returns:
+        The name of the country, or `None` if the address is invalid, private, or not
+        in the database, or if there is no database.
+    """
+    try:
+        address = ipaddress.ip_address(ip_address or "")
+    except ValueError:
+        return None
+    if not address.is_global:
+        return None
+    reader = _get_reader()
+    if not reader:
+        return None
+    try:
+        record = reader.get(address)
+    except ValueError as e:
+        logging.warning("Looking up the region of %s failed: %s", ip_address, e)
+        return None
+    if not isinstance(record, dict):
+        return None
+    # Fall back to where the address is registered if its location isn't known.
+    country = record.get("country") or record.get("registered_country") or {}
+    return country.get("names", {}).get("en")
@@ -0,0 +1,78 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=missing-docstring
+"""Tests for the offline IP region lookup."""
+
+import ipaddress
+from unittest import mock
+
+from absl.testing import absltest, parameterized
+
+from testing import test_case
+from utils import geoip
+
+_RECORD = {
+    "country": {"iso_code": "AU", "names": {"en": "Australia", "fr": "Australie"}}
+}
+
+
+class GetRegionTest(parameterized.TestCase, test_case.TestCase):
+    def setUp(self):
+        super().setUp()
+        geoip.get_region.cache_clear()
+        self.addCleanup(geoip.get_region.cache_clear)
+        self.mock_reader = mock.MagicMock()
+        self.mock_reader.get.return_value = _RECORD
+        self.enter_context(
+            mock.patch.object(geoip, "_get_reader", return_value=self.mock_reader)
+        )
+
+    def test_returns_country_name(self):
+        self.assertEqual("Australia", geoip.get_region("1.2.3.4"))
+        self.mock_reader.get.assert_called_once_with(ipaddress.ip_address("1.2.3.4"))
+
+    def test_falls_back_to_registered_country(self):
+        self.mock_reader.get.return_value = {
+            "registered_country": {"names": {"en": "Canada"}}
+        }
+
+        self.assertEqual("Canada", geoip.get_region("2001:4860::1"))
+
+    def test_caches_lookups(self):
+        geoip.get_region("1.2.3.4")
+        geoip.get_region("1.2.3.4")
+
+        self.mock_reader.get.assert_called_once()
+
+    @parameterized.parameters(
+        (None,), ("",), ("example.com",), ("192.168.0.1",), ("127.0.0.1",)
+    )
+    def test_returns_none_for_invalid_or_private_addresses(self, ip_address):
+        self.assertIsNone(geoip.get_region(ip_address))
+        self.mock_reader.get.assert_not_called()
+
+    def test_returns_none_for_unknown_addresses(self):
+        self.mock_reader.get.return_value = None
+
+        self.assertIsNone(geoip.get_region("1.2.3.4"))
+
+    def test_returns_none_without_database(self):
+        geoip._get_reader.return_value = False  # pylint: disable=protected-access
+
+        self.assertIsNone(geoip.get_region("1.2.3.4"))
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -15,8 +15,18 @@
 """Utilities for image processing."""
 
 from io import BytesIO
+from typing import Iterable
 
-from PIL import Image, UnidentifiedImageError
+from PIL import Image, UnidentifiedImageError, features
+
+# The sizes that thumbnails can be made in, as their maximum width and height in pixels.
+THUMBNAIL_SIZES = (128, 256, 512)
+# WebP thumbnails are considerably smaller, but Pillow may be built without support.
+if features.check("webp"):
+    _THUMBNAIL_FORMAT, THUMBNAIL_MIME_TYPE = "WEBP", "image/webp"
+else:
+    _THUMBNAIL_FORMAT, THUMBNAIL_MIME_TYPE = "JPEG", "image/jpeg"
+_THUMBNAIL_QUALITY = 80
 
 
 def is_image(data: bytes) -> bool:
@@ -32,3 +42,46 @@ def is_image(data: bytes) -> bool:
     except UnidentifiedImageError:
         return False
     return True
+
+
+def get_mime_type(data: bytes) -> str | None:
+    """Returns the MIME type of image data, or None if it is not a known image type."""
+    try:
+        with Image.open(BytesIO(data)) as image:
+            return image.get_format_mimetype()
+    except UnidentifiedImageError:
+        return None
+
+
+def make_thumbnail(data: bytes, size: int) -> bytes:
+    """Downscales an image to fit within a square of the given size.
+
+    Args:
+        data: The byte content of the image.
+        size: The maximum width and height of the thumbnail, in pixels.
+    Returns:
+        The thumbnail, encoded as `THUMBNAIL_MIME_TYPE`.
+    """
+    return make_thumbnails(data, [size])[size]
+
+
+def make_thumbnails(data: bytes, sizes: Iterable[int]) -> dict[int, bytes]:
+    """Downscales an image to several sizes, decoding it only once.
+
+    Args:
+        data: The byte content of the image.
+        sizes: The maximum widths and heights of the thumbnails, in pixels.
+    Returns:
+        The thumbnails by their size, encoded as `THUMBNAIL_MIME_TYPE`.
+    """
+    thumbnails = {}
+    with Image.open(BytesIO(data)) as image:
+        image = image.convert("RGB")
+        # Each thumbnail is downscaled from the next larger one, which is cheaper than
+        # starting from the original every time.
+        for size in sorted(sizes, reverse=True):
+            image.thumbnail((size, size))
+            output = BytesIO()
+            image.save(output, format=_THUMBNAIL_FORMAT, quality=_THUMBNAIL_QUALITY)
+            thumbnails[size] = output.getvalue()
+    return thumbnails
@@ -14,6 +14,10 @@
 
 """Tests for image utilities."""
 
+from io import BytesIO
+
+from PIL import Image
+
 from testing import test_case
 from utils import image
 
@@ -21,13 +25,39 @@ from utils import image
 class ImageUtilsTest(test_case.TestCase):
     "Tests for image utility functions."
 
-    def test_is_image_true(self):
+    def setUp(self):
+        super().setUp()
         img_file_path = self.root_path.joinpath("testing/testdata/logo.png")
         with open(img_file_path, "rb") as img_file:
-            test_image_bytes = img_file.read()
-        result = image.is_image(test_image_bytes)
+            self.test_image_bytes = img_file.read()
+
+    def test_is_image_true(self):
+        result = image.is_image(self.test_image_bytes)
         self.assertTrue(result)
 
     def test_is_image_false(self):
         result = image.is_image(b"123")
         self.assertFalse(result)
+
+    def test_get_mime_type(self):
+        self.assertEqual("image/png", image.get_mime_type(self.test_image_bytes))
+
+    def test_get_mime_type_not_an_image(self):
+        self.assertIsNone(image.get_mime_type(b"123"))
+
+    def test_make_thumbnail(self):
+        thumbnail = image.make_thumbnail(self.test_image_bytes, 128)
+
+        with Image.open(BytesIO(thumbnail)) as thumbnail_image:
+            self.assertEqual(
+                image.THUMBNAIL_MIME_TYPE, thumbnail_image.get_format_mimetype()
+            )
+            self.assertLessEqual(max(thumbnail_image.size), 128)
+
+    def test_make_thumbnails(self):
+        thumbnails = image.make_thumbnails(self.test_image_bytes, [128, 256])
+
+        self.assertCountEqual([128, 256], thumbnails)
+        for size, thumbnail in thumbnails.items():
+            with Image.open(BytesIO(thumbnail)) as thumbnail_image:
+                self.assertEqual(size, max(thumbnail_image.size))
@@ -15,7 +15,7 @@
 """Utilities for working with iterators."""
 
 import itertools
-from typing import Iterator, TypeVar
+from typing import BinaryIO, Iterator, TypeVar
 
 T = TypeVar("T")
 
@@ -31,3 +31,13 @@ def grouper(
         if not chunk:
             return
         yield chunk
+
+
+def read_lines(file: BinaryIO, encoding: str = "utf-8") -> Iterator[str]:
+    """Reads decoded lines from a file, leaving its position after the last line.
+
+    Unlike iterating over a text file, this does not read ahead, so `file.tell()` is
+    the byte offset right after the last line yielded, e.g. to resume from later.
+    """
+    while line := file.readline():
+        yield line.decode(encoding)
@@ -14,9 +14,11 @@
 
 """Tests for iterators utilities."""
 
+import io
+
 from absl.testing import absltest
 
-from utils.iterators import grouper
+from utils.iterators import grouper, read_lines
 
 
 class IteratorsTest(absltest.TestCase):
@@ -45,3 +47,11 @@ class IteratorsTest(absltest.TestCase):
         *_, last_chunk = grouper_iter
 
         self.assertLen(last_chunk, 6)
+
+    def test_read_lines_leaves_position_after_last_line(self):
+        file = io.BytesIO("foo\nbär\nbaz".encode("utf-8"))
+        lines = read_lines(file)
+
+        self.assertEqual("foo\n", next(lines))
+        self.assertEqual(4, file.tell())
+        self.assertEqual(["bär\n", "baz"], list(lines))
@@ -14,31 +14,81 @@
 
 """Utilities for JSON decoding and encoding."""
 
+import codecs
 import datetime
 import enum
 import json
-from typing import Any, Type
+import logging
+import os
+from typing import Any, Callable, Iterable, Iterator, Type
 
 from indexing.index import IndexEntryMetadata, IndexMatch
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@enum.unique
+class Backend(str, enum.Enum):
+    """The libraries that objects can be serialized to JSON with."""
+
+    # The standard library `json` module, with our `JSONEncoder`.
+    STDLIB = "STDLIB"
+    # The `orjson` library, which is considerably faster and handles datetimes and
+    # enums natively. Falls back to `STDLIB` if it isn't installed.
+    ORJSON = "ORJSON"
+
+
+BACKEND = Backend(os.environ.get("JSON_BACKEND", Backend.ORJSON).upper())
+if BACKEND == Backend.ORJSON and orjson is None:
+    logging.warning("orjson is not installed, falling back to the stdlib JSON backend")
+    BACKEND = Backend.STDLIB
+
+# Converts values that JSON doesn't support, by their exact type. Converters for
+# subclasses of the types in `_BASE_CONVERTERS` are added when first needed, which
+# avoids going through a chain of `isinstance()` checks for every value.
+_CONVERTERS: dict[type, Callable[[Any], Any]] = {}
+_BASE_CONVERTERS: tuple[tuple[type | tuple[type, ...], Callable[[Any], Any]], ...] = (
+    ((IndexEntryMetadata, IndexMatch), lambda o: o.to_dict()),
+    ((datetime.datetime, datetime.date), lambda o: o.isoformat()),
+    (enum.Enum, lambda o: o.value),
+    (bytes, lambda o: o.decode(errors="ignore")),
+)
+
 
 class JSONDecodeError(ValueError):
     """Error raised when input cannot be decoded as JSON."""
 
 
+def _convert(o: Any) -> Any:
+    """Converts a value that JSON doesn't support to one it does.
+
+    Raises:
+        TypeError: If the value cannot be converted.
+    """
+    converter = _CONVERTERS.get(type(o))
+    if converter is None:
+        for base, base_converter in _BASE_CONVERTERS:
+            if isinstance(o, base):
+                converter = _CONVERTERS[type(o)] = base_converter
+                break
+        else:
+            raise TypeError(
+                f"Object of type {type(o).__name__} is not JSON serializable"
+            )
+    return converter(o)
+
+
 class JSONEncoder(json.JSONEncoder):
     """A custom JSON encoder."""
 
     def default(self, o):
-        if isinstance(o, (IndexEntryMetadata, IndexMatch)):
-            return o.to_dict()
-        if isinstance(o, (datetime.datetime, datetime.date)):
-            return o.isoformat()
-        if isinstance(o, enum.Enum):
-            return o.value
-        if isinstance(o, bytes):
-            return o.decode(errors="ignore")
-        return super().default(o)
+        try:
+            return _convert(o)
+        except TypeError:
+            return super().default(o)
 
 
 def dumps(
@@ -46,6 +96,9 @@ def dumps(
 ) -> str:
     """Serializes object to a JSON formatted string.
 
+    Uses the configured `BACKEND` when serializing with our `JSONEncoder`. Custom
+    encoders and formatting options always use the standard library.
+
     Args:
         obj: The object to convert to JSON.
         cls: optional JSONEncoder to use instead of the default. Defaults to our
@@ -55,6 +108,15 @@ def dumps(
     Returns:
         The JSON formatted string.
     """
+    if BACKEND == Backend.ORJSON and cls is JSONEncoder and not kwargs:
+        try:
+            return orjson.dumps(
+                obj, default=_convert, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except orjson.JSONEncodeError:
+            # orjson is stricter than the standard library, e.g. it rejects integers
+            # larger than 64 bits, so let the latter have a go as well.
+            pass
     return json.dumps(obj, cls=cls, **kwargs)
 
 
@@ -75,3 +137,134 @@ def loads(data: str | bytes, **kwargs: Any) -> Any:
         return json.loads(data, **kwargs)
     except ValueError as e:
         raise JSONDecodeError(str(e)) from e
+
+
+class ObjectStream:
+    """Incrementally decodes a JSON object, streaming the items of one array field.
+
+    This keeps memory use proportional to the size of a single array item instead of
+    the whole document, which is useful for large paged API responses. The items of
+    the array are yielded when iterating over the stream. All other fields of the
+    object are available in `fields` once iteration has finished.
+
+    Example usage:
+        stream = ObjectStream(response.iter_content(8192), array_field="results")
+        for result in stream:
+            ...
+        next_page = stream.fields.get("next")
+    """
+
+    _WHITESPACE = " \t\n\r"
+    # The characters that a number can continue with.
+    _NUMBER = "0123456789.eE+-"
+
+    def __init__(self, chunks: Iterable[str | bytes], array_field: str):
+        """Initializes the stream.
+
+        Args:
+            chunks: The text or UTF-8 encoded chunks of the JSON document.
+            array_field: The name of the array field whose items to stream.
+        """
+        self._chunks = iter(chunks)
+        self._utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._array_field = array_field
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+        self.fields: dict[str, Any] = {}
+        self.item_count = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            yield from self._parse_object()
+        except json.JSONDecodeError as e:
+            raise JSONDecodeError(str(e)) from e
+
+    def _read(self) -> bool:
+        """Appends the next chunk to the buffer, returning whether there was one."""
+        if self._exhausted:
+            return False
+        # Drop what has been decoded already so the buffer doesn't grow unbounded.
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8_decoder.decode(chunk)
+            if chunk:
+                self._buffer += chunk
+                return True
+        self._exhausted = True
+        self._buffer += self._utf8_decoder.decode(b"", final=True)
+        return False
+
+    def _peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            while (
+                self._pos < len(self._buffer)
+                and self._buffer[self._pos] in self._WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                raise JSONDecodeError("Unexpected end of JSON document.")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise JSONDecodeError(
+                f"Expected {char!r} but found {self._buffer[self._pos]!r}."
+            )
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """Decodes the next complete JSON value from the buffer."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read():
+                    continue
+                raise
+            # A number may continue in the next chunk, e.g. "1." may be followed by "5",
+            # in which case only part of it was decoded. Other values end with their
+            # own delimiter.
+            if (
+                not isinstance(value, (int, float))
+                or (end < len(self._buffer) and self._buffer[end] not in self._NUMBER)
+                or not self._read()
+            ):
+                self._pos = end
+                return value
+
+    def _parse_array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            self.item_count += 1
+            yield self._decode_value()
+            if self._peek() == "]":
+                self._pos += 1
+                return
+            self._expect(",")
+
+    def _parse_object(self) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(":")
+            if key == self._array_field and self._peek() == "[":
+                yield from self._parse_array()
+            else:
+                self.fields[key] = self._decode_value()
+            if self._peek() == "}":
+                self._pos += 1
+                return
+            self._expect(",")
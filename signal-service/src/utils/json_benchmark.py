@@ -0,0 +1,142 @@
+# Copyright 2023 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark comparing the throughput of the JSON backends on typical API responses.
+
+Run it with:
+
+    poetry run python -m utils.json_benchmark --repeat=20
+"""
+
+import datetime
+import timeit
+from typing import Any
+from unittest import mock
+
+from absl import app, flags
+from bson.objectid import ObjectId
+
+from api import case as case_api
+from api import signal as signal_api
+from api import target as target_api
+from models.case import Case, Review
+from models.features.image import Image
+from models.features.user import User
+from models.signal import (
+    Content,
+    ContentFeatures,
+    ContentStatus,
+    Signal,
+    Source,
+    Sources,
+)
+from models.target import FeatureSet, Target
+from utils import json
+
+_REPEAT = flags.DEFINE_integer(
+    "repeat", 10, "The number of times to encode each payload per backend."
+)
+_CASE_PAGE_SIZE = flags.DEFINE_integer(
+    "case_page_size", 100, "The number of expanded cases in the case page payload."
+)
+_SIGNAL_EXPORT_SIZE = flags.DEFINE_integer(
+    "signal_export_size", 10_000, "The number of signals in the export payload."
+)
+
+_REPORT_DATE = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+
+def _make_signal(i: int) -> Signal:
+    return Signal(
+        id=ObjectId(),
+        content=[Content(value=f"{i:064x}", content_type=Content.ContentType.HASH_PDQ)],
+        sources=Sources(
+            sources=[
+                Source(
+                    name=Source.Name.GIFCT, author="Author", report_date=_REPORT_DATE
+                ),
+                Source(name=Source.Name.TCAP, report_date=_REPORT_DATE),
+            ]
+        ),
+        content_features=ContentFeatures(
+            associated_terrorist_organizations=["Organization"],
+            contains_pii=ContentFeatures.Confidence.NO,
+            is_violent_or_graphic=ContentFeatures.Confidence.UNSURE,
+            tags=["tag1", "tag2"],
+        ),
+        content_status=ContentStatus(
+            last_checked_date=_REPORT_DATE,
+            most_recent_status=ContentStatus.Status.ACTIVE,
+        ),
+    )
+
+
+def _make_case_page(size: int) -> dict[str, Any]:
+    """Makes a page of cases, with their signals and target expanded."""
+    cases = []
+    for i in range(size):
+        signals = [_make_signal(i), _make_signal(i + 1)]
+        target = Target(
+            id=ObjectId(),
+            create_time=_REPORT_DATE,
+            client_context=f"context-{i}",
+            feature_set=FeatureSet(
+                creator=User(ip_address="192.0.2.1"),
+                image=Image(title="Title", description="Description"),
+            ),
+        )
+        case = Case(
+            id=ObjectId(),
+            signal_ids=[signal.id for signal in signals],
+            target_id=target.id,
+            create_time=_REPORT_DATE,
+            review_history=[Review(decision=Review.Decision.BLOCK, user="user")],
+            cached_confidence=20,
+            cached_severity=40,
+            cached_priority=60,
+        )
+        case_dict = case_api._to_dict(case)  # pylint: disable=protected-access
+        case_dict["signals"] = [signal_api.to_dict(signal) for signal in signals]
+        case_dict["target"] = target_api.to_dict(target)
+        cases.append(case_dict)
+    return {"data": cases, "next_cursor_token": "abc", "total_count": size * 10}
+
+
+def _benchmark(name: str, payload: Any, repeat: int) -> None:
+    for backend in json.Backend:
+        if backend == json.Backend.ORJSON and json.orjson is None:
+            print(f"{name:<16} {backend.value:<8} skipped, orjson is not installed")
+            continue
+        with mock.patch.object(json, "BACKEND", backend):
+            size = len(json.dumps(payload).encode())
+            seconds = min(
+                timeit.repeat(lambda: json.dumps(payload), number=1, repeat=repeat)
+            )
+        print(
+            f"{name:<16} {backend.value:<8} {seconds * 1000:8.1f} ms "
+            f"{size / seconds / 2**20:8.1f} MiB/s"
+        )
+
+
+def main(_):  # pylint: disable=missing-docstring
+    case_page = _make_case_page(_CASE_PAGE_SIZE.value)
+    signal_export = [
+        signal_api.to_dict(_make_signal(i)) for i in range(_SIGNAL_EXPORT_SIZE.value)
+    ]
+    _benchmark("case page", case_page, _REPEAT.value)
+    _benchmark("signal export", signal_export, _REPEAT.value)
+
+
+if __name__ == "__main__":
+    app.run(main)
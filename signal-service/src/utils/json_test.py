@@ -18,10 +18,12 @@
 import datetime
 import enum
 import json
+from unittest import mock
 
-from absl.testing import absltest
+from absl.testing import absltest, parameterized
 
-from utils.json import JSONEncoder
+from utils import json as json_utils
+from utils.json import JSONDecodeError, JSONEncoder, ObjectStream
 
 
 class JSONEncoderTest(absltest.TestCase):
@@ -51,5 +53,96 @@ class JSONEncoderTest(absltest.TestCase):
         self.assertEqual('"foo"', json.dumps(b"foo", cls=JSONEncoder))
 
 
+class MyStrEnum(str, enum.Enum):
+    FOO = "BAR"
+
+
+@parameterized.parameters(json_utils.Backend)
+class DumpsTest(parameterized.TestCase):
+    def _dumps(self, backend, obj):
+        if backend == json_utils.Backend.ORJSON and json_utils.orjson is None:
+            self.skipTest("orjson is not installed")
+        with mock.patch.object(json_utils, "BACKEND", backend):
+            return json.loads(json_utils.dumps(obj))
+
+    def test_dumps_supported_types(self, backend):
+        obj = {
+            "datetime": datetime.datetime(1955, 11, 5, tzinfo=datetime.timezone.utc),
+            "date": datetime.date(1955, 11, 5),
+            "enum": MyStrEnum.FOO,
+            "bytes": b"foo",
+            1: [1.5, None, True],
+        }
+
+        self.assertEqual(
+            {
+                "datetime": "1955-11-05T00:00:00+00:00",
+                "date": "1955-11-05",
+                "enum": "BAR",
+                "bytes": "foo",
+                "1": [1.5, None, True],
+            },
+            self._dumps(backend, obj),
+        )
+
+    def test_dumps_large_integer(self, backend):
+        self.assertEqual(2**70, self._dumps(backend, 2**70))
+
+    def test_dumps_unsupported_type_raises(self, backend):
+        with self.assertRaises(TypeError):
+            self._dumps(backend, object())
+
+
+class ObjectStreamTest(parameterized.TestCase):
+    def test_streams_array_items(self):
+        data = {"next": "abc", "results": [{"id": 1}, {"id": 2.5}], "count": 123}
+        encoded = json.dumps(data).encode("utf-8")
+        # Split the document into single bytes to cover values spanning chunks.
+        stream = ObjectStream(
+            (encoded[i : i + 1] for i in range(len(encoded))), array_field="results"
+        )
+
+        self.assertEqual([{"id": 1}, {"id": 2.5}], list(stream))
+        self.assertEqual({"next": "abc", "count": 123}, stream.fields)
+        self.assertEqual(2, stream.item_count)
+
+    @parameterized.parameters(
+        "1.5", "-12.25", "1.5e3", "2E-3", "-1.5e+10", "1234567", "0.000001"
+    )
+    def test_decodes_numbers_split_across_chunks(self, number):
+        document = f'{{"data": [{number}, {number}], "total": {number}}}'
+        expected = json.loads(number)
+
+        for offset in range(1, len(document)):
+            with self.subTest(offset=offset):
+                stream = ObjectStream(
+                    [document[:offset], document[offset:]], array_field="data"
+                )
+
+                self.assertEqual([expected, expected], list(stream))
+                self.assertEqual({"total": expected}, stream.fields)
+
+    def test_decodes_multibyte_characters_across_chunks(self):
+        encoded = json.dumps({"data": ["ü€"]}, ensure_ascii=False).encode("utf-8")
+
+        stream = ObjectStream(
+            (encoded[i : i + 1] for i in range(len(encoded))), array_field="data"
+        )
+
+        self.assertEqual(["ü€"], list(stream))
+
+    def test_missing_array(self):
+        stream = ObjectStream(["{}"], array_field="data")
+
+        self.assertEmpty(list(stream))
+        self.assertEqual(0, stream.item_count)
+
+    def test_raises_on_truncated_document(self):
+        stream = ObjectStream(['{"data": [1, 2'], array_field="data")
+
+        with self.assertRaises(JSONDecodeError):
+            list(stream)
+
+
 if __name__ == "__main__":
     absltest.main()
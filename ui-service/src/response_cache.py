@@ -0,0 +1,159 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A cache of case responses that is invalidated when cases change.
+
+The SignalService publishes the IDs of cases that were created or changed on a Redis
+pub/sub channel. Each server process subscribes to it in a background thread, and
+drops the cached detail of those cases along with all cached lists of cases, as their
+order and contents may have changed. Entries also expire after a while, which bounds
+how stale parts of a case that don't publish changes, such as its signals, can get.
+
+As changes published while not subscribed would be missed, nothing is cached until
+the subscription is up.
+"""
+
+import collections
+import json
+import logging
+import threading
+import time
+from typing import Any, Hashable, Iterable
+
+import redis
+
+# The channel that the SignalService publishes changed cases on.
+CHANNEL = "altitude:case-changes"
+# How long to wait before subscribing again after the connection to Redis is lost.
+_RESUBSCRIBE_DELAY_SEC = 5
+
+# The kind of key for the detail of a single case, i.e. `(CASE, case_id)`.
+CASE = "case"
+# The kind of key for a list of cases, i.e. `(CASES, *query)`.
+CASES = "cases"
+
+
+class ResponseCache:
+    """A thread-safe cache with a maximum size and a time-to-live for its entries.
+
+    Keys are tuples of their kind (`CASE` or `CASES`) and what identifies the response
+    within that kind. Once full, the least recently used entries are evicted.
+
+    Responses are fetched without holding the lock, so a change can be received while
+    one is being fetched. To not cache responses from before such changes, they are
+    only cached if nothing was invalidated since the `generation` they were fetched at.
+    """
+
+    def __init__(self, max_size: int, ttl_sec: float):
+        self._max_size = max_size
+        self._ttl_sec = ttl_sec
+        self._entries: collections.OrderedDict[
+            Hashable, tuple[float, Any]
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        # Whether changes to cases are being received, and so entries can be trusted.
+        self.enabled = False
+
+    @property
+    def generation(self) -> int:
+        """The number of times that entries were invalidated."""
+        with self._lock:
+            return self._generation
+
+    def get(self, key: tuple[Hashable, ...]) -> Any | None:
+        """Returns the cached response for a key, or `None` if there is none."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry, value = entry
+            if expiry < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: tuple[Hashable, ...], value: Any, generation: int) -> None:
+        """Caches a response, if the cache is enabled.
+
+        Args:
+            key: The key of the response.
+            value: The response.
+            generation: The `generation` from before the response was fetched.
+        """
+        with self._lock:
+            if not self.enabled or generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self._ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, case_ids: Iterable[str]) -> None:
+        """Drops the cached responses that the given cases may be part of."""
+        case_keys = {(CASE, case_id) for case_id in case_ids}
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                if key[0] == CASES or key in case_keys:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        """Drops all cached responses."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def subscribe(self, redis_url: str) -> threading.Thread:
+        """Starts invalidating the cache on changes published to Redis.
+
+        Args:
+            redis_url: The URL of the Redis server that changes are published on.
+
+        Returns:
+            The daemon thread that receives the changes.
+        """
+        thread = threading.Thread(
+            target=self._listen, args=(redis_url,), name="response-cache", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _listen(self, redis_url: str) -> None:
+        client = redis.Redis.from_url(redis_url)
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Changes may have been missed while not subscribed.
+                self.clear()
+                self.enabled = True
+                logging.info("Subscribed to case changes on %s", CHANNEL)
+                for message in pubsub.listen():
+                    self._handle_message(message)
+            except redis.exceptions.RedisError as e:
+                logging.warning("Receiving case changes failed: %s", e)
+            self.enabled = False
+            self.clear()
+            time.sleep(_RESUBSCRIBE_DELAY_SEC)
+
+    def _handle_message(self, message: dict[str, Any]) -> None:
+        try:
+            case_ids = json.loads(message["data"])["case_ids"]
+        except (KeyError, TypeError, ValueError):
+            logging.warning("Dropping the cache on invalid case changes: %s", message)
+            self.clear()
+            return
+        self.invalidate(case_ids)
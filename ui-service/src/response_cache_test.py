@@ -0,0 +1,110 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=missing-docstring
+"""Tests for the response cache."""
+
+import json
+from unittest import mock
+
+from absl.testing import absltest
+
+import response_cache
+from response_cache import CASE, CASES
+from testing import test_case
+
+
+class ResponseCacheTest(test_case.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = response_cache.ResponseCache(max_size=2, ttl_sec=10)
+        self.cache.enabled = True
+
+    def _set(self, key, value):
+        self.cache.set(key, value, self.cache.generation)
+
+    def test_get_returns_cached_value(self):
+        self._set((CASE, "abc"), {"id": "abc"})
+
+        self.assertEqual({"id": "abc"}, self.cache.get((CASE, "abc")))
+        self.assertIsNone(self.cache.get((CASE, "def")))
+
+    def test_set_without_subscription_does_not_cache(self):
+        self.cache.enabled = False
+
+        self._set((CASE, "abc"), {"id": "abc"})
+
+        self.assertIsNone(self.cache.get((CASE, "abc")))
+
+    @mock.patch.object(response_cache.time, "monotonic", autospec=True)
+    def test_get_expires_entries(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        self._set((CASE, "abc"), {"id": "abc"})
+
+        mock_monotonic.return_value = 111
+
+        self.assertIsNone(self.cache.get((CASE, "abc")))
+
+    def test_set_evicts_least_recently_used(self):
+        self._set((CASE, "abc"), {"id": "abc"})
+        self._set((CASE, "def"), {"id": "def"})
+        self.cache.get((CASE, "abc"))
+
+        self._set((CASE, "ghi"), {"id": "ghi"})
+
+        self.assertIsNotNone(self.cache.get((CASE, "abc")))
+        self.assertIsNone(self.cache.get((CASE, "def")))
+        self.assertIsNotNone(self.cache.get((CASE, "ghi")))
+
+    def test_invalidate_drops_cases_and_lists(self):
+        self.cache = response_cache.ResponseCache(max_size=10, ttl_sec=10)
+        self.cache.enabled = True
+        self._set((CASE, "abc"), {"id": "abc"})
+        self._set((CASE, "def"), {"id": "def"})
+        self._set((CASES, ("page_size", "10")), {"data": []})
+
+        self.cache.invalidate(["abc"])
+
+        self.assertIsNone(self.cache.get((CASE, "abc")))
+        self.assertIsNotNone(self.cache.get((CASE, "def")))
+        self.assertIsNone(self.cache.get((CASES, ("page_size", "10"))))
+
+    def test_set_after_invalidation_does_not_cache(self):
+        generation = self.cache.generation
+        self.cache.invalidate(["abc"])
+
+        self.cache.set((CASE, "abc"), {"id": "abc"}, generation)
+
+        self.assertIsNone(self.cache.get((CASE, "abc")))
+
+    def test_handle_message_invalidates_cases(self):
+        self._set((CASE, "abc"), {"id": "abc"})
+        self._set((CASE, "def"), {"id": "def"})
+
+        # pylint: disable-next=protected-access
+        self.cache._handle_message({"data": json.dumps({"case_ids": ["abc"]})})
+
+        self.assertIsNone(self.cache.get((CASE, "abc")))
+        self.assertIsNotNone(self.cache.get((CASE, "def")))
+
+    def test_handle_invalid_message_clears_cache(self):
+        self._set((CASE, "abc"), {"id": "abc"})
+
+        self.cache._handle_message({"data": b"foo"})  # pylint: disable=protected-access
+
+        self.assertIsNone(self.cache.get((CASE, "abc")))
+
+
+if __name__ == "__main__":
+    absltest.main()
@@ -15,15 +15,16 @@
 """The server for handling the Angular Client App's requests."""
 # pylint: disable=too-many-locals
 
-import base64
 import datetime
 import enum
 import http
 import itertools
+import json
 import logging
 import multiprocessing
 import os
-from typing import Any, Iterable, Mapping, TypedDict
+from concurrent import futures
+from typing import Any, Callable, Iterable, Mapping, TypedDict, TypeVar
 from urllib import parse
 from urllib.request import urlopen
 
@@ -31,14 +32,30 @@ import flask
 import requests
 from flask_expects_json import expects_json
 from jsonschema import ValidationError
+from requests import adapters
 from threatexchange.signal_type.pdq import PdqSignal
 from werkzeug import exceptions
 
 import gunicorn_app
+import response_cache
 
 _APP_NAME = "AltitudeUIService"
 SIGNAL_SERVICE_URL = "http://signal-service:8082/"
+CLIENT_API_PATH = "api/"
+# The size of the image thumbnails to show in lists of cases, in pixels.
+LIST_THUMBNAIL_SIZE = 256
 DEFAULT_REQUEST_TIMEOUT_SEC = 5
+# The maximum number of requests to send to other services at once for a single
+# client request.
+MAX_CONCURRENT_REQUESTS = 8
+# The Redis server that the SignalService publishes changed cases on. Responses are
+# only cached if it is set.
+RESPONSE_CACHE_REDIS_URL = os.environ.get("RESPONSE_CACHE_REDIS_URL")
+# The number of case and case list responses to cache per server process.
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+# How long responses are cached for at most, which bounds how stale the parts of a
+# case that don't publish changes, such as its signals and target, can get.
+RESPONSE_CACHE_TTL_SEC = int(os.environ.get("RESPONSE_CACHE_TTL_SEC", 60))
 
 EPOCH = datetime.datetime.fromtimestamp(0, tz=datetime.timezone.utc)
 
@@ -48,7 +65,7 @@ SIGNAL_CONTENT = "signalContent"
 FLAGS = "flags"
 MOST_RECENT_STATUS = "mostRecentStatus"
 ASSOCIATED_ENTITIES = "associatedEntities"
-IMAGE_BYTES = "imageBytes"
+IMAGE_URL = "imageUrl"
 NOTES = "notes"
 
 # For Content
@@ -106,22 +123,56 @@ class MergedSource(TypedDict):
     authors: list[str]
 
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
 app = flask.Flask(_APP_NAME, static_folder=None)
 app.config["PROPAGATE_EXCEPTIONS"] = True
 
+# The session to reuse connections to the SignalService across requests, rather than
+# opening a new one for every call.
+_session = requests.Session()
+_session.mount("http://", adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS))
+_session.mount("https://", adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS))
+
+_response_cache = response_cache.ResponseCache(
+    RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SEC
+)
+
+
+def _map_concurrently(function: Callable[[_T], _R], items: Iterable[_T]) -> list[_R]:
+    """Calls a function on each item concurrently and returns the results in order.
+
+    At most `MAX_CONCURRENT_REQUESTS` calls run at once. If any call raises, the
+    exception is re-raised once the calls have finished.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    with futures.ThreadPoolExecutor(
+        max_workers=min(MAX_CONCURRENT_REQUESTS, len(items))
+    ) as executor:
+        return list(executor.map(function, items))
+
+
+def _get(url: str) -> requests.Response:
+    return _session.get(url, timeout=DEFAULT_REQUEST_TIMEOUT_SEC)
+
 
 def _to_signal_service_url(relative_path: str):
-    return parse.urljoin(SIGNAL_SERVICE_URL, relative_path.lstrip("/"))
+    # The leading `./` stops paths like `reviews:batchCreate` from being parsed as URLs.
+    return parse.urljoin(SIGNAL_SERVICE_URL, "./" + relative_path.lstrip("/"))
 
 
-def get_ip_region(ip_address: str | None) -> str | None:
-    if not ip_address:
+def _to_client_api_url(
+    signal_service_path: str | None, query: Mapping[str, Any] | None = None
+) -> str | None:
+    """Converts a SignalService path to the URL the client can reach it at."""
+    if not signal_service_path:
         return None
-
-    response = requests.get(
-        f"https://ipapi.co/{ip_address}/json/", timeout=DEFAULT_REQUEST_TIMEOUT_SEC
-    ).json()
-    return response.get("country_name")
+    # The gateway exposes parts of the SignalService API to the client under `api/`.
+    url = parse.urljoin(CLIENT_API_PATH, signal_service_path.lstrip("/"))
+    return f"{url}?{parse.urlencode(query)}" if query else url
 
 
 def get_fallback_title(signal: Mapping[str, Any]):
@@ -179,8 +230,18 @@ def case_to_json(
     signals: Iterable[dict[str, Any]],
     target: dict[str, Any],
     similar_cases: Iterable[dict[str, Any]] | None = None,
+    thumbnail_size: int | None = None,
 ) -> dict[str, Any]:
-    """Converts a Case from SignalService to a JSON-able dictionary for the client."""
+    """Converts a Case from SignalService to a JSON-able dictionary for the client.
+
+    Args:
+        case: The case from SignalService.
+        signals: The signals of the case.
+        target: The target of the case, if any.
+        similar_cases: Other cases with any of the same signals.
+        thumbnail_size: The size of the thumbnail to link to instead of the original
+            image, if any.
+    """
     review_history = case.get("review_history", [])
     creator = target.get(CREATOR, {})
     data = {
@@ -224,7 +285,10 @@ def case_to_json(
                 },
             ),
         },
-        IMAGE_BYTES: target.get("content_bytes"),
+        IMAGE_URL: _to_client_api_url(
+            target.get("image_url"),
+            {"size": thumbnail_size} if thumbnail_size else None,
+        ),
         TITLE: (
             target.get("title")
             or next(filter(lambda x: x, (get_fallback_title(x) for x in signals)), None)
@@ -233,7 +297,7 @@ def case_to_json(
         VIEWS: target.get("views"),
         UPLOAD_TIME: target.get("create_time"),
         IP_ADDRESS: creator.get("ip_address"),
-        IP_REGION: get_ip_region(creator.get("ip_address")),
+        IP_REGION: creator.get("ip_region"),
         SIMILAR_CASE_IDS: [
             similar_case.get("id")
             for similar_case in similar_cases
@@ -288,25 +352,34 @@ def add_reviews():
     decision = ReviewDecisionType(flask.request.json["decision"])
     logging.info("Received %s review for cases %s", decision, case_ids)
 
-    review_ids = set()
-    json = {"decision": decision.name}
-    for case_id in case_ids:
-        response = requests.post(
-            _to_signal_service_url(f"cases/{case_id}/reviews/"),
-            json=json,
-            timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-        )
-
-        # TODO: Don't error out on the first failing case review.
-        if not response.ok:
-            return handle_bad_response(response, error_on_not_found=True)
-
-        review_ids.add(response.json().get("id"))
-
-    return (
-        flask.jsonify([review_id for review_id in review_ids if review_id is not None]),
-        http.HTTPStatus.OK,
+    response = _session.post(
+        _to_signal_service_url("reviews:batchCreate"),
+        json={"case_ids": case_ids, "decision": decision.name},
+        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
     )
+    # Don't wait for the change to be published to show it to this moderator.
+    _response_cache.invalidate(case_ids)
+    if not response.ok:
+        return handle_bad_response(response, error_on_not_found=True)
+
+    # Cases are reviewed independently, so report which of them failed.
+    results = []
+    for result in response.json()["results"]:
+        if "error" in result:
+            logging.warning(
+                "Failed to review case %s: %s",
+                result["case_id"],
+                result["error"]["message"],
+            )
+            results.append(
+                {"case_id": result["case_id"], "error": result["error"]["message"]}
+            )
+        else:
+            results.append(
+                {"case_id": result["case_id"], "review_id": result["review"]["id"]}
+            )
+
+    return flask.jsonify({"results": results}), http.HTTPStatus.OK
 
 
 @app.route("/remove_reviews", methods=["DELETE"])
@@ -334,17 +407,30 @@ def remove_reviews():
     review_ids = flask.request.json["review_ids"]
     logging.info("Received delete request for reviews %s", review_ids)
 
-    for review_id in review_ids:
-        response = requests.delete(
-            _to_signal_service_url(f"/reviews/{review_id}"),
-            timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-        )
-
-        # TODO: Don't error out on the first failing case review.
-        if not response.ok:
-            return handle_bad_response(response, error_on_not_found=True)
+    response = _session.post(
+        _to_signal_service_url("reviews:batchDelete"),
+        json={"review_ids": review_ids},
+        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
+    )
+    if not response.ok:
+        return handle_bad_response(response, error_on_not_found=True)
+
+    # Reviews are removed independently, so report which of them failed.
+    results = []
+    for result in response.json()["results"]:
+        if "error" in result:
+            logging.warning(
+                "Failed to remove review %s: %s",
+                result["review_id"],
+                result["error"]["message"],
+            )
+            results.append(
+                {"review_id": result["review_id"], "error": result["error"]["message"]}
+            )
+        else:
+            results.append({"review_id": result["review_id"]})
 
-    return flask.jsonify(), http.HTTPStatus.OK
+    return flask.jsonify({"results": results}), http.HTTPStatus.OK
 
 
 @app.errorhandler(exceptions.HTTPException)
@@ -370,22 +456,29 @@ def handle_exception(error):
 def get_case(case_id: str):
     """Gets single case and formats it for the UI."""
     logging.info("Received request to fetch signal %s", case_id)
-    case_response = requests.get(
-        _to_signal_service_url(f"cases/{case_id}"),
-        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-    )
+    cache_key = (response_cache.CASE, case_id)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return flask.jsonify(cached), http.HTTPStatus.OK
+    cache_generation = _response_cache.generation
+
+    case_response = _get(_to_signal_service_url(f"cases/{case_id}"))
     case = case_response.json()
 
     if not case_response.ok:
         return handle_bad_response(case_response, error_on_not_found=True)
 
-    signal_responses = [
-        requests.get(
-            _to_signal_service_url(f"signals/{signal_id}"),
-            timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-        )
-        for signal_id in case[SIGNAL_IDS]
-    ]
+    # The signals, target and similar cases only depend on the case, so they are all
+    # fetched at once.
+    signal_id_query_str = parse.urlencode([("signal_id", i) for i in case[SIGNAL_IDS]])
+    *signal_responses, target_response, similar_cases_response = _map_concurrently(
+        _get,
+        [_to_signal_service_url(f"signals/{i}") for i in case[SIGNAL_IDS]]
+        + [
+            _to_signal_service_url(f"targets/{case[TARGET_ID]}"),
+            _to_signal_service_url("cases") + "?" + signal_id_query_str,
+        ],
+    )
     signals = []
     for signal_response in signal_responses:
         if not signal_response.ok:
@@ -393,30 +486,19 @@ def get_case(case_id: str):
 
         signals.append(signal_response.json())
 
-    target_id = case[TARGET_ID]
-    target_response = requests.get(
-        _to_signal_service_url(f"targets/{target_id}"),
-        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-    )
     target = target_response.json()
 
     if not target_response.ok:
         return handle_bad_response(target_response, error_on_not_found=True)
 
-    signal_id_query_str = parse.urlencode([("signal_id", i) for i in case[SIGNAL_IDS]])
-    similar_cases_response = requests.get(
-        _to_signal_service_url("cases") + "?" + signal_id_query_str,
-        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-    )
     similar_cases = similar_cases_response.json()
 
     if not similar_cases_response.ok:
         return handle_bad_response(similar_cases_response)
 
-    return (
-        flask.jsonify(case_to_json(case, signals, target, similar_cases["data"])),
-        http.HTTPStatus.OK,
-    )
+    result = case_to_json(case, signals, target, similar_cases["data"])
+    _response_cache.set(cache_key, result, cache_generation)
+    return flask.jsonify(result), http.HTTPStatus.OK
 
 
 def handle_bad_response(response: requests.Response, error_on_not_found: bool = False):
@@ -443,10 +525,7 @@ def handle_bad_response(response: requests.Response, error_on_not_found: bool =
 def get_review_stats():
     """Gets the review information for the user."""
     logging.info("Received request to fetch review stats.")
-    response = requests.get(
-        _to_signal_service_url("/cases/review_stats"),
-        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-    )
+    response = _get(_to_signal_service_url("/cases/review_stats"))
     response_json = response.json()
 
     if not response.ok:
@@ -466,55 +545,42 @@ def get_review_stats():
 def get_cases():
     """Gets all cases that require review and formats them for the UI."""
     logging.info("Received request to fetch all cases for review")
-    next_cursor_token = flask.request.args.get("next_cursor_token")
-    previous_cursor_token = flask.request.args.get("previous_cursor_token")
-    page_size = flask.request.args.get("page_size")
-    endpoint = _to_signal_service_url(
-        f"cases?state=active&next_cursor_token={next_cursor_token}"
-        f"&previous_cursor_token={previous_cursor_token}&page_size={page_size}"
-    )
-    response = requests.get(
-        endpoint,
-        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-    )
+    query = {
+        "state": "active",
+        # Inline the signals and target of each case, so that the whole page can be
+        # fetched with a single request.
+        "expand": "signals,target",
+    }
+    for param in ("next_cursor_token", "previous_cursor_token", "page_size"):
+        if flask.request.args.get(param):
+            query[param] = flask.request.args.get(param)
+    cache_key = (response_cache.CASES, *sorted(query.items()))
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return flask.jsonify(cached), http.HTTPStatus.OK
+    cache_generation = _response_cache.generation
+
+    response = _get(_to_signal_service_url(f"cases?{parse.urlencode(query)}"))
     response_json = response.json()
 
     if not response.ok:
         return handle_bad_response(response)
-    cases = []
-    for case in response_json["data"]:
-        signal_responses = [
-            requests.get(
-                _to_signal_service_url(f"signals/{signal_id}"),
-                timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-            )
-            for signal_id in case[SIGNAL_IDS]
-        ]
-        signals = []
-        for signal_response in signal_responses:
-            if not signal_response.ok:
-                return handle_bad_response(signal_response, error_on_not_found=True)
-
-            signals.append(signal_response.json())
-
-        target_id = case[TARGET_ID]
-        target_response = requests.get(
-            _to_signal_service_url(f"targets/{target_id}"),
-            timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
+    cases = [
+        case_to_json(
+            case,
+            case.get("signals", []),
+            case.get("target", {}),
+            thumbnail_size=LIST_THUMBNAIL_SIZE,
         )
-        target = target_response.json()
-
-        if not target_response.ok:
-            return handle_bad_response(target_response, error_on_not_found=True)
-
-        case_json = case_to_json(case, signals, target)
-        cases.append(case_json)
+        for case in response_json["data"]
+    ]
     result = {
         "data": cases,
         "previous_cursor_token": response_json.get("previous_cursor_token"),
         "next_cursor_token": response_json.get("next_cursor_token"),
         "total_count": response_json.get("total_count"),
     }
+    _response_cache.set(cache_key, result, cache_generation)
     return flask.jsonify(result), http.HTTPStatus.OK
 
 
@@ -538,12 +604,12 @@ def add_notes():
     notes = flask.request.json["notes"]
     logging.info("Received %s notes for case %s", notes, case_id)
 
-    json = {"notes": notes}
-    response = requests.patch(
+    response = _session.patch(
         _to_signal_service_url(f"cases/{case_id}"),
-        json=json,
+        json={"notes": notes},
         timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
     )
+    _response_cache.invalidate([case_id])
     if not response.ok:
         return handle_bad_response(response)
 
@@ -574,7 +640,7 @@ def upload_image():
     # We treat UI-uploaded images as "User Reports" for now. This means we first need to
     # create source signals for the image.
     pdq_digest = PdqSignal.hash_from_bytes(image_bytes)
-    response = requests.post(
+    response = _session.post(
         _to_signal_service_url("signals/"),
         json={
             "content": {"value": pdq_digest, "type": "HASH_PDQ"},
@@ -589,13 +655,11 @@ def upload_image():
         return handle_bad_response(response)
     signal_id = response.json()["id"]
 
-    response = requests.post(
+    # The image is uploaded as raw bytes, rather than encoded as base64 in JSON.
+    response = _session.post(
         _to_signal_service_url("targets/"),
-        json={
-            "title": filename,
-            "content_bytes": base64.b64encode(image_bytes).decode(),
-            "content_type": "IMAGE",
-        },
+        data={"metadata": json.dumps({"title": filename, "content_type": "IMAGE"})},
+        files={"content": (filename, image_bytes)},
         timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
     )
     if not response.ok:
@@ -605,7 +669,7 @@ def upload_image():
     # This is a hack. Normally, targets are matched against signals, but as indexes only
     # get built every 15 minutes, the above new signal and target will not have matched
     # yet. Instead, we manually create a case.
-    response = requests.post(
+    response = _session.post(
         _to_signal_service_url("cases/"),
         json={"target_id": target_id, "signal_ids": [signal_id]},
         timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
@@ -619,36 +683,37 @@ def get_importer_configs():
     """Gets the importer configs."""
     importers = {}
 
-    response = requests.get(
-        _to_signal_service_url("importers/TCAP_API"),
-        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
+    tcap_response, gifct_response = _map_concurrently(
+        _get,
+        [
+            _to_signal_service_url("importers/TCAP_API"),
+            _to_signal_service_url("importers/THREAT_EXCHANGE_API"),
+        ],
     )
-    if response.ok:
+    if tcap_response.ok:
+        tcap = tcap_response.json()
         importers["tcap"] = {
             "config": {
-                "enabled": response.json()["state"] == "ACTIVE",
-                "diagnosticsEnabled": response.json()["diagnostics_state"] == "ACTIVE",
-                "username": response.json()["credential"]["identifier"],
-                "password": response.json()["credential"]["token"],
+                "enabled": tcap["state"] == "ACTIVE",
+                "diagnosticsEnabled": tcap["diagnostics_state"] == "ACTIVE",
+                "username": tcap["credential"]["identifier"],
+                "password": tcap["credential"]["token"],
             },
-            "lastRunTime": response.json().get("last_run_time"),
-            "totalImportCount": response.json()["total_import_count"],
+            "lastRunTime": tcap.get("last_run_time"),
+            "totalImportCount": tcap["total_import_count"],
         }
 
-    response = requests.get(
-        _to_signal_service_url("importers/THREAT_EXCHANGE_API"),
-        timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
-    )
-    if response.ok:
+    if gifct_response.ok:
+        gifct = gifct_response.json()
         importers["gifct"] = {
             "config": {
-                "enabled": response.json()["state"] == "ACTIVE",
-                "diagnosticsEnabled": response.json()["diagnostics_state"] == "ACTIVE",
-                "privacyGroupId": response.json()["credential"]["identifier"],
-                "accessToken": response.json()["credential"]["token"],
+                "enabled": gifct["state"] == "ACTIVE",
+                "diagnosticsEnabled": gifct["diagnostics_state"] == "ACTIVE",
+                "privacyGroupId": gifct["credential"]["identifier"],
+                "accessToken": gifct["credential"]["token"],
             },
-            "lastRunTime": response.json().get("last_run_time"),
-            "totalImportCount": response.json()["total_import_count"],
+            "lastRunTime": gifct.get("last_run_time"),
+            "totalImportCount": gifct["total_import_count"],
         }
 
     return flask.jsonify(importers), http.HTTPStatus.OK
@@ -676,7 +741,7 @@ def update_importer_configs():
         identifier = config[options["identifier_key"]]
         token = config[options["token_key"]]
         if identifier and token:
-            response = requests.post(
+            response = _session.post(
                 _to_signal_service_url("importers/"),
                 json={
                     "type": importer_type,
@@ -700,7 +765,7 @@ def update_importer_configs():
                     )
                 return handle_bad_response(response)
         else:
-            requests.delete(
+            _session.delete(
                 _to_signal_service_url(f"importers/{importer_type}"),
                 timeout=DEFAULT_REQUEST_TIMEOUT_SEC,
             )
@@ -708,16 +773,25 @@ def update_importer_configs():
     return flask.jsonify(), http.HTTPStatus.OK
 
 
+def _subscribe_to_case_changes(*_) -> None:
+    """Starts invalidating the response cache of this process on case changes."""
+    if RESPONSE_CACHE_REDIS_URL:
+        _response_cache.subscribe(RESPONSE_CACHE_REDIS_URL)
+
+
 def main():
     """Main entrypoint when running the server."""
     host = "0.0.0.0"
     port = int(os.environ.get("PORT", 8081))
     if os.environ.get("DEBUG", False):
+        _subscribe_to_case_changes()
         app.run(debug=True, host=host, port=port)
     else:
         options = {
             "bind": f"{host}:{port}",
             "workers": multiprocessing.cpu_count() * 2 + 1,
+            # Each worker process has its own cache, so it needs its own subscription.
+            "post_worker_init": _subscribe_to_case_changes,
         }
         gunicorn_app.StandaloneApplication(app, options).run()
 
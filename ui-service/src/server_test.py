@@ -18,14 +18,17 @@
 # pylint: disable=too-many-lines
 """Test that the server behaves as expected."""
 
+import base64
 import http
 import json
+import threading
 from unittest import mock
 
 import requests
 from absl.testing import absltest, parameterized
 from threatexchange.signal_type.pdq import PdqSignal
 
+import response_cache
 import server
 from testing import test_case
 
@@ -41,8 +44,10 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
     def setUp(self):
         super().setUp()
 
+        # Run concurrent requests one at a time, so that they are sent in order.
+        self.enter_context(mock.patch.object(server, "MAX_CONCURRENT_REQUESTS", 1))
         requests_patch = mock.patch.multiple(
-            requests,
+            server._session,  # pylint: disable=protected-access
             get=mock.DEFAULT,
             post=mock.DEFAULT,
             delete=mock.DEFAULT,
@@ -90,6 +95,7 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
             "description": "Description",
             "creator": {
                 "ip_address": "1.2.3.4",
+                "ip_region": "United States",
             },
             "views": 10,
             "create_time": "2000-12-25T00:00:00",
@@ -101,7 +107,6 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                 "racy": "POSSIBLE",
             },
         }
-        self.mock_ip_response = {"country_name": "United States"}
         self.mock_similar_cases_response = {
             "data": [
                 {
@@ -115,6 +120,12 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
             ]
         }
 
+    def _enable_response_cache(self) -> response_cache.ResponseCache:
+        cache = response_cache.ResponseCache(max_size=10, ttl_sec=60)
+        cache.enabled = True
+        self.enter_context(mock.patch.object(server, "_response_cache", cache))
+        return cache
+
     def test_invalid_path_returns_not_found(self):
         with server.app.test_client() as client:
             response = client.get("/foobar")
@@ -170,101 +181,104 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
             ]
         )
 
-    def test_get_cases_sends_correct_requests_to_signals_api(self):
-        self.mock_requests["get"].side_effect = [
-            _make_response(
-                json.dumps(
-                    {
-                        "data": [
-                            {"signal_ids": ["abc"], "target_id": "ghi"},
-                            {"signal_ids": ["def"], "target_id": "jkl"},
-                        ],
-                        "total_count": 1,
-                    }
-                )
-            ),
-            _make_response(json.dumps({})),
-            _make_response(json.dumps({})),
-            _make_response(json.dumps({})),
-            _make_response(json.dumps({})),
-        ]
+    def test_get_case_fetches_signals_target_and_similar_cases_concurrently(self):
+        self.enter_context(mock.patch.object(server, "MAX_CONCURRENT_REQUESTS", 4))
+        # Every fetch after the case waits until all of them have been sent.
+        barrier = threading.Barrier(4, timeout=5)
+        responses = {
+            "cases/abc": {"signal_ids": ["def", "xyz"], "target_id": "ghi"},
+            "signals/def": {},
+            "signals/xyz": {},
+            "targets/ghi": {},
+            "cases?signal_id=def&signal_id=xyz": {"data": []},
+        }
+
+        def get(url, timeout):
+            del timeout  # Unused.
+            path = url.removeprefix(server.SIGNAL_SERVICE_URL)
+            if path != "cases/abc":
+                barrier.wait()
+            return _make_response(json.dumps(responses[path]))
+
+        self.mock_requests["get"].side_effect = get
 
         with server.app.test_client() as client:
-            client.get("/get_cases")
+            response = client.get("/get_case/abc")
 
-        self.mock_requests["get"].assert_has_calls(
-            [
-                mock.call(
-                    "http://signal-service:8082/cases?state=active&"
-                    "next_cursor_token=None&previous_cursor_token=None"
-                    "&page_size=None",
-                    timeout=mock.ANY,
-                ),
-                mock.call("http://signal-service:8082/signals/abc", timeout=mock.ANY),
-                mock.call("http://signal-service:8082/targets/ghi", timeout=mock.ANY),
-                mock.call("http://signal-service:8082/signals/def", timeout=mock.ANY),
-                mock.call("http://signal-service:8082/targets/jkl", timeout=mock.ANY),
-            ]
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual(5, self.mock_requests["get"].call_count)
+
+    def test_get_cases_sends_single_request_to_signals_api(self):
+        self.mock_requests["get"].return_value = _make_response(
+            json.dumps(
+                {
+                    "data": [
+                        {
+                            "signal_ids": ["abc"],
+                            "signals": [{"id": "abc"}],
+                            "target_id": "ghi",
+                            "target": {"id": "ghi", "title": "Some title"},
+                        },
+                        {"signal_ids": ["def"], "signals": [{"id": "def"}]},
+                    ],
+                    "total_count": 2,
+                }
+            )
+        )
+
+        with server.app.test_client() as client:
+            response = client.get("/get_cases")
+
+        self.mock_requests["get"].assert_called_once_with(
+            "http://signal-service:8082/cases?state=active&" "expand=signals%2Ctarget",
+            timeout=mock.ANY,
         )
+        self.assertEqual("Some title", response.json["data"][0]["title"])
+        self.assertEqual(2, response.json["total_count"])
 
     def test_get_cases_with_pagination_cursor_sends_correct_requests_to_signals_api(
         self,
     ):
-        self.mock_requests["get"].side_effect = [
-            _make_response(
-                json.dumps(
-                    {
-                        "data": [
-                            {"signal_ids": ["abc"], "target_id": "ghi"},
-                            {"signal_ids": ["def"], "target_id": "jkl"},
-                        ],
-                        "previous_cursor_token": "aaaaaaaaaaaaaaaaaaaaaaaa_4",
-                        "next_cursor_token": None,
-                        "total_count": 11,
-                    }
-                )
-            ),
-            _make_response(json.dumps({})),
-            _make_response(json.dumps({})),
-            _make_response(json.dumps({})),
-            _make_response(json.dumps({})),
-        ]
+        self.mock_requests["get"].return_value = _make_response(
+            json.dumps(
+                {
+                    "data": [],
+                    "previous_cursor_token": "aaaaaaaaaaaaaaaaaaaaaaaa_4",
+                    "next_cursor_token": None,
+                    "total_count": 11,
+                }
+            )
+        )
 
         with server.app.test_client() as client:
-            client.get("/get_cases?next_cursor_token=aaaaaaaaaaaaaaaaaaaaaaaa_5")
+            response = client.get(
+                "/get_cases?next_cursor_token=aaaaaaaaaaaaaaaaaaaaaaaa_5"
+                "&previous_cursor_token=&page_size=10"
+            )
 
-        self.mock_requests["get"].assert_has_calls(
-            [
-                mock.call(
-                    "http://signal-service:8082/cases?state=active&"
-                    "next_cursor_token=aaaaaaaaaaaaaaaaaaaaaaaa_5&"
-                    "previous_cursor_token=None&page_size=None",
-                    timeout=mock.ANY,
-                ),
-                mock.call("http://signal-service:8082/signals/abc", timeout=mock.ANY),
-                mock.call("http://signal-service:8082/targets/ghi", timeout=mock.ANY),
-                mock.call("http://signal-service:8082/signals/def", timeout=mock.ANY),
-                mock.call("http://signal-service:8082/targets/jkl", timeout=mock.ANY),
-            ]
+        self.mock_requests["get"].assert_called_once_with(
+            "http://signal-service:8082/cases?state=active&"
+            "expand=signals%2Ctarget&"
+            "next_cursor_token=aaaaaaaaaaaaaaaaaaaaaaaa_5&page_size=10",
+            timeout=mock.ANY,
+        )
+        self.assertEqual(
+            "aaaaaaaaaaaaaaaaaaaaaaaa_4", response.json["previous_cursor_token"]
         )
 
     def test_add_reviews_sends_correct_requests_to_cases_api(self):
         self.mock_requests["post"].return_value = _make_response(
-            json.dumps(
-                {
-                    "id": "abc",
-                    "create_time": "2000-12-25T00:00:00+00:00",
-                    "decision": "BLOCK",
-                }
-            )
+            json.dumps({"results": []})
         )
 
         with server.app.test_client() as client:
-            client.post("/add_reviews", json={"case_ids": ["abc"], "decision": 1})
+            client.post(
+                "/add_reviews", json={"case_ids": ["abc", "def"], "decision": 1}
+            )
 
-        self.mock_requests["post"].assert_called_with(
-            "http://signal-service:8082/cases/abc/reviews/",
-            json={"decision": "BLOCK"},
+        self.mock_requests["post"].assert_called_once_with(
+            "http://signal-service:8082/reviews:batchCreate",
+            json={"case_ids": ["abc", "def"], "decision": "BLOCK"},
             timeout=mock.ANY,
         )
 
@@ -291,45 +305,103 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
         )
 
     def test_delete_reviews(self):
-        self.mock_requests["delete"].return_value = _make_response(json.dumps({}))
+        self.mock_requests["post"].return_value = _make_response(
+            json.dumps(
+                {
+                    "results": [
+                        {"review_id": "123"},
+                        {
+                            "review_id": "456",
+                            "error": {
+                                "code": 405,
+                                "message": "Review 456 on case abc cannot be deleted.",
+                                "status": "Method Not Allowed",
+                            },
+                        },
+                    ]
+                }
+            )
+        )
 
         with server.app.test_client() as client:
             response = client.delete(
                 "/remove_reviews",
-                json={"review_ids": ["123"]},
+                json={"review_ids": ["123", "456"]},
             )
 
-        self.mock_requests["delete"].assert_called_with(
-            "http://signal-service:8082/reviews/123",
+        self.mock_requests["post"].assert_called_once_with(
+            "http://signal-service:8082/reviews:batchDelete",
+            json={"review_ids": ["123", "456"]},
             timeout=mock.ANY,
         )
         self.assertEqual(http.HTTPStatus.OK, response.status_code)
-        self.assertIsNone(response.json)
+        self.assertEqual(
+            {
+                "results": [
+                    {"review_id": "123"},
+                    {
+                        "review_id": "456",
+                        "error": "Review 456 on case abc cannot be deleted.",
+                    },
+                ]
+            },
+            response.json,
+        )
 
     def test_add_reviews_returns_relevant_data(self):
         self.mock_requests["post"].return_value = _make_response(
             json.dumps(
                 {
-                    "id": "abc",
-                    "create_time": "2000-12-25T00:00:00+00:00",
-                    "decision": "BLOCK",
+                    "results": [
+                        {
+                            "case_id": "abc",
+                            "review": {
+                                "id": "123",
+                                "create_time": "2000-12-25T00:00:00+00:00",
+                                "decision": "BLOCK",
+                            },
+                        },
+                        {
+                            "case_id": "def",
+                            "error": {
+                                "code": 404,
+                                "message": "Case def not found.",
+                                "status": "Not Found",
+                            },
+                        },
+                    ]
                 }
             )
         )
 
         with server.app.test_client() as client:
             response = client.post(
-                "/add_reviews", json={"case_ids": ["abc"], "decision": 1}
+                "/add_reviews", json={"case_ids": ["abc", "def"], "decision": 1}
             )
 
         self.assertEqual(http.HTTPStatus.OK, response.status_code)
-        self.assertEqual(["abc"], response.json)
-        self.mock_requests["post"].assert_called_with(
-            "http://signal-service:8082/cases/abc/reviews/",
-            json={"decision": "BLOCK"},
-            timeout=mock.ANY,
+        self.assertEqual(
+            {
+                "results": [
+                    {"case_id": "abc", "review_id": "123"},
+                    {"case_id": "def", "error": "Case def not found."},
+                ]
+            },
+            response.json,
+        )
+
+    def test_add_reviews_returns_error_on_bad_response(self):
+        self.mock_requests["post"].return_value = _make_response(
+            json.dumps({}), status=http.HTTPStatus.INTERNAL_SERVER_ERROR
         )
 
+        with server.app.test_client() as client:
+            response = client.post(
+                "/add_reviews", json={"case_ids": ["abc"], "decision": 1}
+            )
+
+        self.assertEqual(http.HTTPStatus.INTERNAL_SERVER_ERROR, response.status_code)
+
     def test_get_tags_confidence_unsure(self):
         self.mock_signal_response["content_features"] = {
             "associated_entities": [],
@@ -342,7 +414,6 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
             _make_response(json.dumps(self.mock_signal_response)),
             _make_response(json.dumps(self.mock_target_response)),
             _make_response(json.dumps(self.mock_similar_cases_response)),
-            _make_response(json.dumps(self.mock_ip_response)),
         ]
 
         with server.app.test_client() as client:
@@ -364,7 +435,6 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
             _make_response(json.dumps(self.mock_signal_response)),
             _make_response(json.dumps(self.mock_target_response)),
             _make_response(json.dumps(self.mock_similar_cases_response)),
-            _make_response(json.dumps(self.mock_ip_response)),
         ]
 
         with server.app.test_client() as client:
@@ -456,9 +526,11 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                 json.dumps(
                     {
                         "title": "Title",
+                        "image_url": "/targets/ghi/image",
                         "description": "Description",
                         "creator": {
                             "ip_address": "1.2.3.4",
+                            "ip_region": "United States",
                         },
                         "views": 10,
                         "create_time": "2000-12-25T00:00:00",
@@ -473,7 +545,6 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                 )
             ),
             _make_response(json.dumps(self.mock_similar_cases_response)),
-            _make_response(json.dumps(self.mock_ip_response)),
         ]
 
         with server.app.test_client() as client:
@@ -517,7 +588,7 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                     },
                 ],
                 server.ASSOCIATED_ENTITIES: [],
-                server.IMAGE_BYTES: None,
+                server.IMAGE_URL: "api/targets/ghi/image",
                 server.ANALYSIS: {
                     server.SAFE_SEARCH_SCORES: {
                         "adult": "POSSIBLE",
@@ -592,6 +663,7 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                         "description": "Description",
                         "creator": {
                             "ip_address": "1.2.3.4",
+                            "ip_region": "United States",
                         },
                         "views": 10,
                         "create_time": "2000-12-25T00:00:00",
@@ -599,7 +671,6 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                 )
             ),
             _make_response(json.dumps(self.mock_similar_cases_response)),
-            _make_response(json.dumps(self.mock_ip_response)),
         ]
 
         with server.app.test_client() as client:
@@ -633,7 +704,7 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                     }
                 ],
                 server.ASSOCIATED_ENTITIES: [],
-                server.IMAGE_BYTES: None,
+                server.IMAGE_URL: None,
                 server.ANALYSIS: {
                     server.SAFE_SEARCH_SCORES: {
                         "adult": "UNKNOWN",
@@ -666,7 +737,6 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
             _make_response(json.dumps(self.mock_signal_response)),
             _make_response(json.dumps(self.mock_target_response)),
             _make_response(json.dumps(self.mock_similar_cases_response)),
-            _make_response(json.dumps(self.mock_ip_response)),
         ]
 
         with server.app.test_client() as client:
@@ -756,61 +826,56 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                                 "confidence": "MEDIUM",
                                 "severity": None,
                                 "review_history": [],
+                                "signals": [
+                                    {
+                                        "id": "def",
+                                        "content": [
+                                            {
+                                                "value": "https://www.google.com/",
+                                                "content_type": "URL",
+                                            }
+                                        ],
+                                        "sources": [
+                                            {
+                                                "name": "TCAP",
+                                                "create_time": "2000-12-25T00:00:00",
+                                            }
+                                        ],
+                                        "content_features": {
+                                            "associated_entities": [],
+                                            "contains_pii": "NO",
+                                            "is_violent_or_graphic": "YES",
+                                            "is_illegal_in_countries": [],
+                                        },
+                                        "status": {
+                                            "last_checked_time": "2010-03-12T00:00:00",
+                                            "most_recent_status": "ACTIVE",
+                                        },
+                                    }
+                                ],
+                                "target": {
+                                    "title": "Title",
+                                    "description": "Description",
+                                    "image_url": "/targets/ghi/image",
+                                    "creator": {
+                                        "ip_address": "1.2.3.4",
+                                        "ip_region": "United States",
+                                    },
+                                    "views": 10,
+                                    "create_time": "2000-12-25T00:00:00",
+                                    "safe_search_scores": {
+                                        "adult": "POSSIBLE",
+                                        "spoof": "POSSIBLE",
+                                        "medical": "POSSIBLE",
+                                        "violence": "POSSIBLE",
+                                        "racy": "POSSIBLE",
+                                    },
+                                },
                             }
                         ]
                     }
                 )
             ),
-            _make_response(
-                json.dumps(
-                    {
-                        "id": "def",
-                        "content": [
-                            {
-                                "value": "https://www.google.com/",
-                                "content_type": "URL",
-                            }
-                        ],
-                        "sources": [
-                            {
-                                "name": "TCAP",
-                                "create_time": "2000-12-25T00:00:00",
-                            }
-                        ],
-                        "content_features": {
-                            "associated_entities": [],
-                            "contains_pii": "NO",
-                            "is_violent_or_graphic": "YES",
-                            "is_illegal_in_countries": [],
-                        },
-                        "status": {
-                            "last_checked_time": "2010-03-12T00:00:00",
-                            "most_recent_status": "ACTIVE",
-                        },
-                    }
-                )
-            ),
-            _make_response(
-                json.dumps(
-                    {
-                        "title": "Title",
-                        "description": "Description",
-                        "creator": {
-                            "ip_address": "1.2.3.4",
-                        },
-                        "views": 10,
-                        "create_time": "2000-12-25T00:00:00",
-                        "safe_search_scores": {
-                            "adult": "POSSIBLE",
-                            "spoof": "POSSIBLE",
-                            "medical": "POSSIBLE",
-                            "violence": "POSSIBLE",
-                            "racy": "POSSIBLE",
-                        },
-                    }
-                )
-            ),
-            _make_response(json.dumps(self.mock_ip_response)),
         ]
 
         with server.app.test_client() as client:
@@ -845,7 +910,7 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                         },
                     ],
                     server.ASSOCIATED_ENTITIES: [],
-                    server.IMAGE_BYTES: None,
+                    server.IMAGE_URL: "api/targets/ghi/image?size=256",
                     server.ANALYSIS: {
                         server.SAFE_SEARCH_SCORES: {
                             "adult": "POSSIBLE",
@@ -905,54 +970,48 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                                 "confidence": "MEDIUM",
                                 "severity": None,
                                 "review_history": [],
+                                "signals": [
+                                    {
+                                        "id": "def",
+                                        "content": [
+                                            {
+                                                "value": "https://www.google.com/",
+                                                "content_type": "URL",
+                                            }
+                                        ],
+                                        "sources": [
+                                            {
+                                                "name": "TCAP",
+                                                "create_time": "2000-12-25T00:00:00",
+                                            }
+                                        ],
+                                        "content_features": {
+                                            "associated_entities": [],
+                                            "contains_pii": "NO",
+                                            "is_violent_or_graphic": "YES",
+                                            "is_illegal_in_countries": [],
+                                        },
+                                        "status": {
+                                            "last_checked_time": "2010-03-12T00:00:00",
+                                            "most_recent_status": "ACTIVE",
+                                        },
+                                    }
+                                ],
+                                "target": {
+                                    "title": "Title",
+                                    "description": "Description",
+                                    "creator": {
+                                        "ip_address": "1.2.3.4",
+                                        "ip_region": "United States",
+                                    },
+                                    "views": 10,
+                                    "create_time": "2000-12-25T00:00:00",
+                                },
                             }
                         ]
                     }
                 )
             ),
-            _make_response(
-                json.dumps(
-                    {
-                        "id": "def",
-                        "content": [
-                            {
-                                "value": "https://www.google.com/",
-                                "content_type": "URL",
-                            }
-                        ],
-                        "sources": [
-                            {
-                                "name": "TCAP",
-                                "create_time": "2000-12-25T00:00:00",
-                            }
-                        ],
-                        "content_features": {
-                            "associated_entities": [],
-                            "contains_pii": "NO",
-                            "is_violent_or_graphic": "YES",
-                            "is_illegal_in_countries": [],
-                        },
-                        "status": {
-                            "last_checked_time": "2010-03-12T00:00:00",
-                            "most_recent_status": "ACTIVE",
-                        },
-                    }
-                )
-            ),
-            _make_response(
-                json.dumps(
-                    {
-                        "title": "Title",
-                        "description": "Description",
-                        "creator": {
-                            "ip_address": "1.2.3.4",
-                        },
-                        "views": 10,
-                        "create_time": "2000-12-25T00:00:00",
-                    }
-                )
-            ),
-            _make_response(json.dumps(self.mock_ip_response)),
         ]
 
         with server.app.test_client() as client:
@@ -987,7 +1046,7 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                         },
                     ],
                     server.ASSOCIATED_ENTITIES: [],
-                    server.IMAGE_BYTES: None,
+                    server.IMAGE_URL: None,
                     server.ANALYSIS: {
                         server.SAFE_SEARCH_SCORES: {
                             "adult": "UNKNOWN",
@@ -1071,25 +1130,23 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                                 "id": "abc",
                                 "signal_ids": ["def"],
                                 "target_id": "ghi",
+                                "signals": [
+                                    {
+                                        "id": "def",
+                                        "content": [
+                                            {
+                                                "value": "https://abc/fallback_title",
+                                                "content_type": "URL",
+                                            }
+                                        ],
+                                    }
+                                ],
+                                "target": {},
                             }
                         ]
                     }
                 )
             ),
-            _make_response(
-                json.dumps(
-                    {
-                        "id": "def",
-                        "content": [
-                            {
-                                "value": "https://abc/fallback_title",
-                                "content_type": "URL",
-                            }
-                        ],
-                    }
-                )
-            ),
-            _make_response(json.dumps({})),
         ]
 
         with server.app.test_client() as client:
@@ -1107,24 +1164,22 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                                 "id": "abc",
                                 "signal_ids": ["def"],
                                 "target_id": "ghi",
+                                "signals": [
+                                    {
+                                        "id": "def",
+                                        "content": [
+                                            {
+                                                "value": "https://abc/fallback_title",
+                                            }
+                                        ],
+                                    }
+                                ],
+                                "target": {},
                             }
                         ]
                     }
                 )
             ),
-            _make_response(
-                json.dumps(
-                    {
-                        "id": "def",
-                        "content": [
-                            {
-                                "value": "https://abc/fallback_title",
-                            }
-                        ],
-                    }
-                )
-            ),
-            _make_response(json.dumps({})),
         ]
 
         with server.app.test_client() as client:
@@ -1188,6 +1243,47 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
             ]
         )
 
+    def test_get_case_serves_cached_response(self):
+        cache = self._enable_response_cache()
+        self.mock_requests["get"].side_effect = [
+            _make_response(json.dumps(self.mock_case_response)),
+            _make_response(json.dumps(self.mock_signal_response)),
+            _make_response(json.dumps(self.mock_target_response)),
+            _make_response(json.dumps(self.mock_similar_cases_response)),
+        ]
+
+        with server.app.test_client() as client:
+            first_response = client.get("/get_case/abc")
+            second_response = client.get("/get_case/abc")
+
+        self.assertEqual(http.HTTPStatus.OK, second_response.status_code)
+        self.assertEqual(first_response.json, second_response.json)
+        self.assertEqual(4, self.mock_requests["get"].call_count)
+        self.assertIsNotNone(cache.get((response_cache.CASE, "abc")))
+
+    def test_get_cases_serves_cached_response(self):
+        self._enable_response_cache()
+        self.mock_requests["get"].return_value = _make_response(
+            json.dumps({"data": [], "total_count": 0})
+        )
+
+        with server.app.test_client() as client:
+            client.get("/get_cases?page_size=10")
+            client.get("/get_cases?page_size=10")
+            client.get("/get_cases?page_size=20")
+
+        self.assertEqual(2, self.mock_requests["get"].call_count)
+
+    def test_add_notes_invalidates_cached_case(self):
+        cache = self._enable_response_cache()
+        cache.set((response_cache.CASE, "abc"), {"id": "abc"}, cache.generation)
+        self.mock_requests["patch"].return_value = _make_response(json.dumps({}))
+
+        with server.app.test_client() as client:
+            client.patch("/add_notes", json={"case_id": "abc", "notes": "Hello World"})
+
+        self.assertIsNone(cache.get((response_cache.CASE, "abc")))
+
     @parameterized.parameters(
         ({"notes": "Hello World"}, "'case_id' is a required property"),
         ({"case_id": "abc"}, "'notes' is a required property"),
@@ -1239,10 +1335,18 @@ class ServerTest(parameterized.TestCase, test_case.TestCase):
                 ),
                 mock.call(
                     "http://signal-service:8082/targets/",
-                    json={
-                        "title": "filename.jpg",
-                        "content_bytes": "R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw==",
-                        "content_type": "IMAGE",
+                    data={
+                        "metadata": json.dumps(
+                            {"title": "filename.jpg", "content_type": "IMAGE"}
+                        )
+                    },
+                    files={
+                        "content": (
+                            "filename.jpg",
+                            base64.b64decode(
+                                "R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=="
+                            ),
+                        )
                     },
                     timeout=mock.ANY,
                 ),